@@ -5,11 +5,22 @@ import io
 from dash import html
 import dash
 import dash_bootstrap_components as dbc
+import diskcache
+import os
+import tempfile
+from dash import DiskcacheManager
+
+# Background callback manager: jobs run in local worker processes and report
+# progress through an on-disk cache, so no external broker is needed
+JOB_CACHE_DIR = os.environ.get('DASHBOARD_JOB_CACHE_DIR',
+                               os.path.join(tempfile.gettempdir(), 'mental-health-dashboard', 'jobs'))
+background_callback_manager = DiskcacheManager(diskcache.Cache(JOB_CACHE_DIR))
 
 # Initialize Dash app
 app = dash.Dash(
     __name__,
     suppress_callback_exceptions=True,
-    external_stylesheets=[dbc.themes.BOOTSTRAP]
+    external_stylesheets=[dbc.themes.BOOTSTRAP],
+    background_callback_manager=background_callback_manager
 )
 server = app.server
@@ -0,0 +1,56 @@
+// Clientside callbacks for pure UI updates (visibility toggles and chart
+// theming). They run in the browser, so they never queue behind the plot
+// callbacks on the server workers.
+
+function displayIf(visible) {
+    return visible ? {'display': 'block'} : {'display': 'none'};
+}
+
+var CHART_THEMES = {
+    dark: {font: 'white', background: 'rgba(0,0,0,0)', grid: null},  // grid keeps the figure template's colour
+    light: {font: '#212529', background: 'white', grid: '#e5e5e5'}
+};
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    ui: {
+        // univariate: bins slider only applies to histograms
+        toggleBinsControl: function (chartType) {
+            return displayIf(chartType === 'histogram');
+        },
+
+        // bivariate: two-variable controls/output vs heatmap controls/output
+        toggleBivariateControls: function (analysisType) {
+            var heatmap = analysisType === 'heatmap';
+            return [displayIf(!heatmap), displayIf(!heatmap), displayIf(heatmap), displayIf(heatmap)];
+        },
+
+        // preprocessing: custom fill value input
+        toggleCustomInput: function (method) {
+            return displayIf(method === 'custom');
+        },
+
+        // Apply the chart theme to a figure produced by a server callback.
+        // Switching the theme re-styles the figure already in the browser.
+        themeFigure: function (figure, light) {
+            if (!figure) {
+                return window.dash_clientside.no_update;
+            }
+            var theme = light ? CHART_THEMES.light : CHART_THEMES.dark;
+            var layout = Object.assign({}, figure.layout);
+            layout.paper_bgcolor = theme.background;
+            layout.plot_bgcolor = theme.background;
+            layout.font = Object.assign({}, layout.font, {color: theme.font});
+            if (theme.grid) {
+                ['xaxis', 'yaxis'].forEach(function (axis) {
+                    layout[axis] = Object.assign({}, layout[axis], {gridcolor: theme.grid, zerolinecolor: theme.grid});
+                });
+            }
+            if (layout.annotations) {
+                layout.annotations = layout.annotations.map(function (annotation) {
+                    return Object.assign({}, annotation, {font: Object.assign({}, annotation.font, {color: theme.font})});
+                });
+            }
+            return Object.assign({}, figure, {layout: layout});
+        }
+    }
+});
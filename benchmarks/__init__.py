@@ -0,0 +1,3 @@
+# Performance benchmarks (not a test suite): a synthetic survey generator and a
+# runner that times cleaning, ingest, serialization and page callbacks.
+# Run from the repository root: python -m benchmarks.run --rows 1000 100000
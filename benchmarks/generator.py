@@ -0,0 +1,121 @@
+import base64
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning import NORMALIZATION_TABLE
+
+# Synthetic OSMI-style survey exports.
+# Each answer column mixes the canonical answers with the dirty tokens that
+# data_cleaning.NORMALIZATION_TABLE repairs or rejects ('Yesss', 'Nop',
+# 'male-ish', 'russiaaaaa', ...), plus blanks, so clean_data does the same
+# work it does on a real export.
+
+DIRTY_RATE = 0.15
+MISSING_RATE = 0.05
+
+CANONICAL = {
+    'Gender': ['Male', 'Female', 'Non-Binary'],
+    'Country': ['United States', 'United Kingdom', 'Canada', 'Germany', 'Netherlands', 'Ireland',
+                'Australia', 'France', 'India', 'Russia', 'Bulgaria', 'Bahamas'],
+    'self_employed': ['Yes', 'No'],
+    'family_history': ['Yes', 'No'],
+    'treatment': ['Yes', 'No'],
+    'work_interfere': ['Often', 'Rarely', 'Never', 'Sometimes'],
+    'no_employees': ['1-5', '6-25', '26-100', '100-500', '500-1000', '1000+'],
+    'remote_work': ['Yes', 'No'],
+    'tech_company': ['Yes', 'No'],
+    'benefits': ['Yes', 'No', "Don't know"],
+    'care_options': ['Yes', 'No', 'Not Sure'],
+    'wellness_program': ['Yes', 'No', "Don't know"],
+    'seek_help': ['Yes', 'No', "Don't know"],
+    'anonymity': ['Yes', 'No', "Don't know"],
+    'leave': ['Very easy', 'Somewhat easy', 'Somewhat difficult', 'Very difficult', "Don't know"],
+    'mental_health_consequence': ['Yes', 'No', 'Maybe'],
+    'phys_health_consequence': ['Yes', 'No', 'Maybe'],
+    'coworkers': ['Yes', 'No', 'Some of them'],
+    'supervisor': ['Yes', 'No', 'Some of them'],
+    'mental_health_interview': ['Yes', 'No', 'Maybe'],
+    'phys_health_interview': ['Yes', 'No', 'Maybe'],
+    'mental_vs_physical': ['Yes', 'No', "Don't know"],
+    'obs_consequence': ['Yes', 'No'],
+}
+
+# Free text the normalization table does not list (fuzzy matched, dropped or kept as typed)
+UNSEEN_TOKENS = {
+    'Gender': ['Male ', 'MALE', 'femal', 'Woman', 'fluid', 'A little about you', 'p'],
+    'Country': ['united states', 'U.S.', 'Deutschland', 'Holland'],
+}
+
+STATES = ['CA', 'NY', 'WA', 'TX', 'IL', 'OR', 'MA', 'PA', 'OH', 'FL']
+COMMENTS = ['', 'none', 'Great survey', 'I work remotely and it helps a lot',
+            'My employer does not take mental health seriously', 'n/a', 'ok thanks']
+
+
+def dirty_tokens(column):
+    """Raw values of a column that clean_data has to repair or drop"""
+    spec = NORMALIZATION_TABLE.get(column, {})
+    tokens = list(spec.get('mapping', {})) + list(spec.get('invalid', ())) + UNSEEN_TOKENS.get(column, [])
+    if column in ('treatment', 'benefits'):
+        tokens += ['maybe', 'idk']
+    return tokens
+
+
+def _answers(rng, column, n, dirty_rate, missing_rate):
+    canonical = np.array(CANONICAL[column], dtype=object)
+    values = canonical[rng.integers(0, len(canonical), n)]
+    dirty = dirty_tokens(column)
+    if dirty:
+        mask = rng.random(n) < dirty_rate
+        values[mask] = np.array(dirty, dtype=object)[rng.integers(0, len(dirty), int(mask.sum()))]
+    values[rng.random(n) < missing_rate] = None
+    return values
+
+
+def generate_survey(n, seed=0, dirty_rate=DIRTY_RATE, missing_rate=MISSING_RATE):
+    """Raw survey DataFrame of n rows, as read_csv would return it before clean_data"""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2014-08-27T00:00:00')
+    timestamps = (start + rng.integers(0, 3 * 365 * 24 * 3600, n).astype('timedelta64[s]')).astype(str)
+
+    # Ages include the typos and troll answers the survey is known for
+    ages = rng.normal(33, 8, n).round().astype('int64')
+    odd = rng.random(n) < 0.01
+    ages[odd] = rng.choice([-1, 5, 99999, 329, 11, 8], int(odd.sum()))
+
+    data = {'Timestamp': timestamps, 'Age': ages}
+    for column in CANONICAL:
+        data[column] = _answers(rng, column, n, dirty_rate, missing_rate)
+    data['state'] = np.where(data['Country'] == 'United States',
+                             np.array(STATES, dtype=object)[rng.integers(0, len(STATES), n)], None)
+    data['comments'] = np.array(COMMENTS, dtype=object)[rng.integers(0, len(COMMENTS), n)]
+    data['Years_in_Tech'] = rng.integers(0, 30, n)
+    data['Years_in_Current_Role'] = np.minimum(data['Years_in_Tech'], rng.integers(0, 15, n))
+    data['Sick_Leave_Days'] = rng.poisson(4, n)
+    data['Average_Weekly_Hours'] = rng.integers(20, 70, n)
+
+    order = ['Timestamp', 'Age', 'Gender', 'Country', 'state'] + [c for c in CANONICAL if c not in ('Gender', 'Country')]
+    order += ['comments', 'Years_in_Tech', 'Years_in_Current_Role', 'Sick_Leave_Days', 'Average_Weekly_Hours']
+    return pd.DataFrame(data)[order]
+
+
+def survey_csv(n, seed=0, **kwargs):
+    """CSV bytes of a generated survey export"""
+    return generate_survey(n, seed, **kwargs).to_csv(index=False).encode('utf-8')
+
+
+def upload_contents(csv_bytes):
+    """dcc.Upload 'contents' string for CSV bytes"""
+    return 'data:text/csv;base64,' + base64.b64encode(csv_bytes).decode('ascii')
+
+
+if __name__ == '__main__':
+    import sys
+
+    if len(sys.argv) < 3:
+        print("Usage: python -m benchmarks.generator <rows> <output.csv> [seed]")
+        sys.exit(1)
+    rows = int(sys.argv[1])
+    with open(sys.argv[2], 'wb') as f:
+        f.write(survey_csv(rows, int(sys.argv[3]) if len(sys.argv) > 3 else 0))
+    print(f"Wrote {rows:,} rows to {sys.argv[2]}")
@@ -0,0 +1,248 @@
+import argparse
+import datetime
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.generator import survey_csv, upload_contents
+
+# Benchmark runner.
+# Times the cleaning pipeline (clean_data and every clean_* step), upload
+# parsing through handle_upload_remove, DataFrame serializer round-trips and
+# every page callback called directly, at one or more dataset sizes. Results
+# are written as JSON so runs from different commits can be compared.
+#
+#   python -m benchmarks.run --rows 1000 100000 1000000 --output bench.json
+
+DEFAULT_ROWS = [1_000, 10_000, 100_000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(__file__), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def measure(fn, repeat):
+    """(first call seconds, best of the remaining calls, last result)
+
+    The first call is the cold one: per-dataset caches (profile, aggregates,
+    figures) are filled by it and read by the following calls.
+    """
+    times = []
+    result = None
+    for _ in range(max(repeat, 1)):
+        start = time.perf_counter()
+        result = fn()
+        times.append(time.perf_counter() - start)
+    return times[0], min(times[1:]) if len(times) > 1 else times[0], result
+
+
+def invoke(callback, *args, triggered=None):
+    """Call a Dash callback function directly, outside of a request.
+
+    Callbacks that read ctx.triggered_id get a minimal callback context.
+    """
+    from dash._callback_context import context_value
+    from dash._utils import AttributeDict
+
+    context_value.set(AttributeDict(
+        triggered_inputs=[{'prop_id': triggered, 'value': None}] if triggered else [],
+        args_grouping=[], outputs_list=[], inputs_list=[], states_list=[]
+    ))
+    return getattr(callback, '__wrapped__', callback)(*args)
+
+
+def no_progress(progress):
+    pass
+
+
+class Recorder:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    def time(self, group, name, rows, fn, **extra):
+        try:
+            first, best, result = measure(fn, self.repeat)
+        except Exception as e:
+            print(f"  {name:<48} FAILED: {e}")
+            self.results.append({'group': group, 'name': name, 'rows': rows, 'error': str(e)})
+            return None
+        self.results.append({'group': group, 'name': name, 'rows': rows, 'first_s': first, 'best_s': best, **extra})
+        print(f"  {name:<48} first {first * 1000:>10.1f} ms   best {best * 1000:>10.1f} ms")
+        return result
+
+
+def cleaning_steps():
+    """clean_data's stages in order, with every per-column clean_* step"""
+    import data_cleaning
+    steps = [('clean_timestamp', data_cleaning.clean_timestamp), ('clean_age', data_cleaning.clean_age)]
+    steps += [(f"clean_{col.lower()}", getattr(data_cleaning, f"clean_{col.lower()}"))
+              for col in data_cleaning.NORMALIZATION_TABLE if hasattr(data_cleaning, f"clean_{col.lower()}")]
+    steps += [('handle_missing_values', data_cleaning.handle_missing_values),
+              ('convert_data_types', data_cleaning.convert_data_types)]
+    return steps
+
+
+def bench_cleaning(rec, rows, raw):
+    from data_cleaning import clean_data
+    from dtype_optimizer import optimize_dtypes
+    cleaned = rec.time('cleaning', 'clean_data', rows, lambda: clean_data(raw))
+    if cleaned is not None:
+        rec.time('cleaning', 'optimize_dtypes', rows, lambda: optimize_dtypes(cleaned))
+
+    # Stages run in sequence on one copy, as inside clean_data; best of `repeat` runs
+    totals = {}
+    for _ in range(max(rec.repeat, 1)):
+        df = raw.copy()
+        for name, step in cleaning_steps():
+            start = time.perf_counter()
+            df = step(df)
+            totals.setdefault(name, []).append(time.perf_counter() - start)
+    for name, times in totals.items():
+        rec.results.append({'group': 'cleaning', 'name': name, 'rows': rows, 'first_s': times[0], 'best_s': min(times)})
+        print(f"  {name:<48} first {times[0] * 1000:>10.1f} ms   best {min(times) * 1000:>10.1f} ms")
+
+
+def bench_serializers(rec, rows, df):
+    from data_serializer import benchmark_serializers
+    for row in benchmark_serializers(df, repeat=rec.repeat):
+        for phase in ('encode', 'decode'):
+            rec.results.append({'group': 'serializer', 'name': f"{row['format']}:{phase}", 'rows': rows,
+                                'first_s': row[f'{phase}_s'], 'best_s': row[f'{phase}_s'], 'bytes': row['bytes']})
+        print(f"  {row['format'] + ' round-trip':<48} encode {row['encode_s'] * 1000:>9.1f} ms   "
+              f"decode {row['decode_s'] * 1000:>9.1f} ms   {row['bytes']:,} bytes")
+
+
+def bench_callbacks(rec, rows, handle):
+    import index
+    from pages import bivariate, filters, preprocessing, univariate
+
+    def cb(group, name, callback, *args, triggered=None):
+        return rec.time(group, name, rows, lambda: invoke(callback, *args, triggered=triggered))
+
+    flt = {'Gender': ['Female'], 'treatment': ['Yes']}
+    cb('home', 'update_home_display', index.update_home_display, handle, 'survey.csv', '/', None)
+    cb('home', 'update_preview_page', index.update_preview_page, 0, 10, [], '', handle, None)
+    cb('home', 'update_preview_page (sort+filter)', index.update_preview_page, 3, 10,
+       [{'column_id': 'Age', 'direction': 'desc'}], '{Gender} = Female && {Age} > 30', handle, None)
+    cb('filters', 'update_filter_summary', filters.update_filter_summary, flt, handle)
+    cb('filters', 'update_home_display (filtered)', index.update_home_display, handle, 'survey.csv', '/', flt)
+
+    cb('univariate', 'update_univariate_options', univariate.update_univariate_options, handle)
+    for chart_type, column in [('histogram', 'Age'), ('box', 'Age'), ('violin', 'Age'), ('bar', 'Gender'), ('pie', 'Country')]:
+        cb('univariate', f"update_univariate_plot ({chart_type})", univariate.update_univariate_plot,
+           column, chart_type, 30, handle, None)
+    cb('univariate', 'update_univariate_plot (histogram, filtered)', univariate.update_univariate_plot,
+       'Age', 'histogram', 30, handle, flt)
+
+    cb('bivariate', 'update_bivariate_options', bivariate.update_bivariate_options, handle)
+    for method in ('pearson', 'spearman', 'cramers_v'):
+        cb('bivariate', f"update_heatmap ({method})", bivariate.update_heatmap, 'heatmap', method, handle, None, None)
+    for chart_type, x_col, y_col in [('scatter', 'Age', 'Years_in_Tech'), ('bar', 'Gender', 'Age'),
+                                     ('grouped_bar', 'Gender', 'treatment'), ('stacked_bar', 'Gender', 'treatment'),
+                                     ('box', 'Country', 'Age'), ('violin', 'Country', 'Age')]:
+        cb('bivariate', f"update_two_var_plot ({chart_type})", bivariate.update_two_var_plot,
+           'two_var', x_col, y_col, chart_type, 'auto', handle, None, None)
+        cb('bivariate', f"update_two_var_info ({chart_type})", bivariate.update_two_var_info,
+           'two_var', x_col, y_col, chart_type, 'auto', handle, None)
+
+    cb('preprocessing', 'check_missing', preprocessing.check_missing, 1, handle)
+    cb('preprocessing', 'check_dtypes', preprocessing.check_dtypes, 1, handle)
+    cb('preprocessing', 'drop_selected_columns', preprocessing.drop_selected_columns, 1, ['comments'], handle)
+    for method, value in [('mean', None), ('median', None), ('mode', None), ('zero', None), ('ffill', None),
+                          ('bfill', None), ('custom', 'unknown'), ('drop', None)]:
+        cb('preprocessing', f"handle_missing_values ({method}, all)", preprocessing.handle_missing_values,
+           None, 1, None, method, value, handle, triggered='apply-missing-all.n_clicks')
+    cb('preprocessing', 'convert_dtype', preprocessing.convert_dtype, 1, 'Age', 'float', handle)
+    cb('preprocessing', 'discretize_column', preprocessing.discretize_column, 1, 'Age', 5, handle)
+    cb('preprocessing', 'normalize_data', preprocessing.normalize_data, no_progress, 1, 'standard', handle)
+    cb('preprocessing', 'encode_data (label)', preprocessing.encode_data, no_progress, 1, 'label', handle)
+    cb('preprocessing', 'encode_data (onehot)', preprocessing.encode_data, no_progress, 1, 'onehot', handle)
+    cb('preprocessing', 'split_data', preprocessing.split_data, no_progress, 1, 20, 42, handle)
+    cb('preprocessing', 'download_csv (csv)', preprocessing.download_csv, 1, 'csv', handle)
+    cb('preprocessing', 'download_csv (parquet)', preprocessing.download_csv, 1, 'parquet', handle)
+
+
+def run(rows_list, repeat=3, seed=0, groups=None):
+    import index  # registers the app, its layout and every callback
+
+    rec = Recorder(repeat)
+    for rows in rows_list:
+        print(f"\n=== {rows:,} rows ===")
+        start = time.perf_counter()
+        csv = survey_csv(rows, seed)
+        print(f"  generated {len(csv) / 1024 / 1024:.1f} MB of CSV in {time.perf_counter() - start:.1f}s")
+
+        raw = rec.time('ingest', 'read_csv', rows, lambda: pd.read_csv(io.BytesIO(csv)), bytes=len(csv))
+        if groups is None or 'cleaning' in groups:
+            bench_cleaning(rec, rows, raw)
+
+        contents = upload_contents(csv)
+        uploaded = rec.time('ingest', 'handle_upload_remove', rows,
+                            lambda: invoke(index.handle_upload_remove, contents, 0, 'survey.csv',
+                                           triggered='upload-data.contents'), bytes=len(contents))
+        del contents, raw
+        handle = uploaded[0] if uploaded else None
+        if handle is None:
+            print("  upload failed, skipping the remaining benchmarks for this size")
+            continue
+
+        from data_store import get_dataset
+        if groups is None or 'serializer' in groups:
+            bench_serializers(rec, rows, get_dataset(handle))
+        if groups is None or 'callbacks' in groups:
+            bench_callbacks(rec, rows, handle)
+    return rec.results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time cleaning, ingest, serialization and page callbacks")
+    parser.add_argument('--rows', type=int, nargs='+', default=DEFAULT_ROWS, help="dataset sizes (1k to 5M)")
+    parser.add_argument('--repeat', type=int, default=3, help="calls per benchmark (first = cold)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--only', nargs='+', choices=['cleaning', 'serializer', 'callbacks'],
+                        help="run only these groups (ingest always runs)")
+    parser.add_argument('--output', help="results file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args(argv)
+
+    commit = git_commit()
+    started = datetime.datetime.now()
+    results = run(args.rows, args.repeat, args.seed, args.only)
+
+    output = args.output
+    if output is None:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        output = os.path.join(RESULTS_DIR, f"{started:%Y%m%d-%H%M%S}-{commit or 'nocommit'}.json")
+    report = {
+        'meta': {
+            'commit': commit,
+            'started': started.isoformat(timespec='seconds'),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'rows': args.rows,
+            'repeat': args.repeat,
+            'seed': args.seed,
+        },
+        'results': results,
+    }
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote {len(results)} results to {output}")
+
+
+if __name__ == '__main__':
+    main()
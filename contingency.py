@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+# Contingency tables for pairs of categorical columns.
+# Both columns are factorized to integer codes and counted with a single
+# np.bincount over the combined code, instead of casting every row to str and
+# running pd.crosstab. The grouped and stacked bar charts and the chi-square
+# card all share one cached table per (x, y, dataset version).
+
+
+def count_table(a_codes, b_codes, a_levels, b_levels):
+    """a_levels x b_levels counts of the code pairs where neither side is missing"""
+    keep = (a_codes >= 0) & (b_codes >= 0)
+    table = np.bincount(a_codes[keep].astype('int64') * b_levels + b_codes[keep], minlength=a_levels * b_levels)
+    return table.reshape(a_levels, b_levels)
+
+
+def chi_square(table):
+    """Pearson chi-square test of independence for a table of counts (empty rows/columns ignored)"""
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+    n = int(table.sum())
+    dof = (table.shape[0] - 1) * (table.shape[1] - 1)
+    if n == 0 or dof == 0:
+        return {'chi2': np.nan, 'dof': dof, 'p_value': np.nan, 'cramers_v': np.nan, 'n': n, 'min_expected': np.nan}
+    from scipy.special import chdtrc  # imported on first test, scipy is slow to load
+    expected = np.outer(table.sum(axis=1), table.sum(axis=0)) / n
+    chi2 = float(((table - expected) ** 2 / expected).sum())
+    return {
+        'chi2': chi2,
+        'dof': dof,
+        'p_value': float(chdtrc(dof, chi2)),
+        'cramers_v': float(np.sqrt(chi2 / n / (min(table.shape) - 1))),
+        'n': n,
+        'min_expected': float(expected.min()),
+    }
+
+
+def crosstab(df, x_col, y_col):
+    """Counts of y categories per x category as a DataFrame (labels as str, sorted like pd.crosstab)"""
+    x_codes, x_uniques = pd.factorize(df[x_col])
+    y_codes, y_uniques = pd.factorize(df[y_col])
+    table = count_table(x_codes, y_codes, len(x_uniques), len(y_uniques))
+
+    rows = table.sum(axis=1) > 0
+    cols = table.sum(axis=0) > 0
+    result = pd.DataFrame(table[rows][:, cols],
+                          index=pd.Index([str(v) for v in x_uniques[rows]], name=x_col),
+                          columns=pd.Index([str(v) for v in y_uniques[cols]], name=y_col))
+    return result.sort_index().sort_index(axis=1)
+
+
+def crosstab_summary(df, x_col, y_col):
+    """Crosstab plus its chi-square statistics, the unit cached per column pair"""
+    table = crosstab(df, x_col, y_col)
+    return {'table': table, 'stats': chi_square(table.to_numpy())}
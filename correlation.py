@@ -0,0 +1,173 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from contingency import chi_square, count_table
+
+# Correlation engine for the bivariate heatmap.
+# Pairwise sufficient statistics (n, sums, sums of squares, cross-products)
+# are cached per pair of column *contents*, keyed by a digest of each column.
+# A preprocessing step that drops or transforms a few columns therefore only
+# costs the pairs involving the changed columns; everything else is reused
+# from the previous dataset version.
+
+METHODS = {
+    'pearson': "Pearson",
+    'spearman': "Spearman",
+    'cramers_v': "Cramér's V",
+}
+MAX_CACHED_PAIRS = 50_000
+# Free-text columns are not meaningful in a contingency table
+MAX_CRAMERS_LEVELS = 100
+
+_pairs = OrderedDict()
+_lock = threading.Lock()
+
+
+def column_digest(series):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(series.dtype).encode('utf-8'))
+    digest.update(pd.util.hash_pandas_object(series, index=False).values.tobytes())
+    return digest.hexdigest()
+
+
+def column_digests(df):
+    return {col: column_digest(df[col]) for col in df.columns}
+
+
+def is_numeric_column(series):
+    return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+
+
+def is_categorical_column(series):
+    return (isinstance(series.dtype, pd.CategoricalDtype) or pd.api.types.is_object_dtype(series)
+            or pd.api.types.is_bool_dtype(series))
+
+
+def _cached(key):
+    with _lock:
+        value = _pairs.get(key)
+        if value is not None:
+            _pairs.move_to_end(key)
+        return value
+
+
+def _remember(entries):
+    with _lock:
+        _pairs.update(entries)
+        while len(_pairs) > MAX_CACHED_PAIRS:
+            _pairs.popitem(last=False)
+
+
+def clear_cache():
+    with _lock:
+        _pairs.clear()
+
+
+def _pair_key(method, a, b):
+    return (method,) + tuple(sorted((a, b)))
+
+
+# === Pearson / Spearman ===
+
+def _prepared(series, method):
+    values = series.rank() if method == 'spearman' else series
+    values = values.to_numpy(dtype='float64', na_value=np.nan)
+    values[~np.isfinite(values)] = np.nan
+    # Shift by the mean so the sums of squares do not lose precision
+    return values - np.nanmean(values) if np.isfinite(values).any() else values
+
+
+def _correlation_from_stats(stats):
+    n, sx, sy, sxx, syy, sxy = stats
+    if n < 2:
+        return np.nan
+    ssx = sxx - sx * sx / n
+    ssy = syy - sy * sy / n
+    if ssx <= 0 or ssy <= 0:
+        return np.nan
+    return float(np.clip((sxy - sx * sy / n) / np.sqrt(ssx * ssy), -1.0, 1.0))
+
+
+def _linear_matrix(df, method, digests):
+    columns = [col for col in df.columns if is_numeric_column(df[col])]
+    keys = [digests[col] for col in columns]
+    k = len(columns)
+
+    # Columns that take part in at least one pair missing from the cache
+    stale = sorted({i for i in range(k) for j in range(k)
+                    if _cached(_pair_key(method, keys[i], keys[j])) is None})
+    if stale:
+        values = np.column_stack([_prepared(df[col], method) for col in columns])
+        valid = np.isfinite(values)
+        x = np.where(valid, values, 0.0)
+        mask = valid.astype('float64')
+        x_new, mask_new = x[:, stale], mask[:, stale]
+        # Pairwise-complete sums for the stale columns against every column
+        n = mask_new.T @ mask
+        sx = x_new.T @ mask
+        sy = mask_new.T @ x
+        sxx = (x_new * x_new).T @ mask
+        syy = mask_new.T @ (x * x)
+        sxy = x_new.T @ x
+        _remember({
+            _pair_key(method, keys[i], keys[j]): (n[a, j], sx[a, j], sy[a, j], sxx[a, j], syy[a, j], sxy[a, j])
+            for a, i in enumerate(stale) for j in range(k)
+        })
+
+    matrix = np.empty((k, k))
+    for i in range(k):
+        for j in range(i, k):
+            stats = _cached(_pair_key(method, keys[i], keys[j]))
+            # Stats are stored for one orientation, r is symmetric in it
+            matrix[i, j] = matrix[j, i] = _correlation_from_stats(stats)
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+# === Cramér's V ===
+
+def cramers_v(a_codes, b_codes, a_levels, b_levels):
+    """Cramér's V of two factorized columns (codes of -1 are missing)"""
+    return chi_square(count_table(a_codes, b_codes, a_levels, b_levels))['cramers_v']
+
+
+def _cramers_matrix(df, digests):
+    factorized = {}
+    for col in df.columns:
+        if is_categorical_column(df[col]):
+            codes, uniques = pd.factorize(df[col])
+            if 1 < len(uniques) <= MAX_CRAMERS_LEVELS:
+                factorized[col] = (codes, len(uniques))
+    columns = list(factorized)
+    k = len(columns)
+
+    matrix = np.eye(k)
+    computed = {}
+    for i in range(k):
+        for j in range(i + 1, k):
+            key = _pair_key('cramers_v', digests[columns[i]], digests[columns[j]])
+            value = _cached(key)
+            if value is None:
+                (a, a_levels), (b, b_levels) = factorized[columns[i]], factorized[columns[j]]
+                value = computed[key] = cramers_v(a, b, a_levels, b_levels)
+            matrix[i, j] = matrix[j, i] = value
+    _remember(computed)
+    return pd.DataFrame(matrix, index=columns, columns=columns)
+
+
+def correlation_matrix(df, method='pearson', digests=None):
+    """Correlation matrix of the numeric (Pearson/Spearman) or categorical (Cramér's V) columns.
+
+    Pearson uses pairwise-complete rows like DataFrame.corr(); Spearman ranks each
+    column once over its non-missing values.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown correlation method: {method}")
+    if digests is None:
+        digests = column_digests(df)
+    if method == 'cramers_v':
+        return _cramers_matrix(df, digests)
+    return _linear_matrix(df, method, digests)
@@ -1,37 +1,351 @@
+import re
+import threading
+from collections import OrderedDict
+
 import pandas as pd
 import numpy as np
 
+CATEGORICAL_COLUMNS = [
+    'Gender', 'Country', 'self_employed', 'family_history', 'treatment',
+    'work_interfere', 'no_employees', 'remote_work', 'tech_company', 'benefits',
+    'care_options', 'wellness_program', 'seek_help', 'anonymity', 'leave',
+    'mental_health_consequence', 'phys_health_consequence', 'coworkers',
+    'supervisor', 'mental_health_interview', 'phys_health_interview',
+    'mental_vs_physical', 'obs_consequence']
+NUMERIC_COLUMNS = ['Years_in_Tech', 'Years_in_Current_Role', 'Sick_Leave_Days', 'Average_Weekly_Hours']
+
 def clean_data(df):
     df = df.copy()  
     df = clean_timestamp(df)
     df = clean_age(df)
-    df = clean_gender(df)
-    df = clean_country(df)
-    df = clean_self_employed(df)
-    df = clean_family_history(df)
-    df = clean_treatment(df)
-    df = clean_work_interfere(df)
-    df = clean_no_employees(df)
-    df = clean_remote_work(df)
-    df = clean_tech_company(df)
-    df = clean_benefits(df)
-    df = clean_care_options(df)
-    df = clean_wellness_program(df)
-    df = clean_seek_help(df)
-    df = clean_anonymity(df)
-    df = clean_leave(df)
-    df = clean_mental_health_consequence(df)
-    df = clean_phys_health_consequence(df)
-    df = clean_coworkers(df)
-    df = clean_supervisor(df)
-    df = clean_mental_health_interview(df)
-    df = clean_phys_health_interview(df)
-    df = clean_mental_vs_physical(df)
-    df = clean_obs_consequence(df)
+    df = normalize_columns(df)
     df = handle_missing_values(df)
     df = convert_data_types(df)   
     return df
 
+def _to_value(values, target):
+    return {value: target for value in values}
+
+def _gender_text(value):
+    return str(value).lower()
+
+def _employees_text(value):
+    return re.sub(r'\s+', '', str(value).strip().lower())
+
+# Country names clean_data recognizes. Unseen spellings are fuzzy matched against
+# them, and any name listed here is kept as typed instead of being "corrected"
+# into a neighbour (Iceland is not a typo of Ireland)
+COUNTRIES = [
+    'Afghanistan', 'Albania', 'Algeria', 'Andorra', 'Angola', 'Antigua and Barbuda', 'Argentina', 'Armenia',
+    'Australia', 'Austria', 'Azerbaijan', 'Bahamas', 'Bahrain', 'Bangladesh', 'Barbados', 'Belarus', 'Belgium',
+    'Belize', 'Benin', 'Bhutan', 'Bolivia', 'Bosnia and Herzegovina', 'Botswana', 'Brazil', 'Brunei',
+    'Bulgaria', 'Burkina Faso', 'Burundi', 'Cambodia', 'Cameroon', 'Canada', 'Cape Verde',
+    'Central African Republic', 'Chad', 'Chile', 'China', 'Colombia', 'Comoros', 'Congo', 'Costa Rica',
+    'Croatia', 'Cuba', 'Cyprus', 'Czech Republic', 'Denmark', 'Djibouti', 'Dominica', 'Dominican Republic',
+    'Ecuador', 'Egypt', 'El Salvador', 'Equatorial Guinea', 'Eritrea', 'Estonia', 'Eswatini', 'Ethiopia',
+    'Fiji', 'Finland', 'France', 'Gabon', 'Gambia', 'Georgia', 'Germany', 'Ghana', 'Greece', 'Grenada',
+    'Guatemala', 'Guinea', 'Guinea-Bissau', 'Guyana', 'Haiti', 'Honduras', 'Hong Kong', 'Hungary', 'Iceland',
+    'India', 'Indonesia', 'Iran', 'Iraq', 'Ireland', 'Israel', 'Italy', 'Ivory Coast', 'Jamaica', 'Japan',
+    'Jordan', 'Kazakhstan', 'Kenya', 'Kiribati', 'Kosovo', 'Kuwait', 'Kyrgyzstan', 'Laos', 'Latvia',
+    'Lebanon', 'Lesotho', 'Liberia', 'Libya', 'Liechtenstein', 'Lithuania', 'Luxembourg', 'Macau',
+    'Madagascar', 'Malawi', 'Malaysia', 'Maldives', 'Mali', 'Malta', 'Marshall Islands', 'Mauritania',
+    'Mauritius', 'Mexico', 'Micronesia', 'Moldova', 'Monaco', 'Mongolia', 'Montenegro', 'Morocco',
+    'Mozambique', 'Myanmar', 'Namibia', 'Nauru', 'Nepal', 'Netherlands', 'New Zealand', 'Nicaragua', 'Niger',
+    'Nigeria', 'North Korea', 'North Macedonia', 'Norway', 'Oman', 'Pakistan', 'Palau', 'Palestine', 'Panama',
+    'Papua New Guinea', 'Paraguay', 'Peru', 'Philippines', 'Poland', 'Portugal', 'Puerto Rico', 'Qatar',
+    'Romania', 'Russia', 'Rwanda', 'Saint Kitts and Nevis', 'Saint Lucia', 'Saint Vincent and the Grenadines',
+    'Samoa', 'San Marino', 'Sao Tome and Principe', 'Saudi Arabia', 'Senegal', 'Serbia', 'Seychelles',
+    'Sierra Leone', 'Singapore', 'Slovakia', 'Slovenia', 'Solomon Islands', 'Somalia', 'South Africa',
+    'South Korea', 'South Sudan', 'Spain', 'Sri Lanka', 'Sudan', 'Suriname', 'Sweden', 'Switzerland', 'Syria',
+    'Taiwan', 'Tajikistan', 'Tanzania', 'Thailand', 'Timor-Leste', 'Togo', 'Tonga', 'Trinidad and Tobago',
+    'Tunisia', 'Turkey', 'Turkmenistan', 'Tuvalu', 'Uganda', 'Ukraine', 'United Arab Emirates',
+    'United Kingdom', 'United States', 'Uruguay', 'Uzbekistan', 'Vanuatu', 'Vatican City', 'Venezuela',
+    'Vietnam', 'Yemen', 'Zambia', 'Zimbabwe']
+
+# Declarative normalization table, one entry per survey column:
+#   'text'       - function applied to each distinct raw value first (missing values included, like astype(str))
+#   'invalid'    - values turned into NaN
+#   'mapping'    - raw value -> canonical value
+#   'allowed'    - if set, anything else becomes NaN
+#   'vocabulary' - canonical values for fuzzy matching (defaults to 'allowed')
+#   'fuzzy'      - most edits (1-2) a value not in 'mapping' may be from a mapping key or vocabulary
+#                  entry to take its canonical value, ignoring case and extra spaces (see FuzzyMatcher)
+#   'markers'    - canonical value -> words that only answers of that value contain; a value holding
+#                  markers of one canonical value is never fuzzy matched to another
+# Rules run on the distinct values only, then the row codes are remapped in one pass.
+NORMALIZATION_TABLE = {
+    'Gender': {
+        'text': _gender_text,
+        'mapping': {
+            **_to_value(['m', 'male-ish', 'maile', 'something kinda male?', 'male', 'cis male',
+                         'mal', 'male ', ' male', 'male (cis)', 'make', 'guy (-ish) ^_^',
+                         'male leaning androgynous', 'man', 'mail', 'malr', 'cis man',
+                         'ostensibly male, unsure what that really means'], 'Male'),
+            **_to_value(['female', 'cis female', 'f', 'woman', 'femake', 'cis-female/femme',
+                         'female (cis)', 'femail', 'female ', ' female'], 'Female'),
+            **_to_value(['trans-female', 'queer/she/they', 'non-binary', 'genderqueer',
+                         'androgyne', 'agender', 'trans woman', 'neuter', 'female (trans)', 'queer'], 'Non-Binary'),
+        },
+        'allowed': ['Male', 'Female', 'Non-Binary'],
+        'fuzzy': 2,
+        'markers': {
+            'Male': ['m', 'male', 'man', 'men', 'guy', 'boy', 'dude', 'he', 'him'],
+            'Female': ['f', 'female', 'woman', 'women', 'femme', 'girl', 'lady', 'she', 'her'],
+            'Non-Binary': ['trans', 'transgender', 'queer', 'genderqueer', 'non-binary', 'nonbinary', 'nb',
+                           'enby', 'agender', 'bigender', 'androgyne', 'androgynous', 'fluid', 'genderfluid',
+                           'neuter', 'they', 'them'],
+        },
+    },
+    'Country': {
+        'mapping': {
+            'USA': 'United States',
+            'germant': 'Germany',
+            'russiaaaaa': 'Russia', 'Russiaaaaa': 'Russia',
+            'Bahamas, The': 'Bahamas',
+            'bulgarria': 'Bulgaria',
+            **_to_value(['canada', 'Canada '], 'Canada'),
+            **_to_value(['UK', 'United Kingdom ', 'uk'], 'United Kingdom'),
+        },
+        'vocabulary': COUNTRIES,
+        'fuzzy': 2,
+    },
+    'self_employed': {
+        'mapping': {**_to_value(['YES', 'Y', 'y'], 'Yes'), **_to_value(['NO', 'N', 'n'], 'No')},
+    },
+    'family_history': {
+        'mapping': {**_to_value(['YES', 'Y', 'y', 'yyy'], 'Yes'), **_to_value(['NO', 'nnnn', 'n', 'N'], 'No')},
+    },
+    'treatment': {
+        'allowed': ['Yes', 'No'],
+    },
+    'work_interfere': {
+        'invalid': ['c'],
+        'mapping': {'rarely': 'Rarely', 'oftem': 'Often', 'sometimem': 'Sometimes'},
+    },
+    'no_employees': {
+        'text': _employees_text,
+        'mapping': {'25-jun': '6-25', '05-jan': '5-1', '5-jan': '5-1', 'morethan1000': '1000+'},
+    },
+    'remote_work': {
+        'mapping': {**_to_value(['YES', 'Y', 'y'], 'Yes'), **_to_value(['NO', 'N', 'n'], 'No')},
+    },
+    'tech_company': {
+        'mapping': _to_value(['Y', 'y'], 'Yes'),
+    },
+    'benefits': {
+        'mapping': {**_to_value(['no', 'n', 'N'], 'No'), **_to_value(['yes', 'Y'], 'Yes')},
+        'allowed': ['No', 'Yes'],
+    },
+    'care_options': {
+        'mapping': {
+            **_to_value(['y', 'yess', 'yesss', 'Yesss', 'Y', 'Yess'], 'Yes'),
+            **_to_value(['nop', 'nos', 'n', 'Nop', 'Nos', 'N', 'Not'], 'No'),
+            **_to_value(['Ns', 'Not sure'], 'Not Sure'),
+        },
+    },
+    'wellness_program': {
+        'invalid': ["'''", "'''''", '###', '####', '##3', '0', '?'],
+        'mapping': {'Yess': 'Yes', **_to_value(['N', 'no'], 'No')},
+    },
+    'seek_help': {
+        'mapping': _to_value(['No.', 'NoS', 'Nop', 'Nowise', 'Nos'], 'No'),
+    },
+    'anonymity': {
+        'invalid': ['jnows', '###', '-'],
+    },
+    'leave': {
+        'invalid': ['//c difficult', 'option c', 'option c difficult', '// easy', '//c', '#NOT EASY'],
+        'mapping': {
+            "Don't know~": "Don't know",
+            'Somewhat difficultN': 'Somewhat difficult',
+            **_to_value(['Very_easy', '#Very easy'], 'Very easy'),
+        },
+    },
+    'mental_health_consequence': {
+        'invalid': ['?'],
+    },
+    'phys_health_consequence': {
+        'invalid': ['?', ' '],
+        'mapping': {'Not': 'No', 'Maybee': 'Maybe'},
+    },
+    'coworkers': {
+        'invalid': ['@', 'C'],
+        'mapping': {'Yess': 'Yes', **_to_value(['Some of them ', 'Sot'], 'Some of them')},
+    },
+    'supervisor': {
+        'invalid': ['////'],
+        'mapping': {**_to_value(['N0', 'No.', 'n', '/n', 'NO'], 'No'), '/y': 'Yes'},
+    },
+    'mental_health_interview': {
+        'invalid': ['0', '=', 'Oo', 'O'],
+        'mapping': _to_value(['Nope', 'Nat', 'Nnn', 'N', 'No-no', 'Nn', 'N0', 'Not'], 'No'),
+    },
+    'phys_health_interview': {
+        'invalid': ['vvvvv', '^^6', '^^^', '^^^6', 'TT'],
+        'mapping': {
+            **_to_value(['Ys', 'yS'], 'Yes'),
+            **_to_value(['nop', 'nos', 'n', 'Nop', 'Nos', 'N', 'Not', 'N0', 'No-N', 'NAT'], 'No'),
+            **_to_value(['May be', 'Maybe?'], 'Maybe'),
+        },
+    },
+    'mental_vs_physical': {
+        'invalid': ['Nil', '!!!!!', 'T know', '!!!!'],
+        'mapping': {
+            **_to_value(["Don't know!", "Don't", "Don't "], "Don't know"),
+            **_to_value(['Nat', 'No.', 'Noz', 'Not'], 'No'),
+        },
+    },
+    'obs_consequence': {
+        'invalid': ['TT'],
+    },
+}
+
+# Fuzzy matches are cached per vocabulary for the life of the process, so a
+# token is matched once however many uploads contain it; the oldest tokens are
+# evicted past this many
+FUZZY_CACHE_MAX_TOKENS = 100_000
+# Shorter tokens are never fuzzy matched: 'p', 'fem' or 'uk' are as close to a
+# different answer as to the one they may have meant
+FUZZY_MIN_LENGTH = 5
+# Tokens shorter than this may be one edit away from their match, longer ones up to spec['fuzzy']
+FUZZY_LONG_TOKEN = 9
+
+def _fold(value):
+    return ' '.join(str(value).split()).casefold()
+
+def _words(key):
+    # 'female-ish' holds 'female' and 'female-ish', 'non-binary' holds 'non-binary'
+    return set(re.split(r'[^\w]+', key)) | set(re.split(r'[^\w-]+', key))
+
+def edit_distance(a, b, limit):
+    """Edits (insert, delete, substitute, swap two neighbours) turning a into b; limit + 1 once above limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return min(current[-1], limit + 1)
+
+class FuzzyMatcher:
+    """Canonical value of a token, from a spec's mapping keys and vocabulary.
+
+    A token not found after folding case and spaces is matched only when it is
+    unambiguous: it is long enough, every mapping key or vocabulary entry within
+    the allowed edits has the same canonical value, and it names no marker of a
+    different canonical value. Anything else is left for 'allowed' to reject, as
+    an unlisted value always was.
+    """
+
+    def __init__(self, spec):
+        self.max_edits = spec['fuzzy']
+        self.targets = {}
+        for raw, canonical in spec.get('mapping', {}).items():
+            self.targets.setdefault(_fold(raw), canonical)
+        for canonical in spec.get('vocabulary', spec.get('allowed', ())):
+            self.targets[_fold(canonical)] = canonical
+        self.markers = {}
+        for canonical, words in spec.get('markers', {}).items():
+            for word in words:
+                self.markers[_fold(word)] = canonical
+        self.cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    def closest(self, key):
+        """Canonical value of the only answer within reach of a folded token, or None"""
+        if len(key) < FUZZY_MIN_LENGTH:
+            return None
+        named = {self.markers[word] for word in _words(key) if word in self.markers}
+        if len(named) > 1:
+            # 'trans man' names two answers, no spelling fix can choose between them
+            return None
+        limit = 1 if len(key) < FUZZY_LONG_TOKEN else self.max_edits
+        within = {canonical for choice, canonical in self.targets.items()
+                  if edit_distance(key, choice, limit) <= limit}
+        if len(within) != 1:
+            return None
+        canonical = within.pop()
+        if named and canonical not in named:
+            # 'cis woman' is two edits from 'cis man', but says woman
+            return None
+        return canonical
+
+    def match(self, value):
+        """Canonical value for value, or None if nothing matches it unambiguously"""
+        key = _fold(value)
+        with self._lock:
+            if key in self.cache:
+                return self.cache[key]
+        canonical = self.targets.get(key)
+        if canonical is None:
+            canonical = self.closest(key)
+        with self._lock:
+            self.cache[key] = canonical
+            while len(self.cache) > FUZZY_CACHE_MAX_TOKENS:
+                self.cache.popitem(last=False)
+        return canonical
+
+_matchers = {}
+
+def fuzzy_matcher(spec):
+    """Shared FuzzyMatcher of a spec (None if the spec has no 'fuzzy' edit limit)"""
+    if spec.get('fuzzy') is None:
+        return None
+    key = (tuple(spec.get('mapping', {}).items()), tuple(spec.get('vocabulary', spec.get('allowed', ()))),
+           spec['fuzzy'], tuple((canonical, tuple(words)) for canonical, words in spec.get('markers', {}).items()))
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers.setdefault(key, FuzzyMatcher(spec))
+    return matcher
+
+def _normalize_value(value, spec, matcher=None):
+    if pd.isna(value):
+        return np.nan
+    if value in spec.get('invalid', ()):
+        return np.nan
+    mapping = spec.get('mapping', {})
+    if value in mapping:
+        value = mapping[value]
+    elif matcher is not None:
+        value = matcher.match(value) or value
+    allowed = spec.get('allowed')
+    if allowed is not None and value not in allowed:
+        return np.nan
+    return value
+
+def normalize_series(series, spec):
+    # One pass to factorize the rows, rules on the distinct values, one pass to remap the codes
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    uniques = list(uniques)
+    text = spec.get('text')
+    if text is not None:
+        if (codes == -1).any():
+            uniques.append(np.nan)
+            codes = np.where(codes == -1, len(uniques) - 1, codes)
+        uniques = [text(value) for value in uniques]
+    matcher = fuzzy_matcher(spec)
+    normalized = [_normalize_value(value, spec, matcher) for value in uniques]
+    remap, categories = pd.factorize(pd.Index(normalized, dtype=object), use_na_sentinel=True)
+    new_codes = np.where(codes >= 0, remap.take(codes, mode='clip'), -1) if len(remap) else codes
+    result = pd.Categorical.from_codes(new_codes, categories=categories)
+    try:
+        result = result.reorder_categories(sorted(categories))
+    except TypeError:
+        pass
+    return pd.Series(result, index=series.index, name=series.name)
+
+def normalize_columns(df, columns=None):
+    for col in (NORMALIZATION_TABLE if columns is None else columns):
+        if col in df.columns:
+            df[col] = normalize_series(df[col], NORMALIZATION_TABLE[col])
+    return df
+
 def clean_timestamp(df):
     if 'Timestamp' in df.columns:
         df['Timestamp'] = pd.to_datetime(df['Timestamp'], errors='coerce').dt.year
@@ -43,199 +357,75 @@ def clean_age(df):
         df.loc[(df['Age'] < 18) | (df['Age'] > 72), 'Age'] = np.nan
     return df
 
+# Per-column wrappers kept for compatibility, each is one pass through NORMALIZATION_TABLE
 def clean_gender(df):
-    if 'Gender' in df.columns:
-        df['Gender'] = df['Gender'].astype(str).str.lower()    
-        naccept_male = ['m', 'male-ish', 'maile', 'something kinda male?', 'male', 'cis male',
-                       'mal', 'male ', ' male', 'male (cis)', 'make', 'guy (-ish) ^_^',
-                       'male leaning androgynous', 'man', 'mail', 'malr', 'cis man',
-                       'ostensibly male, unsure what that really means'] 
-        naccept_female = ['female', 'cis female', 'f', 'woman', 'femake', 'cis-female/femme',
-                         'female (cis)', 'femail', 'female ', ' female']
-        naccept_non_binary = ['trans-female', 'queer/she/they', 'non-binary', 'genderqueer',
-                             'androgyne', 'agender', 'trans woman', 'neuter', 'female (trans)', 'queer']
-        df['Gender'] = df['Gender'].replace(naccept_male, 'Male')
-        df['Gender'] = df['Gender'].replace(naccept_female, 'Female')
-        df['Gender'] = df['Gender'].replace(naccept_non_binary, 'Non-Binary') 
-        accept_values = ['Male', 'Female', 'Non-Binary']
-        for row in df['Gender'].unique():
-            if row not in accept_values and pd.notna(row):
-                df.loc[df['Gender'] == row, 'Gender'] = np.nan
-    return df
+    return normalize_columns(df, ['Gender'])
 
 def clean_country(df):
-    if 'Country' in df.columns:
-        df['Country'] = df['Country'].replace('USA', 'United States')
-        df['Country'] = df['Country'].replace('germant', 'Germany')
-        df['Country'] = df['Country'].replace(['russiaaaaa', 'Russiaaaaa'], 'Russia')
-        df['Country'] = df['Country'].replace('Bahamas, The', 'Bahamas')
-        df['Country'] = df['Country'].replace('bulgarria', 'Bulgaria')
-        canada_variations = ['canada', 'Canada ']
-        df['Country'] = df['Country'].replace(canada_variations, 'Canada')
-        uk_variations = ['UK', 'United Kingdom ', 'uk']
-        df['Country'] = df['Country'].replace(uk_variations, 'United Kingdom')
-    return df
+    return normalize_columns(df, ['Country'])
 
 def clean_self_employed(df):
-    if 'self_employed' in df.columns:
-        yes_values = ['YES', 'Y', 'y']
-        no_values = ['NO', 'N', 'n']
-        df['self_employed'] = df['self_employed'].replace(yes_values, 'Yes')
-        df['self_employed'] = df['self_employed'].replace(no_values, 'No')
-    return df
+    return normalize_columns(df, ['self_employed'])
 
 def clean_family_history(df):
-    if 'family_history' in df.columns:
-        yes_values = ['YES', 'Y', 'y', 'yyy']
-        no_values = ['NO', 'nnnn', 'n', 'N']
-        df['family_history'] = df['family_history'].replace(yes_values, 'Yes')
-        df['family_history'] = df['family_history'].replace(no_values, 'No')
-    return df
+    return normalize_columns(df, ['family_history'])
 
 def clean_treatment(df):
-    if 'treatment' in df.columns:
-        acceptable_values = ['Yes', 'No']
-        df.loc[~df['treatment'].isin(acceptable_values), 'treatment'] = np.nan
-    return df
+    return normalize_columns(df, ['treatment'])
 
 def clean_work_interfere(df):
-    if 'work_interfere' in df.columns:
-        df['work_interfere'] = df['work_interfere'].replace('rarely', 'Rarely')
-        df['work_interfere'] = df['work_interfere'].replace('oftem', 'Often')
-        df['work_interfere'] = df['work_interfere'].replace('sometimem', 'Sometimes')
-        df.loc[df['work_interfere'] == 'c', 'work_interfere'] = np.nan
-    return df
+    return normalize_columns(df, ['work_interfere'])
 
 def clean_no_employees(df):
-    if 'no_employees' in df.columns:
-        df['no_employees'] = (
-            df['no_employees'].astype(str).str.strip().str.lower().str.replace(r'\s+', '', regex=True).replace({'25-jun': '6-25','05-jan': '5-1','5-jan': '5-1','morethan1000': '1000+'}))
-    return df
+    return normalize_columns(df, ['no_employees'])
 
 def clean_remote_work(df):
-    if 'remote_work' in df.columns:
-        yes_values = ['YES', 'Y', 'y']
-        no_values = ['NO', 'N', 'n'] 
-        df['remote_work'] = df['remote_work'].replace(yes_values, 'Yes')
-        df['remote_work'] = df['remote_work'].replace(no_values, 'No')
-    return df
+    return normalize_columns(df, ['remote_work'])
 
 def clean_tech_company(df):
-    if 'tech_company' in df.columns:
-        df['tech_company'] = df['tech_company'].replace('Y', 'Yes')
-        df['tech_company'] = df['tech_company'].replace('y', 'Yes')
-    return df
-
+    return normalize_columns(df, ['tech_company'])
 
 def clean_benefits(df):
-    if 'benefits' in df.columns:
-        no_values = ['no', 'n', 'N']
-        yes_values = ['yes', 'Y'] 
-        df['benefits'] = df['benefits'].replace(no_values, 'No')
-        df['benefits'] = df['benefits'].replace(yes_values, 'Yes')
-        acceptable_values = ['No', 'Yes']
-        df.loc[~df['benefits'].isin(acceptable_values), 'benefits'] = np.nan
-    return df
+    return normalize_columns(df, ['benefits'])
 
 def clean_care_options(df):
-    if 'care_options' in df.columns:
-        yes_values = ['y', 'yess', 'yesss', 'Yesss', 'Y', 'Yess']
-        no_values = ['nop', 'nos', 'n', 'Nop', 'Nos', 'N', 'Not']
-        df['care_options'] = df['care_options'].replace(yes_values, 'Yes')
-        df['care_options'] = df['care_options'].replace(no_values, 'No')
-        df['care_options'] = df['care_options'].replace(['Ns', 'Not sure'], 'Not Sure')
-    return df
+    return normalize_columns(df, ['care_options'])
 
 def clean_wellness_program(df):
-    if 'wellness_program' in df.columns:
-        df['wellness_program'] = df['wellness_program'].replace('Yess', 'Yes')
-        df['wellness_program'] = df['wellness_program'].replace(['N', 'no'], 'No')
-        invalid_values = ["'''", "'''''", '###', '####', '##3', '0', '?']
-        df['wellness_program'] = df['wellness_program'].replace(invalid_values, np.nan)
-    return df
+    return normalize_columns(df, ['wellness_program'])
 
 def clean_seek_help(df):
-    if 'seek_help' in df.columns:
-        no_values = ['No.', 'NoS', 'Nop', 'Nowise', 'Nos']
-        df['seek_help'] = df['seek_help'].replace(no_values, 'No')
-    return df
+    return normalize_columns(df, ['seek_help'])
 
 def clean_anonymity(df):
-    if 'anonymity' in df.columns:
-        invalid_values = ['jnows', '###', '-']
-        df['anonymity'] = df['anonymity'].replace(invalid_values, np.nan)
-    return df
+    return normalize_columns(df, ['anonymity'])
 
 def clean_leave(df):
-    if 'leave' in df.columns:
-        invalid_values = ['//c difficult', 'option c', 'option c difficult', '// easy','//c', '#NOT EASY']
-        df['leave'] = df['leave'].replace(invalid_values, np.nan)
-        df['leave'] = df['leave'].replace("Don't know~", "Don't know")
-        df['leave'] = df['leave'].replace('Somewhat difficultN', 'Somewhat difficult')
-        df['leave'] = df['leave'].replace(['Very_easy', '#Very easy'], 'Very easy')
-    return df
+    return normalize_columns(df, ['leave'])
 
 def clean_mental_health_consequence(df):
-    if 'mental_health_consequence' in df.columns:
-        df['mental_health_consequence'] = df['mental_health_consequence'].replace('?', np.nan)
-    return df
-
+    return normalize_columns(df, ['mental_health_consequence'])
 
 def clean_phys_health_consequence(df):
-    if 'phys_health_consequence' in df.columns:
-        df['phys_health_consequence'] = df['phys_health_consequence'].replace(['?', ' '], np.nan)
-        df['phys_health_consequence'] = df['phys_health_consequence'].replace('Not', 'No')
-        df['phys_health_consequence'] = df['phys_health_consequence'].replace('Maybee', 'Maybe')
-    return df
+    return normalize_columns(df, ['phys_health_consequence'])
 
 def clean_coworkers(df):
-    if 'coworkers' in df.columns:
-        df['coworkers'] = df['coworkers'].replace(['@', 'C'], np.nan)
-        df['coworkers'] = df['coworkers'].replace('Yess', 'Yes')
-        df['coworkers'] = df['coworkers'].replace(['Some of them ', 'Sot'], 'Some of them')
-    return df
+    return normalize_columns(df, ['coworkers'])
 
 def clean_supervisor(df):
-    if 'supervisor' in df.columns:
-        no_values = ['N0', 'No.', 'n', '/n', 'NO']
-        df['supervisor'] = df['supervisor'].replace(no_values, 'No')
-        df['supervisor'] = df['supervisor'].replace('/y', 'Yes')
-        df['supervisor'] = df['supervisor'].replace('////', np.nan)
-    return df
+    return normalize_columns(df, ['supervisor'])
 
 def clean_mental_health_interview(df):
-    if 'mental_health_interview' in df.columns:
-        no_values = ['Nope', 'Nat', 'Nnn', 'N', 'No-no', 'Nn', 'N0', 'Not']
-        df['mental_health_interview'] = df['mental_health_interview'].replace(no_values, 'No')  
-        invalid_values = ['0', '=', 'Oo', 'O']
-        df['mental_health_interview'] = df['mental_health_interview'].replace(invalid_values, np.nan)
-    return df
+    return normalize_columns(df, ['mental_health_interview'])
 
 def clean_phys_health_interview(df):
-    if 'phys_health_interview' in df.columns:
-        yes_values = ['Ys', 'yS']
-        no_values = ['nop', 'nos', 'n', 'Nop', 'Nos', 'N', 'Not', 'N0', 'No-N', 'NAT']
-        invalid_values = ['vvvvv', '^^6', '^^^', '^^^6', 'TT']   
-        df['phys_health_interview'] = df['phys_health_interview'].replace(invalid_values, np.nan)
-        df['phys_health_interview'] = df['phys_health_interview'].replace(yes_values, 'Yes')
-        df['phys_health_interview'] = df['phys_health_interview'].replace(no_values, 'No')
-        df['phys_health_interview'] = df['phys_health_interview'].replace(['May be', 'Maybe?'], 'Maybe')
-    return df
+    return normalize_columns(df, ['phys_health_interview'])
 
 def clean_mental_vs_physical(df):
-    if 'mental_vs_physical' in df.columns:
-        invalid_values = ['Nil', '!!!!!', 'T know', '!!!!']
-        df['mental_vs_physical'] = df['mental_vs_physical'].replace(invalid_values, np.nan)   
-        dont_know_values = ["Don't know!", "Don't", 'T know', "Don't "]
-        df['mental_vs_physical'] = df['mental_vs_physical'].replace(dont_know_values, "Don't know")  
-        no_values = ['Nat', 'No.', 'Noz', 'Not']
-        df['mental_vs_physical'] = df['mental_vs_physical'].replace(no_values, 'No')
-    return df
+    return normalize_columns(df, ['mental_vs_physical'])
 
 def clean_obs_consequence(df):
-    if 'obs_consequence' in df.columns:
-        df['obs_consequence'] = df['obs_consequence'].replace('TT', np.nan)  
-    return df
+    return normalize_columns(df, ['obs_consequence'])
 
 def handle_missing_values(df):
     if 'Age' in df.columns:
@@ -247,18 +437,10 @@ def convert_data_types(df):
         df['Timestamp'] = df['Timestamp'].astype('int32')
     if 'Age' in df.columns:
         df['Age'] = pd.to_numeric(df['Age'], errors='coerce').astype('Int64')
-    categorical_cols = [
-        'Gender', 'Country', 'self_employed', 'family_history', 'treatment',
-        'work_interfere', 'no_employees', 'remote_work', 'tech_company', 'benefits',
-        'care_options', 'wellness_program', 'seek_help', 'anonymity', 'leave',
-        'mental_health_consequence', 'phys_health_consequence', 'coworkers',
-        'supervisor', 'mental_health_interview', 'phys_health_interview',
-        'mental_vs_physical', 'obs_consequence'] 
-    for col in categorical_cols:
+    for col in CATEGORICAL_COLUMNS:
         if col in df.columns:
             df[col] = df[col].astype('category')
-    numeric_cols = ['Years_in_Tech', 'Years_in_Current_Role', 'Sick_Leave_Days', 'Average_Weekly_Hours']
-    for col in numeric_cols:
+    for col in NUMERIC_COLUMNS:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors='coerce').astype('int64')
     return df
\ No newline at end of file
@@ -0,0 +1,149 @@
+import base64
+import codecs
+import io
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from data_cleaning import NUMERIC_COLUMNS, clean_data
+from metrics import log_event, parse_timer
+
+# Streaming ingest for dcc.Upload contents.
+# The base64 payload is decoded block by block while pandas reads it, so the
+# full file never exists as one bytes object or one Python string, and each
+# parsed chunk is cleaned before the next one is read. Chunks are parsed as
+# text: read_csv would infer types per chunk, and a column numeric in one chunk
+# but not in the next would come out as mixed ints and strings. clean_data
+# types the survey columns itself; the columns it leaves as text are inferred
+# once, over the whole upload (infer_text_columns). Columns clean_data coerces
+# with pd.to_numeric keep read_csv's fast numeric parsing: whatever type a
+# chunk gives them, they end up numeric.
+
+CHUNK_ROWS = 20_000
+SNIFF_BYTES = 64 * 1024
+COERCED_COLUMNS = ['Age'] + NUMERIC_COLUMNS
+_BASE64_BLOCK = 4 * 64 * 1024  # must stay a multiple of 4
+
+
+class Base64Reader(io.RawIOBase):
+    """Read-only binary stream over a base64 string, decoded lazily"""
+
+    def __init__(self, data):
+        self._data = data
+        self._pos = 0
+        self._pending = memoryview(b'')
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        # Short reads are fine for a raw stream; serve what is left of the current block
+        if not self._pending and self._pos < len(self._data):
+            block = self._data[self._pos:self._pos + _BASE64_BLOCK]
+            self._pos += len(block)
+            self._pending = memoryview(base64.b64decode(block))
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def sniff_encoding(content_string):
+    """Pick the CSV encoding from the first SNIFF_BYTES of the payload"""
+    prefix_chars = (SNIFF_BYTES // 3 + 1) * 4
+    prefix = base64.b64decode(content_string[:prefix_chars])
+    if prefix.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    try:
+        # Incremental decoder tolerates a multi-byte character cut at the end of the prefix
+        codecs.getincrementaldecoder('utf-8')().decode(prefix, final=False)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        return 'latin-1'
+
+
+def concat_chunks(chunks):
+    """Concatenate cleaned chunks, keeping categorical columns categorical"""
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    columns = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            try:
+                merged = union_categoricals(parts, sort_categories=True)
+            except TypeError:
+                # Category dtypes differ between chunks (e.g. an all-missing chunk)
+                merged = pd.Categorical(pd.concat([part.astype(object) for part in parts]))
+            columns[col] = pd.Series(merged, name=col)
+        else:
+            columns[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns)
+
+
+_BOOLEANS = {'True': True, 'TRUE': True, 'true': True, 'False': False, 'FALSE': False, 'false': False}
+
+
+def infer_text_column(series):
+    """series with the type read_csv would have given the whole column (numbers, booleans), else as is"""
+    values = series.dropna()
+    if values.empty or not pd.api.types.is_object_dtype(series) or \
+            pd.api.types.infer_dtype(values, skipna=False) != 'string':
+        return series
+    try:
+        return pd.to_numeric(series)
+    except (TypeError, ValueError):
+        pass
+    if not series.isna().any() and values.isin(list(_BOOLEANS)).all():
+        return series.map(_BOOLEANS).astype(bool)
+    return series
+
+
+def infer_text_columns(df):
+    for col in df.columns:
+        inferred = infer_text_column(df[col])
+        if inferred is not df[col]:
+            df[col] = inferred
+    return df
+
+
+def text_dtypes(content_string, encoding):
+    """read_csv dtype argument parsing every column as text except COERCED_COLUMNS"""
+    prefix_chars = (SNIFF_BYTES // 3 + 1) * 4
+    prefix = base64.b64decode(content_string[:prefix_chars])
+    try:
+        header = pd.read_csv(io.BytesIO(prefix), encoding=encoding, nrows=0).columns
+    except (ValueError, UnicodeDecodeError):  # header longer than the prefix, or cut in a character
+        return str
+    if len(content_string) > prefix_chars and b'\n' not in prefix:
+        return str
+    return {col: str for col in header if col not in COERCED_COLUMNS}
+
+
+def _read_and_clean(content_string, encoding, chunksize):
+    stream = io.BufferedReader(Base64Reader(content_string))
+    reader = pd.read_csv(stream, encoding=encoding, chunksize=chunksize, dtype=text_dtypes(content_string, encoding))
+    raw_rows = 0
+    chunks = []
+    for chunk in reader:
+        raw_rows += len(chunk)
+        chunks.append(clean_data(chunk))
+    return chunks, raw_rows
+
+
+def read_uploaded_csv(contents, chunksize=CHUNK_ROWS):
+    """Parse and clean a dcc.Upload 'data:...;base64,...' payload chunk by chunk"""
+    content_type, content_string = contents.split(',', 1)
+    encoding = sniff_encoding(content_string)
+    # Chunks are cleaned as they are parsed, so parse time includes cleaning
+    with parse_timer():
+        try:
+            chunks, raw_rows = _read_and_clean(content_string, encoding, chunksize)
+        except UnicodeDecodeError:
+            # A non UTF-8 byte appeared after the sniffed prefix
+            encoding = 'latin-1'
+            chunks, raw_rows = _read_and_clean(content_string, encoding, chunksize)
+        if not chunks:
+            return pd.DataFrame()
+        log_event('raw_data_streamed', rows=raw_rows, chunks=len(chunks), encoding=encoding)
+        return infer_text_columns(concat_chunks(chunks))
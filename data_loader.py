@@ -0,0 +1,89 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from data_cleaning import CATEGORICAL_COLUMNS, NUMERIC_COLUMNS
+from data_serializer import decode_dataframe
+from data_store import get_dataset, is_handle
+
+# Shared DataFrame loader used by every page callback.
+# Dataset handles resolve through the server-side registry; raw JSON payloads
+# (older sessions, dict stores) are decoded once per worker and memoized by
+# payload digest, so repeated callbacks on the same payload skip read_json.
+
+MAX_PARSED_PAYLOADS = 8
+
+_parsed = OrderedDict()
+_inflight = {}
+_lock = threading.Lock()
+
+
+def payload_digest(payload):
+    return hashlib.blake2b(payload.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def restore_dtypes(df):
+    """Re-apply the dtypes set by convert_data_types, which the JSON round-trip loses"""
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns and pd.api.types.is_object_dtype(df[col]):
+            df[col] = df[col].astype('category')
+    if 'Age' in df.columns and pd.api.types.is_numeric_dtype(df['Age']):
+        try:
+            df['Age'] = df['Age'].astype('Int64')
+        except (TypeError, ValueError):
+            pass
+    if 'Timestamp' in df.columns and pd.api.types.is_integer_dtype(df['Timestamp']):
+        df['Timestamp'] = df['Timestamp'].astype('int32')
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns and pd.api.types.is_integer_dtype(df[col]):
+            df[col] = df[col].astype('int64')
+    return df
+
+
+def _parse_json(payload):
+    key = payload_digest(payload)
+    with _lock:
+        if key in _parsed:
+            _parsed.move_to_end(key)
+            return _parsed[key]
+        key_lock = _inflight.setdefault(key, threading.Lock())
+
+    # Only one thread parses a given payload, the others wait for its result
+    with key_lock:
+        with _lock:
+            if key in _parsed:
+                return _parsed[key]
+        try:
+            df = restore_dtypes(decode_dataframe(payload, 'json'))
+            with _lock:
+                _parsed[key] = df
+                while len(_parsed) > MAX_PARSED_PAYLOADS:
+                    _parsed.popitem(last=False)
+        finally:
+            with _lock:
+                _inflight.pop(key, None)
+    return df
+
+
+def load_dataframe(stored_data):
+    """Resolve the contents of a dcc.Store to a DataFrame (None if there is no data).
+
+    Accepts a dataset handle, a JSON 'split' payload or a dict. The returned frame
+    is shared between callbacks and must not be modified in place.
+    """
+    if stored_data is None:
+        return None
+    if isinstance(stored_data, str):
+        if is_handle(stored_data):
+            return get_dataset(stored_data)
+        return _parse_json(stored_data)
+    if isinstance(stored_data, dict):
+        return pd.DataFrame(stored_data)
+    raise ValueError(f"Unexpected data type: {type(stored_data)}")
+
+
+def clear_cache():
+    with _lock:
+        _parsed.clear()
@@ -0,0 +1,116 @@
+import pandas as pd
+
+from data_loader import load_dataframe
+from data_store import derive
+
+# Per-column profile of a dataset, built once per dataset version and cached
+# next to it in the registry. The home info card, the univariate statistics
+# cards and the preprocessing missing-value / dtype tables all read from it,
+# so navigating between pages no longer rescans the rows.
+
+TOP_K = 10
+
+
+def dtype_family(dtype):
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'categorical'
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'integer'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'float'
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        return 'datetime'
+    # Arrow-backed strings (see dtype_optimizer) count as text like object columns
+    if pd.api.types.is_object_dtype(dtype) or isinstance(dtype, pd.StringDtype):
+        return 'object'
+    return 'other'
+
+
+class ColumnProfile:
+    """Summary statistics of one column"""
+
+    def __init__(self, name, series, top_k=TOP_K):
+        self.name = name
+        self.dtype = str(series.dtype)
+        self.family = dtype_family(series.dtype)
+        self.total = len(series)
+        self.missing = int(series.isna().sum())
+        self.count = self.total - self.missing
+        self.missing_pct = self.missing / self.total * 100 if self.total else 0.0
+        self.is_numeric = self.family in ('integer', 'float')
+
+        self.mean = self.std = self.min = self.max = None
+        self.q1 = self.median = self.q3 = None
+        self.top_values = pd.Series(dtype='int64')
+        self.cardinality = 0
+
+        clean = series.dropna()
+        if self.is_numeric:
+            if len(clean) > 0:
+                quantiles = clean.quantile([0.25, 0.5, 0.75])
+                self.q1, self.median, self.q3 = (float(q) for q in quantiles)
+                self.mean = float(clean.mean())
+                self.std = float(clean.std())
+                self.min = float(clean.min())
+                self.max = float(clean.max())
+            self.cardinality = int(clean.nunique())
+        else:
+            counts = clean.value_counts()
+            counts = counts[counts > 0]
+            counts.index = counts.index.astype(str)
+            self.cardinality = len(counts)
+            self.top_values = counts.head(top_k)
+
+    @property
+    def most_common(self):
+        if len(self.top_values) == 0:
+            return None, 0
+        return self.top_values.index[0], int(self.top_values.iloc[0])
+
+
+class DatasetProfile:
+    """Column profiles plus dataset-level totals"""
+
+    def __init__(self, df, top_k=TOP_K):
+        self.rows, self.n_columns = df.shape
+        self.columns = {col: ColumnProfile(col, df[col], top_k) for col in df.columns}
+
+    def __getitem__(self, column):
+        return self.columns[column]
+
+    def __contains__(self, column):
+        return column in self.columns
+
+    @property
+    def missing_total(self):
+        return sum(col.missing for col in self.columns.values())
+
+    @property
+    def missing_pct(self):
+        cells = self.rows * self.n_columns
+        return self.missing_total / cells * 100 if cells else 0.0
+
+    def family_counts(self):
+        counts = {}
+        for col in self.columns.values():
+            counts[col.family] = counts.get(col.family, 0) + 1
+        return counts
+
+    def missing_by_column(self):
+        """Columns with missing values, most missing first"""
+        missing = pd.Series({name: col.missing for name, col in self.columns.items()}, dtype='int64')
+        return missing[missing > 0].sort_values(ascending=False)
+
+
+def build_profile(df, top_k=TOP_K):
+    return DatasetProfile(df, top_k)
+
+
+def get_profile(stored_data):
+    """Profile for the contents of a dcc.Store, cached per dataset handle (None if no data)"""
+    df = load_dataframe(stored_data)
+    if df is None:
+        return None
+    return derive(stored_data, 'profile', lambda: build_profile(df))
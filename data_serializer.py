@@ -0,0 +1,155 @@
+import io
+import pickle
+import time
+from collections import namedtuple
+
+import pandas as pd
+
+from metrics import parse_timer
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow backends are optional, JSON/pickle always work
+    pa = None
+
+# Pluggable DataFrame serializers.
+# Arrow IPC and Parquet keep category / Int64 / int32 dtypes and are much
+# smaller and faster than the JSON 'split' format used by the original stores.
+
+Serializer = namedtuple('Serializer', ['name', 'extension', 'mimetype', 'encode', 'decode', 'requires_arrow'])
+
+
+def _arrow_encode(df):
+    table = pa.Table.from_pandas(df, preserve_index=True)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _arrow_decode(data):
+    return pa.ipc.open_file(pa.py_buffer(data)).read_all().to_pandas()
+
+
+def _parquet_encode(df):
+    buffer = io.BytesIO()
+    df.to_parquet(buffer, engine='pyarrow', index=True)
+    return buffer.getvalue()
+
+
+def _parquet_decode(data):
+    return pd.read_parquet(io.BytesIO(data), engine='pyarrow')
+
+
+def _json_encode(df):
+    return df.to_json(date_format='iso', orient='split').encode('utf-8')
+
+
+def _json_decode(data):
+    if isinstance(data, bytes):
+        data = data.decode('utf-8')
+    return pd.read_json(io.StringIO(data), orient='split')
+
+
+def _pickle_encode(df):
+    return pickle.dumps(df, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _pickle_decode(data):
+    return pickle.loads(data)
+
+
+SERIALIZERS = {
+    'arrow': Serializer('arrow', 'arrow', 'application/vnd.apache.arrow.file', _arrow_encode, _arrow_decode, True),
+    'parquet': Serializer('parquet', 'parquet', 'application/vnd.apache.parquet', _parquet_encode, _parquet_decode, True),
+    'json': Serializer('json', 'json', 'application/json', _json_encode, _json_decode, False),
+    'pickle': Serializer('pickle', 'pkl', 'application/octet-stream', _pickle_encode, _pickle_decode, False),
+}
+
+DEFAULT_FORMATS = ['arrow', 'json']
+
+
+def register_serializer(name, extension, mimetype, encode, decode, requires_arrow=False):
+    SERIALIZERS[name] = Serializer(name, extension, mimetype, encode, decode, requires_arrow)
+
+
+def is_available(fmt):
+    serializer = SERIALIZERS.get(fmt)
+    return serializer is not None and (pa is not None or not serializer.requires_arrow)
+
+
+def available_formats():
+    return [fmt for fmt in SERIALIZERS if is_available(fmt)]
+
+
+def arrow_compatible(df):
+    """Arrow cannot round-trip interval/period columns (e.g. the pd.cut output of discretization)"""
+    for dtype in df.dtypes:
+        if isinstance(dtype, pd.CategoricalDtype):
+            dtype = dtype.categories.dtype
+        if isinstance(dtype, (pd.IntervalDtype, pd.PeriodDtype)):
+            return False
+    return True
+
+
+def encode_dataframe(df, formats=None):
+    """Serialize with the first format in `formats` that can handle df; returns (format, bytes)"""
+    last_error = None
+    for fmt in formats or DEFAULT_FORMATS:
+        if not is_available(fmt):
+            continue
+        serializer = SERIALIZERS[fmt]
+        if serializer.requires_arrow and not arrow_compatible(df):
+            continue
+        try:
+            return fmt, serializer.encode(df)
+        except (TypeError, ValueError, NotImplementedError) as e:  # Arrow errors subclass these
+            last_error = e
+    raise ValueError(f"No serializer could encode the DataFrame: {last_error}")
+
+
+def decode_dataframe(data, fmt):
+    if not is_available(fmt):
+        raise ValueError(f"Serializer '{fmt}' is not available")
+    with parse_timer():
+        return SERIALIZERS[fmt].decode(data)
+
+
+def benchmark_serializers(df, formats=None, repeat=3):
+    """Best-of-`repeat` encode/decode time and payload size per format"""
+    results = []
+    for fmt in formats or available_formats():
+        if SERIALIZERS[fmt].requires_arrow and not arrow_compatible(df):
+            continue
+        serializer = SERIALIZERS[fmt]
+        encode_times, decode_times = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            payload = serializer.encode(df)
+            encode_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            decoded = serializer.decode(payload)
+            decode_times.append(time.perf_counter() - start)
+        results.append({
+            'format': fmt,
+            'bytes': len(payload),
+            'encode_s': min(encode_times),
+            'decode_s': min(decode_times),
+            'dtypes_preserved': decoded.dtypes.astype(str).tolist() == df.dtypes.astype(str).tolist(),
+        })
+    return results
+
+
+if __name__ == '__main__':
+    import sys
+    from data_cleaning import clean_data
+
+    if len(sys.argv) < 2:
+        print("Usage: python data_serializer.py <survey.csv>")
+        sys.exit(1)
+    frame = clean_data(pd.read_csv(sys.argv[1]))
+    print(f"{len(frame)} rows × {len(frame.columns)} columns")
+    print(f"{'format':<10}{'bytes':>14}{'encode ms':>12}{'decode ms':>12}  dtypes kept")
+    for row in benchmark_serializers(frame):
+        print(f"{row['format']:<10}{row['bytes']:>14,}{row['encode_s'] * 1000:>12.1f}"
+              f"{row['decode_s'] * 1000:>12.1f}  {row['dtypes_preserved']}")
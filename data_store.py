@@ -0,0 +1,340 @@
+import hashlib
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+
+from data_serializer import SERIALIZERS, decode_dataframe, encode_dataframe
+from metrics import log_event
+
+# Server-side dataset registry.
+# The session dcc.Store only holds a short handle (content hash of the
+# DataFrame); the DataFrame itself stays in process memory and is resolved
+# by every callback through get_dataset().
+
+MAX_BYTES = int(os.environ.get('DATASET_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+MAX_ITEMS = int(os.environ.get('DATASET_CACHE_MAX_ITEMS', 32))
+# Set DATASET_SPILL_DIR to an empty string to keep datasets in memory only.
+# The spill directory is also how other processes (background jobs, the other
+# gunicorn workers) resolve a handle they did not create, so uploads and
+# preprocessing results are written to it when registered. With workers on
+# several hosts it must be shared storage.
+SPILL_DIR = os.environ.get('DATASET_SPILL_DIR',
+                           os.path.join(tempfile.gettempdir(), 'mental-health-dashboard', 'datasets')) or None
+SPILL_MAX_BYTES = int(os.environ.get('DATASET_SPILL_MAX_BYTES', 4 * 1024 * 1024 * 1024))
+# Other workers may still hold the handle of any spill file, so a file is only
+# pruned for the byte budget once nobody has written or read it for this long -
+# well above the life of a browser session. The budget is a soft limit.
+SPILL_MIN_AGE_S = float(os.environ.get('DATASET_SPILL_MIN_AGE_S', 24 * 3600))
+# Arrow IPC keeps dtypes and reloads fast; pickle covers frames Arrow cannot hold
+SPILL_FORMATS = ['arrow', 'pickle']
+
+_HANDLE_PATTERN = re.compile(r'[0-9a-f]{32}')
+_RECORD_KEY_PATTERN = re.compile(r'[0-9A-Za-z_-]{1,64}')
+
+
+def dataset_digest(df):
+    """Content hash of a DataFrame (column names, dtypes, index and values)"""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr(list(df.columns)).encode('utf-8'))
+    digest.update(repr(df.dtypes.astype(str).tolist()).encode('utf-8'))
+    try:
+        digest.update(pd.util.hash_pandas_object(df, index=True).values.tobytes())
+    except TypeError:
+        # Unhashable cell values (e.g. lists) - fall back to the text form
+        digest.update(df.to_csv().encode('utf-8'))
+    return digest.hexdigest()
+
+
+def view_handle(parent, key):
+    """Handle of a frame derived from the dataset `parent` (e.g. a filtered subset) by `key`"""
+    return hashlib.blake2b(f"{parent}:{key}".encode('utf-8'), digest_size=16).hexdigest()
+
+
+def is_handle(value):
+    return isinstance(value, str) and _HANDLE_PATTERN.fullmatch(value) is not None
+
+
+class DatasetRegistry:
+    """Thread-safe LRU of DataFrames keyed by content hash, bounded by bytes and count.
+
+    When a spill directory is configured, evicted datasets are serialized to disk
+    (see data_serializer) and transparently reloaded on the next lookup.
+    """
+
+    def __init__(self, max_bytes=MAX_BYTES, max_items=MAX_ITEMS, spill_dir=SPILL_DIR, spill_max_bytes=SPILL_MAX_BYTES,
+                 spill_min_age_s=SPILL_MIN_AGE_S):
+        self.max_bytes = max_bytes
+        self.max_items = max_items
+        self.spill_dir = spill_dir
+        self.spill_max_bytes = spill_max_bytes
+        self.spill_min_age_s = spill_min_age_s
+        self._items = OrderedDict()
+        # Evicted frames on their way to disk, still served to lookups meanwhile
+        self._spilling = {}
+        self._derived = {}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def put(self, df, persist=True, handle=None):
+        """Register df; with persist=True it is also written to the spill directory
+        right away, so other processes (background jobs, other workers) can load it.
+
+        `handle` skips hashing for frames whose identity is already known (see view_handle).
+        """
+        handle = handle or dataset_digest(df)
+        evicted = []
+        with self._lock:
+            if handle in self._items:
+                self._items.move_to_end(handle)
+            else:
+                evicted = self._insert(handle, df)
+        # Written outside the lock: lookups of other datasets do not wait for the disk
+        if persist:
+            self._spill(handle, df)
+        self._spill_evicted(evicted)
+        return handle
+
+    def get(self, handle):
+        if not is_handle(handle):
+            return None
+        with self._lock:
+            entry = self._items.get(handle)
+            if entry is not None:
+                self._items.move_to_end(handle)
+                return entry[0]
+            if handle in self._spilling:
+                return self._spilling[handle]
+        # Read and decoded outside the lock, then inserted unless another thread was faster
+        df = self._load_spilled(handle)
+        if df is None:
+            return None
+        with self._lock:
+            entry = self._items.get(handle)
+            if entry is not None:
+                self._items.move_to_end(handle)
+                return entry[0]
+            evicted = self._insert(handle, df)
+        self._spill_evicted(evicted)
+        return df
+
+    def derived(self, handle, key, compute):
+        """Per-dataset cache for values computed from a registered frame (profiles, bins, ...).
+
+        Entries live as long as the dataset stays in memory and are dropped with it.
+        """
+        with self._lock:
+            cache = self._derived.get(handle)
+            if cache is not None and key in cache:
+                return cache[key]
+        value = compute()
+        with self._lock:
+            if handle in self._items:
+                self._derived.setdefault(handle, {})[key] = value
+        return value
+
+    def __contains__(self, handle):
+        with self._lock:
+            return handle in self._items
+
+    def __len__(self):
+        with self._lock:
+            return len(self._items)
+
+    @property
+    def nbytes(self):
+        return self._bytes
+
+    def _insert(self, handle, df):
+        """Add an entry (lock held); returns the evicted (handle, df) pairs to spill once it is released"""
+        nbytes = int(df.memory_usage(index=True, deep=True).sum())
+        self._items[handle] = (df, nbytes)
+        self._bytes += nbytes
+        return self._evict()
+
+    def _evict(self):
+        evicted = []
+        # Always keep the most recent dataset, even if it alone exceeds the budget
+        while len(self._items) > 1 and (self._bytes > self.max_bytes or len(self._items) > self.max_items):
+            handle, (df, nbytes) = self._items.popitem(last=False)
+            self._derived.pop(handle, None)
+            self._bytes -= nbytes
+            if self.spill_dir:
+                self._spilling[handle] = df
+                evicted.append((handle, df))
+        return evicted
+
+    def _spill_evicted(self, evicted):
+        for handle, df in evicted:
+            try:
+                self._spill(handle, df)
+            finally:
+                with self._lock:
+                    self._spilling.pop(handle, None)
+
+    def _spill_path(self, handle, fmt):
+        return os.path.join(self.spill_dir, f"{handle}.{SERIALIZERS[fmt].extension}")
+
+    def _find_spilled(self, handle):
+        for fmt in SPILL_FORMATS:
+            path = self._spill_path(handle, fmt)
+            if os.path.exists(path):
+                return fmt, path
+        return None, None
+
+    def _spill(self, handle, df):
+        if not self.spill_dir:
+            return
+        fmt, path = self._find_spilled(handle)
+        if fmt is not None:
+            # Registered again: the file is in use, keep it from being pruned
+            self._touch(path)
+            return
+        try:
+            fmt, payload = encode_dataframe(df, SPILL_FORMATS)
+            path = self._spill_path(handle, fmt)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+            self._prune_spill_dir()
+        except Exception as e:
+            log_event('dataset_spill_failed', level='warning', handle=handle, error=str(e))
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _prune_spill_dir(self):
+        # Drop the least recently used spill files once the directory exceeds its
+        # byte budget, but never one used within spill_min_age_s
+        entries = []
+        for entry in os.scandir(self.spill_dir):
+            if entry.is_file() and not entry.name.endswith('.tmp'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in entries)
+        cutoff = time.time() - self.spill_min_age_s
+        for mtime, size, path in sorted(entries):
+            if total <= self.spill_max_bytes or mtime > cutoff:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    # === Shared records ===
+    # Small JSON documents (a session's undo history, ...) every worker can read,
+    # kept in a subdirectory of the spill directory next to the datasets they
+    # refer to. Without a spill directory there are none: state stays per process.
+
+    def _record_path(self, kind, key):
+        if not self.spill_dir or not _RECORD_KEY_PATTERN.fullmatch(kind) or not _RECORD_KEY_PATTERN.fullmatch(key):
+            return None
+        return os.path.join(self.spill_dir, kind, f"{key}.json")
+
+    def put_record(self, kind, key, value):
+        path = self._record_path(kind, key)
+        if path is None:
+            return False
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(value, f)
+            os.replace(tmp_path, path)
+            self._prune_records(os.path.dirname(path))
+            return True
+        except (OSError, TypeError, ValueError) as e:
+            log_event('record_write_failed', level='warning', kind=kind, key=key, error=str(e))
+            return False
+
+    def get_record(self, kind, key):
+        path = self._record_path(kind, key)
+        if path is None:
+            return None
+        try:
+            with open(path, encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            log_event('record_read_failed', level='warning', kind=kind, key=key, error=str(e))
+            return None
+
+    def _prune_records(self, directory):
+        # Records refer to spill files, which may be pruned once unused for spill_min_age_s
+        cutoff = time.time() - self.spill_min_age_s
+        for entry in os.scandir(directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def _load_spilled(self, handle):
+        if not self.spill_dir:
+            return None
+        fmt, path = self._find_spilled(handle)
+        if fmt is None:
+            return None
+        try:
+            with open(path, 'rb') as f:
+                df = decode_dataframe(f.read(), fmt)
+            self._touch(path)
+            return df
+        except Exception as e:
+            log_event('dataset_reload_failed', level='warning', handle=handle, error=str(e))
+            return None
+
+
+registry = DatasetRegistry()
+
+
+def put_dataset(df, persist=True, handle=None):
+    """Register a DataFrame and return the handle to keep in dcc.Store.
+
+    persist=False is for frames any worker can rebuild from a persisted dataset
+    (filtered views); they are only spilled when evicted.
+    """
+    return registry.put(df, persist=persist, handle=handle)
+
+
+def get_dataset(handle):
+    """Resolve a handle to the shared in-process DataFrame (None if unknown or evicted).
+
+    The returned frame is shared between callbacks and must not be modified in place.
+    """
+    return registry.get(handle)
+
+
+def put_record(kind, key, value):
+    """Store a small JSON-serializable value every worker can read back (False if there is no spill directory)"""
+    return registry.put_record(kind, key, value)
+
+
+def get_record(kind, key):
+    """Value stored by put_record in any worker, or None"""
+    return registry.get_record(kind, key)
+
+
+def get_derived(handle, key, compute):
+    """Return compute() for this dataset handle, computing it at most once while cached"""
+    return registry.derived(handle, key, compute)
+
+
+def derive(stored_data, key, compute):
+    """Cache compute() per dataset when stored_data is a handle, otherwise just compute it"""
+    if is_handle(stored_data):
+        return get_derived(stored_data, key, compute)
+    return compute()
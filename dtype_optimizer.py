@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401
+    TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:  # Arrow strings are optional, high-cardinality text then stays object
+    TEXT_DTYPE = None
+
+# Memory-compact dtypes for cleaned datasets.
+# clean_data keeps integers as int64 / Int64 and leaves columns it does not know
+# (state, comments, ...) as Python object strings. optimize_dtypes runs once on
+# the whole cleaned upload, before it is registered: integers get the smallest
+# signed type that holds them, low-cardinality text becomes categorical and the
+# remaining text is stored as Arrow strings.
+
+# Text columns with at most this share of distinct values become categorical
+CATEGORY_MAX_RATIO = 0.5
+# Signed only: arithmetic between unsigned columns would wrap around below zero
+INTEGER_TYPES = [np.int8, np.int16, np.int32]
+
+
+def _smallest_integer(series):
+    values = series.dropna()
+    if values.empty:
+        return None
+    low, high = values.min(), values.max()
+    for candidate in INTEGER_TYPES:
+        info = np.iinfo(candidate)
+        if info.min <= low and high <= info.max:
+            return candidate
+    return None
+
+
+def optimize_series(series):
+    """series in its most compact dtype (the same object if nothing smaller fits)"""
+    dtype = series.dtype
+    if pd.api.types.is_integer_dtype(dtype):
+        target = _smallest_integer(series)
+        if target is None or np.dtype(target).itemsize >= dtype.itemsize:
+            return series
+        # Nullable columns (Age as Int64) keep their mask: Int64 -> Int8
+        if isinstance(dtype, pd.api.extensions.ExtensionDtype):
+            return series.astype(np.dtype(target).name.capitalize())
+        return series.astype(target)
+    if pd.api.types.is_object_dtype(dtype):
+        if pd.api.types.infer_dtype(series, skipna=True) not in ('string', 'empty'):
+            return series
+        distinct = series.nunique(dropna=True)
+        if distinct <= CATEGORY_MAX_RATIO * len(series):
+            return series.astype('category')
+        if TEXT_DTYPE is not None:
+            return series.astype(TEXT_DTYPE)
+    return series
+
+
+def optimize_dtypes(df):
+    """(compact copy of df, per-column report of the columns whose dtype changed)
+
+    Each report entry is {'column', 'before', 'after', 'bytes_before', 'bytes_after'}.
+    """
+    columns = {}
+    report = []
+    for col in df.columns:
+        series = df[col]
+        optimized = optimize_series(series)
+        if optimized is not series:
+            report.append({
+                'column': col,
+                'before': str(series.dtype),
+                'after': str(optimized.dtype),
+                'bytes_before': int(series.memory_usage(index=False, deep=True)),
+                'bytes_after': int(optimized.memory_usage(index=False, deep=True)),
+            })
+        columns[col] = optimized
+    return pd.DataFrame(columns, index=df.index), report
+
+
+def bytes_saved(report):
+    return sum(entry['bytes_before'] - entry['bytes_after'] for entry in report)
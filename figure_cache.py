@@ -0,0 +1,86 @@
+import json
+import os
+import threading
+from collections import OrderedDict
+
+from data_store import is_handle
+
+# Server-side cache of rendered figures.
+# Going back to a chart already viewed (same dataset, column(s), chart type,
+# bins, filters) returns the stored figure JSON instead of rebuilding the
+# figure. Keys start with the dataset handle, a content digest of the
+# (filtered) dataset, so a dataset changed by preprocessing or a different
+# filter gets new keys and stale entries simply age out of the LRU.
+
+MAX_BYTES = int(os.environ.get('FIGURE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+
+
+class FigureCache:
+    """Thread-safe LRU of serialized figures, bounded by the total JSON size"""
+
+    def __init__(self, max_bytes=MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._items.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, figure_json, extras=()):
+        nbytes = len(figure_json)
+        if nbytes > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old[0])
+            self._items[key] = (figure_json, extras)
+            self._bytes += nbytes
+            while self._bytes > self.max_bytes:
+                _, (evicted, _) = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._items),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+            }
+
+
+figure_cache = FigureCache()
+
+
+def cached_figure(key, build):
+    """(figure, *extras) for a view; build() returns the same tuple and runs only on a miss.
+
+    key must start with the dataset handle; views of raw (non-handle) data are
+    never cached. A hit returns the figure as a dict parsed from the stored JSON.
+    """
+    if not is_handle(key[0]):
+        return build()
+    entry = figure_cache.get(key)
+    if entry is not None:
+        return (json.loads(entry[0]), *entry[1])
+    figure, *extras = build()
+    figure_cache.put(key, figure.to_json(), tuple(extras))
+    return (figure, *extras)
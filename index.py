@@ -1,24 +1,48 @@
+import os
+import time
+_import_started = time.perf_counter()
+
 from dash import dcc, html, Input, Output, State, ctx, no_update, callback
 import dash_bootstrap_components as dbc
 import pandas as pd
-import base64, io
 from app import app
-from pages import home, univariate, bivariate, preprocessing
-from data_cleaning import clean_data 
+from pages import home, univariate, bivariate, preprocessing, filter_panel
+from data_ingest import read_uploaded_csv
+from data_store import derive, get_derived, put_dataset
+from dtype_optimizer import bytes_saved, optimize_dtypes
+from data_loader import load_dataframe
+from data_profile import get_profile
+from row_filter import apply_filters
+from table_view import paged_table, query_page
+from version_history import new_session_id
+from metrics import instrument, log_event
 
 # Validation Layout 
-app.validation_layout = html.Div([
-    home.home_page(),
-    univariate.univariate_page(),
-    bivariate.bivariate_page(),
-    preprocessing.preprocessing_page(),
-])
+# Dash only reads it when suppress_callback_exceptions is off, so skip building
+# every page at import time unless it is actually used
+if not app.config.suppress_callback_exceptions:
+    app.validation_layout = html.Div([
+        home.home_page(),
+        univariate.univariate_page(),
+        bivariate.bivariate_page(),
+        preprocessing.preprocessing_page(),
+    ])
 
 # Main Layout
 app.layout = dbc.Container([
     dcc.Location(id='url', refresh=False),
     dcc.Store(id='stored-data', storage_type='session'),
     dcc.Store(id='stored-filename', storage_type='session'),
+    # Browser session id, keys per-session server state (preprocessing undo history)
+    dcc.Store(id='session-id', storage_type='session'),
+    # Chart theme, applied to figures in the browser (assets/clientside.js)
+    html.Div(
+        dbc.Switch(id='chart-theme', label="Light charts", value=False, persistence=True, persistence_type='local'),
+        className="d-flex justify-content-end pt-2 pe-3",
+        style={'color': 'white'}
+    ),
+    # Row filters applied by every page (pages/filters.py, row_filter.py)
+    filter_panel(),
     html.Div(id='page-content')
 ], fluid=True, style={'backgroundColor': '#0a0a0a', 'minHeight': '100vh'})
 
@@ -54,48 +78,57 @@ def handle_upload_remove(contents, remove_clicks, filename):
     
     if triggered == 'upload-data' and contents:
         try:
-            content_type, content_string = contents.split(',')
-            decoded = base64.b64decode(content_string)
-            
-            try:
-                df = pd.read_csv(io.StringIO(decoded.decode('utf-8')))
-            except UnicodeDecodeError:
-                df = pd.read_csv(io.StringIO(decoded.decode('latin-1')))
+            # Stream the payload through read_csv in chunks, cleaning each chunk as it is parsed
+            df = read_uploaded_csv(contents)
             
             if df.empty:
-                print("ERROR: Empty CSV file")
+                log_event('upload_rejected', level='error', filename=filename, reason="Empty CSV file")
                 return None, None
             
             if df.shape[0] == 0:
-                print("ERROR: CSV has no rows")
+                log_event('upload_rejected', level='error', filename=filename, reason="CSV has no rows")
                 return None, None
             
             if df.shape[1] == 0:
-                print("ERROR: CSV has no columns")
+                log_event('upload_rejected', level='error', filename=filename, reason="CSV has no columns")
                 return None, None
             
-            # Data Cleaning
-            print(f"Raw data loaded: {df.shape[0]} rows × {df.shape[1]} columns")
-            df = clean_data(df)
-            print(f"Data cleaned: {df.shape[0]} rows × {df.shape[1]} columns")
+            log_event('data_cleaned', filename=filename, rows=df.shape[0], columns=df.shape[1])
             
+            # Smallest dtypes for the whole upload (chunks were cleaned one by one)
+            df, dtype_report = optimize_dtypes(df)
+            log_event('dtypes_optimized', filename=filename, bytes_saved=bytes_saved(dtype_report), columns=len(dtype_report))
             
-            data_json = df.to_json(date_format='iso', orient='split')
-            print(f"SUCCESS: Loaded and cleaned {filename} - {df.shape[0]} rows × {df.shape[1]} columns")
-            return data_json, filename
+            # Keep the DataFrame server-side, the session store only gets its handle
+            handle = put_dataset(df)
+            get_derived(handle, 'dtype-report', lambda: dtype_report)
+            # Profile once now; every page reads column stats from it afterwards
+            get_profile(handle)
+            log_event('upload_loaded', filename=filename, handle=handle, rows=df.shape[0], columns=df.shape[1])
+            return handle, filename
             
         except pd.errors.EmptyDataError:
-            print("ERROR: CSV file is empty or corrupted")
+            log_event('upload_rejected', level='error', filename=filename, reason="CSV file is empty or corrupted")
             return None, None
         except pd.errors.ParserError:
-            print("ERROR: Unable to parse CSV file - check file format")
+            log_event('upload_rejected', level='error', filename=filename, reason="Unable to parse CSV file - check file format")
             return None, None
         except Exception as e:
-            print(f"ERROR: Unexpected error loading CSV: {str(e)}")
+            log_event('upload_rejected', level='error', filename=filename, reason=f"Unexpected error loading CSV: {str(e)}")
             return None, None
     
     return no_update, no_update
 
+@app.callback(
+    Output('session-id', 'data'),
+    Input('url', 'pathname'),
+    State('session-id', 'data')
+)
+def ensure_session_id(pathname, session_id):
+    if session_id:
+        return no_update
+    return new_session_id()
+
 # Update Home Page Display
 @app.callback(
     Output('file-status-indicator', 'children'),
@@ -104,15 +137,18 @@ def handle_upload_remove(contents, remove_clicks, filename):
     Output('data-info-card', 'children'),
     Input('stored-data', 'data'),
     Input('stored-filename', 'data'),
-    Input('url', 'pathname')
+    Input('url', 'pathname'),
+    Input('active-filters', 'data')
 )
-def update_home_display(stored_data, stored_filename, pathname):
+def update_home_display(stored_data, stored_filename, pathname, filters):
     """Update all home page elements when data changes or page loads"""
     
     if pathname != '/':
         return no_update, no_update, no_update, no_update
     
-    if stored_data is None:
+    df = load_dataframe(stored_data)
+    
+    if df is None:
         no_data_message = dbc.Alert([
             html.I(className="fas fa-info-circle me-2"),
             html.Strong("No data loaded. "),
@@ -121,12 +157,13 @@ def update_home_display(stored_data, stored_filename, pathname):
         return "", no_data_message, "", ""
     
     try:
-        # Load DataFrame from JSON string
-        df = pd.read_json(io.StringIO(stored_data), orient='split')
         filename = stored_filename if stored_filename else "dataset.csv"
+        # Info card and preview describe the rows left by the global filters
+        filtered_data = apply_filters(stored_data, filters)
+        filtered_df = load_dataframe(filtered_data)
+        profile = get_profile(filtered_data)
         
-        missing_count = df.isnull().sum().sum()
-        missing_pct = (missing_count / (df.shape[0] * df.shape[1])) * 100
+        missing_pct = profile.missing_pct
         
         # File Indicator
         file_indicator = dbc.Alert([
@@ -154,17 +191,39 @@ def update_home_display(stored_data, stored_filename, pathname):
         status = dbc.Alert(status_content, color="success")
         
         # Data Info Card
-        int_cols = len(df.select_dtypes(include=['int', 'int32', 'int64', 'Int64']).columns)
-        float_cols = len(df.select_dtypes(include=['float', 'float64']).columns)
-        obj_cols = len(df.select_dtypes(include=['object']).columns)
-        cat_cols = len(df.select_dtypes(include=['category']).columns)
-        bool_cols = len(df.select_dtypes(include=['bool']).columns)
+        family_counts = profile.family_counts()
+        int_cols = family_counts.get('integer', 0)
+        float_cols = family_counts.get('float', 0)
+        obj_cols = family_counts.get('object', 0)
+        cat_cols = family_counts.get('categorical', 0)
+        bool_cols = family_counts.get('boolean', 0)
         
-        missing_data = df.isnull().sum()
-        missing_data = missing_data[missing_data > 0].sort_values(ascending=False)
+        missing_data = profile.missing_by_column()
+        
+        # Bytes saved by optimize_dtypes at upload (unknown once the dataset was evicted and reloaded)
+        dtype_report = derive(stored_data, 'dtype-report', lambda: None) or []
+        memory_section = html.Div([
+            html.Hr(),
+            html.H6([
+                "💾 Memory: ",
+                dbc.Badge(f"{bytes_saved(dtype_report) / 1024 / 1024:.1f} MB saved", color="success", className="ms-2")
+            ], style={'color': '#00d9ff', 'marginBottom': '15px'}),
+            html.Div([
+                html.P([
+                    html.Strong(f"{entry['column']}: "),
+                    f"{entry['before']} → {entry['after']} ",
+                    dbc.Badge(f"-{(entry['bytes_before'] - entry['bytes_after']) / 1024:,.0f} KB", color="info", className="ms-2")
+                ], style={'marginBottom': '8px'})
+                for entry in sorted(dtype_report, key=lambda e: e['bytes_after'] - e['bytes_before'])[:10]
+            ])
+        ]) if dtype_report else ""
         
         data_info_card = dbc.Card([
-            dbc.CardHeader(html.H5("📋 Dataset Information", style={'color': '#00d9ff'})),
+            dbc.CardHeader([
+                html.H5("📋 Dataset Information", style={'color': '#00d9ff', 'display': 'inline-block'}),
+                dbc.Badge(f"Filtered: {len(filtered_df)} of {len(df)} rows", color="info", className="ms-3")
+                if filtered_data != stored_data else ""
+            ]),
             dbc.CardBody([
                 dbc.Row([
                     dbc.Col([
@@ -181,7 +240,7 @@ def update_home_display(stored_data, stored_filename, pathname):
                             html.P([
                                 html.Strong(f"{col}: "),
                                 f"{count} ",
-                                dbc.Badge(f"{count/len(df)*100:.1f}%", color="warning", className="ms-2")
+                                dbc.Badge(f"{count/len(filtered_df)*100:.1f}%", color="warning", className="ms-2")
                             ], style={'marginBottom': '8px'})
                             for col, count in missing_data.head(10).items()
                         ]) if len(missing_data) > 0 else html.Div([
@@ -189,34 +248,23 @@ def update_home_display(stored_data, stored_filename, pathname):
                             html.P("No missing values detected!", style={'color': '#00ff00', 'fontWeight': 'bold', 'display': 'inline'})
                         ])
                     ], width=6)
-                ])
+                ]),
+                memory_section
             ])
         ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'}, className="mt-3")
         
-        # Data Preview
-        preview_df = df.head(5)
-        if df.shape[1] > 10:
-            preview_df = preview_df.iloc[:, :10]
-            column_note = html.Small(
-                f"Showing first 10 of {df.shape[1]} columns",
-                className="text-muted ms-2"
-            )
-        else:
-            column_note = ""
-        
+        # Data Preview - rows are served page by page by update_preview_page
         table = dbc.Card([
             dbc.CardHeader([
-                html.H5("Dataset Preview (First 5 Rows)", 
+                html.H5("Dataset Preview", 
                        style={'color': '#00d9ff', 'display': 'inline-block'}),
                 dbc.Badge(filename, color="info", className="ms-3"),
-                dbc.Badge(f"{df.shape[0]} rows", color="secondary", className="ms-2"),
-                dbc.Badge(f"{df.shape[1]} columns", color="secondary", className="ms-2"),
-                column_note
+                dbc.Badge(f"{filtered_df.shape[0]} rows", color="secondary", className="ms-2"),
+                dbc.Badge(f"{filtered_df.shape[1]} columns", color="secondary", className="ms-2"),
+                html.Small(id='data-preview-count', className="text-muted ms-2")
             ]),
             dbc.CardBody([
-                html.Div([
-                    dbc.Table.from_dataframe(preview_df, striped=True, bordered=True, hover=True, className="table-dark")
-                ], style={'overflowX': 'auto', 'maxWidth': '100%'})
+                paged_table('data-preview-table', filtered_df)
             ])
         ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
         
@@ -244,9 +292,40 @@ def update_home_display(stored_data, stored_filename, pathname):
             html.Strong("Unexpected Error: "),
             "Something went wrong while processing your file. Please try uploading again."
         ], color="danger")
-        print(f"Error in update_home_display: {e}")
+        log_event('callback_error', level='error', callback='update_home_display', error=str(e))
         return "", error_alert, "", ""
 
+# Data preview paging, sorting and filtering (server-side, one page per request)
+@app.callback(
+    Output('data-preview-table', 'data'),
+    Output('data-preview-table', 'page_count'),
+    Output('data-preview-count', 'children'),
+    Input('data-preview-table', 'page_current'),
+    Input('data-preview-table', 'page_size'),
+    Input('data-preview-table', 'sort_by'),
+    Input('data-preview-table', 'filter_query'),
+    State('stored-data', 'data'),
+    State('active-filters', 'data')
+)
+def update_preview_page(page_current, page_size, sort_by, filter_query, stored_data, filters):
+    try:
+        records, page_count, matches = query_page(apply_filters(stored_data, filters), page_current, page_size,
+                                                  sort_by, filter_query)
+    except Exception as e:
+        log_event('callback_error', level='error', callback='update_preview_page', error=str(e))
+        return [], 1, "Invalid filter"
+    return records, page_count, f"{matches:,} matching rows" if filter_query else ""
+
+# Per-callback timings, payload sizes and parse time, served on /metrics (metrics.py)
+instrument(app)
+
+# Cold start: time spent importing the app, pages and data modules. Heavy
+# libraries (scikit-learn, plotly.express, scipy) are imported on first use.
+COLD_START_BUDGET_S = float(os.environ.get('DASHBOARD_COLD_START_BUDGET_S', 1.5))
+cold_start_s = time.perf_counter() - _import_started
+log_event('dashboard_ready', level='warning' if cold_start_s > COLD_START_BUDGET_S else 'info',
+          cold_start_s=round(cold_start_s, 3), budget_s=COLD_START_BUDGET_S)
+
 # Run
 if __name__ == '__main__':
     run_server(debug=False, host='0.0.0.0', port=8000)
\ No newline at end of file
@@ -0,0 +1,226 @@
+import contextvars
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+
+# Per-callback instrumentation.
+# instrument(app) wraps every registered server-side callback and records, per
+# callback: wall time, CPU time of the worker thread, request and response
+# payload bytes, time spent parsing DataFrames (CSV uploads, JSON payloads,
+# spilled datasets - see parse_timer) and, optionally, peak Python allocation.
+# Totals are served in Prometheus text format on /metrics; every call is also
+# logged as one JSON line on stdout. Other server events (uploads, spills,
+# start-up) go through log_event, so stdout stays one JSON object per line.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# tracemalloc slows every allocation down, so peak tracking is opt-in. The peak
+# is process-wide: with concurrent callbacks in one worker it includes theirs.
+TRACE_MEMORY = os.environ.get('CALLBACK_METRICS_TRACEMALLOC', '0') == '1'
+JSON_LOG = os.environ.get('CALLBACK_METRICS_LOG', '1') == '1'
+
+def log_event(event, level='info', **fields):
+    """Write one structured log line: {"time", "pid", "event", "level", **fields}"""
+    record = {'time': round(time.time(), 3), 'pid': os.getpid(), 'event': event, 'level': level, **fields}
+    print(json.dumps(record, default=str), flush=True)
+
+
+# [parse seconds, nesting depth] of the callback running in this context
+_parse_state = contextvars.ContextVar('parse_state', default=None)
+
+
+@contextmanager
+def parse_timer():
+    """Count the enclosed block as DataFrame parse time of the running callback.
+
+    Outside of an instrumented callback this does nothing; nested timers (a
+    spilled dataset decoded inside an upload, ...) are counted once.
+    """
+    state = _parse_state.get()
+    if state is None or state[1]:
+        yield
+        return
+    state[1] = 1
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        state[0] += time.perf_counter() - start
+        state[1] = 0
+
+
+class CallbackStats:
+    """Thread-safe running totals per callback"""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def observe(self, record):
+        with self._lock:
+            totals = self._totals.get(record['callback'])
+            if totals is None:
+                totals = self._totals[record['callback']] = {
+                    'calls': 0, 'errors': 0, 'prevented': 0, 'wall_s': 0.0, 'cpu_s': 0.0, 'parse_s': 0.0,
+                    'request_bytes': 0, 'response_bytes': 0, 'peak_alloc_bytes': 0,
+                    'buckets': [0] * len(self.buckets),
+                }
+            totals['calls'] += 1
+            if record['status'] == 'error':
+                totals['errors'] += 1
+            elif record['status'] == 'prevented':
+                totals['prevented'] += 1
+            totals['wall_s'] += record['wall_s']
+            totals['cpu_s'] += record['cpu_s']
+            totals['parse_s'] += record['parse_s']
+            totals['request_bytes'] += record['request_bytes']
+            totals['response_bytes'] += record['response_bytes']
+            if record['peak_alloc_bytes'] is not None:
+                totals['peak_alloc_bytes'] = max(totals['peak_alloc_bytes'], record['peak_alloc_bytes'])
+            for i, bound in enumerate(self.buckets):
+                if record['wall_s'] <= bound:
+                    totals['buckets'][i] += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {name: {**totals, 'buckets': list(totals['buckets'])} for name, totals in self._totals.items()}
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+
+
+callback_stats = CallbackStats()
+
+
+def timed_callback(name, func):
+    """Wrap a registered Dash callback function so every call is measured"""
+    from dash.exceptions import PreventUpdate
+    from flask import has_request_context, request
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        state = [0.0, 0]
+        token = _parse_state.set(state)
+        if TRACE_MEMORY:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        status = 'ok'
+        response = None
+        wall_start = time.perf_counter()
+        cpu_start = time.thread_time()
+        try:
+            response = func(*args, **kwargs)
+            return response
+        except PreventUpdate:
+            status = 'prevented'
+            raise
+        except Exception:
+            status = 'error'
+            raise
+        finally:
+            record = {
+                'event': 'callback',
+                'callback': name,
+                'status': status,
+                'wall_s': time.perf_counter() - wall_start,
+                'cpu_s': time.thread_time() - cpu_start,
+                'parse_s': state[0],
+                'request_bytes': (request.content_length or 0) if has_request_context() else 0,
+                # Dash callbacks return their response already serialized to JSON
+                'response_bytes': len(response.encode('utf-8')) if isinstance(response, str) else 0,
+                'peak_alloc_bytes': tracemalloc.get_traced_memory()[1] - base if TRACE_MEMORY else None,
+            }
+            _parse_state.reset(token)
+            callback_stats.observe(record)
+            if JSON_LOG:
+                log_event(level='error' if status == 'error' else 'info', **record)
+
+    wrapper._instrumented = True
+    return wrapper
+
+
+def _label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format"""
+    from data_store import registry
+    from figure_cache import figure_cache
+
+    snapshot = callback_stats.snapshot()
+    lines = []
+
+    def metric(name, kind, help_text, samples):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for labels, value in samples:
+            label_text = ','.join(f'{key}="{_label(val)}"' for key, val in labels.items())
+            lines.append(f"{name}{{{label_text}}} {value}" if label_text else f"{name} {value}")
+
+    def per_callback(field):
+        return [({'callback': name}, totals[field]) for name, totals in sorted(snapshot.items())]
+
+    histogram = []
+    for name, totals in sorted(snapshot.items()):
+        for bound, count in zip(callback_stats.buckets, totals['buckets']):
+            histogram.append(({'callback': name, 'le': bound}, count))
+        histogram.append(({'callback': name, 'le': '+Inf'}, totals['calls']))
+    lines.append("# HELP dash_callback_duration_seconds Wall time of callback calls")
+    lines.append("# TYPE dash_callback_duration_seconds histogram")
+    for labels, value in histogram:
+        lines.append(f'dash_callback_duration_seconds_bucket{{callback="{_label(labels["callback"])}",'
+                     f'le="{labels["le"]}"}} {value}')
+    for name, totals in sorted(snapshot.items()):
+        lines.append(f'dash_callback_duration_seconds_sum{{callback="{_label(name)}"}} {totals["wall_s"]}')
+        lines.append(f'dash_callback_duration_seconds_count{{callback="{_label(name)}"}} {totals["calls"]}')
+
+    metric('dash_callback_errors_total', 'counter', "Callback calls that raised an error", per_callback('errors'))
+    metric('dash_callback_prevented_total', 'counter', "Callback calls that raised PreventUpdate",
+           per_callback('prevented'))
+    metric('dash_callback_cpu_seconds_total', 'counter', "CPU time of the worker thread in callbacks",
+           per_callback('cpu_s'))
+    metric('dash_callback_parse_seconds_total', 'counter', "Time spent parsing DataFrames in callbacks",
+           per_callback('parse_s'))
+    metric('dash_callback_request_bytes_total', 'counter', "Callback request payload bytes",
+           per_callback('request_bytes'))
+    metric('dash_callback_response_bytes_total', 'counter', "Callback response payload bytes",
+           per_callback('response_bytes'))
+    if TRACE_MEMORY:
+        metric('dash_callback_peak_alloc_bytes', 'gauge', "Largest peak Python allocation of a single call",
+               per_callback('peak_alloc_bytes'))
+
+    cache = figure_cache.stats()
+    metric('dashboard_dataset_registry_bytes', 'gauge', "Bytes of DataFrames held in memory", [({}, registry.nbytes)])
+    metric('dashboard_dataset_registry_items', 'gauge', "DataFrames held in memory", [({}, len(registry))])
+    metric('dashboard_figure_cache_bytes', 'gauge', "Bytes of cached figure JSON", [({}, cache['bytes'])])
+    metric('dashboard_figure_cache_entries', 'gauge', "Cached figures", [({}, cache['entries'])])
+    metric('dashboard_figure_cache_hits_total', 'counter', "Figure cache hits", [({}, cache['hits'])])
+    metric('dashboard_figure_cache_misses_total', 'counter', "Figure cache misses", [({}, cache['misses'])])
+    return '\n'.join(lines) + '\n'
+
+
+def instrument(app):
+    """Measure every server-side callback of app and serve /metrics on its Flask server.
+
+    Call once, after every page has registered its callbacks.
+    """
+    from flask import Response
+
+    if TRACE_MEMORY and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    for entry in app.callback_map.values():
+        # Clientside callbacks have no server-side function
+        func = entry.get('callback')
+        if func is None or getattr(func, '_instrumented', False):
+            continue
+        entry['callback'] = timed_callback(f"{func.__module__}.{func.__name__}", func)
+
+    if 'metrics' not in app.server.view_functions:
+        app.server.add_url_rule('/metrics', 'metrics',
+                                lambda: Response(render_metrics(), mimetype='text/plain; version=0.0.4'))
@@ -2,3 +2,4 @@ from .home import home_page
 from .univariate import univariate_page
 from .bivariate import bivariate_page
 from .preprocessing import preprocessing_page
+from .filters import filter_panel
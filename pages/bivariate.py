@@ -1,10 +1,22 @@
-from dash import html, dcc, Input, Output
+from dash import html, dcc, Input, Output, State, ctx, ClientsideFunction
+from dash.exceptions import PreventUpdate
 import dash_bootstrap_components as dbc
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import io
+import numpy as np
+from functools import lru_cache
 from app import app
+from data_loader import load_dataframe
+from contingency import crosstab_summary
+from correlation import METHODS, column_digests, correlation_matrix
+from data_store import derive, is_handle
+from regression import fit_xy
+from row_filter import apply_filters
+from figure_cache import cached_figure
+from metrics import log_event
+from plot_aggregates import (SCATTER_MAX_POINTS, add_trendline, box_figure, box_summary, crosstab_figure, density_figure,
+                             density_grid, grouped_values, kde_summary, paired_values, sample_figure, scatter_mode,
+                             stratified_sample, violin_figure)
 
 
 def is_categorical_column(series):
@@ -15,6 +27,7 @@ def is_numeric_column(series):
     return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
 
 
+@lru_cache(maxsize=None)
 def bivariate_page():
     return dbc.Container([
         dbc.Row([
@@ -40,7 +53,18 @@ def bivariate_page():
                             value='two_var',
                             labelStyle={'display': 'block', 'margin': '10px'},
                             style={'fontSize': '1.1rem'}
-                        )
+                        ),
+                        html.Div(id='heatmap-controls', children=[
+                            html.Hr(style={'borderColor': '#00d9ff'}),
+                            html.Label("Correlation method:", className="fw-bold"),
+                            dcc.RadioItems(
+                                id='heatmap-method',
+                                options=[{'label': f' {label}', 'value': method} for method, label in METHODS.items()],
+                                value='pearson',
+                                inline=True,
+                                labelStyle={'margin': '10px'}
+                            )
+                        ], style={'display': 'none'})
                     ])
                 ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
             ], width=12)
@@ -87,25 +111,75 @@ def bivariate_page():
                             )
                         ])
                     ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
+                ], width=8),
+                
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardHeader(html.H5("Scatter Rendering", style={'color': '#00d9ff'})),
+                        dbc.CardBody([
+                            dcc.RadioItems(
+                                id='scatter-render-mode',
+                                options=[
+                                    {'label': f' Auto (density above {SCATTER_MAX_POINTS:,} points)', 'value': 'auto'},
+                                    {'label': ' Exact (every point)', 'value': 'exact'},
+                                    {'label': ' Density heatmap', 'value': 'density'},
+                                    {'label': ' Stratified sample', 'value': 'sample'},
+                                ],
+                                value='auto',
+                                labelStyle={'display': 'block', 'margin': '10px'}
+                            ),
+                            html.Small("Correlation and trendline always use all rows.", className="text-muted")
+                        ])
+                    ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
+                ], width=4)
+            ], className="mb-4"),
+        ]),
+        
+        html.Div(id='two-var-output', children=[
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            dcc.Loading(id="loading-bivariate", children=[
+                                dcc.Store(id='two-var-figure'),
+                                dcc.Graph(id='bivariate-plot', style={'height': '600px'})
+                            ])
+                        ])
+                    ], style={'backgroundColor': 'rgba(0,0,0,0)', 'border': '1px solid #00d9ff'})
+                ], width=12)
+            ], className="mb-4"),
+            
+            dbc.Row([
+                dbc.Col([
+                    html.Div(id='correlation-info')
                 ], width=12)
             ], className="mb-4"),
         ]),
         
-        dbc.Row([
-            dbc.Col([
-                dbc.Card([
-                    dbc.CardBody([
-                        dcc.Loading(id="loading-bivariate", children=dcc.Graph(id='bivariate-plot', style={'height': '600px'}))
-                    ])
-                ], style={'backgroundColor': 'rgba(0,0,0,0)', 'border': '1px solid #00d9ff'})
-            ], width=12)
-        ], className="mb-4"),
+        html.Div(id='heatmap-output', style={'display': 'none'}, children=[
+            dbc.Row([
+                dbc.Col([
+                    dbc.Card([
+                        dbc.CardBody([
+                            dcc.Loading(id="loading-heatmap", children=[
+                                dcc.Store(id='heatmap-figure'),
+                                dcc.Graph(id='heatmap-plot', style={'height': '600px'})
+                            ])
+                        ])
+                    ], style={'backgroundColor': 'rgba(0,0,0,0)', 'border': '1px solid #00d9ff'})
+                ], width=12)
+            ], className="mb-4"),
+            
+            dbc.Row([
+                dbc.Col([
+                    html.Div(id='heatmap-info')
+                ], width=12)
+            ], className="mb-4"),
+        ]),
         
-        dbc.Row([
-            dbc.Col([
-                html.Div(id='correlation-info')
-            ], width=12)
-        ], className="mb-4"),
+        # Inputs of the last rendered chart per view, used to skip identical redraws
+        dcc.Store(id='two-var-rendered'),
+        dcc.Store(id='heatmap-rendered'),
         
         dbc.Row([
             dbc.Col([
@@ -120,15 +194,68 @@ def bivariate_page():
     ], fluid=True)
 
 
+def regression_info(fit, rendering):
+    if fit is None:
+        return dbc.Alert([
+            html.Strong("Correlation Coefficient: "),
+            "not defined (X has a single value)",
+            html.Br(),
+            html.Small(f"Rendering: {rendering}")
+        ], color="warning")
+    
+    corr = fit['r']
+    return dbc.Alert([
+        html.Strong("Correlation Coefficient: "),
+        f"{corr:.3f}",
+        html.Br(),
+        html.Small(f"Strength: {'Strong' if abs(corr) > 0.7 else 'Moderate' if abs(corr) > 0.4 else 'Weak'}"),
+        html.Br(),
+        html.Strong("OLS Trendline: "),
+        f"y = {fit['slope']:.4g}x + {fit['intercept']:.4g}",
+        html.Br(),
+        html.Small(f"R² = {fit['r2']:.3f} · slope {fit['level']:.0%} CI ± {fit['t_crit'] * fit['slope_se']:.3g} · n = {fit['n']:,}"),
+        html.Br(),
+        html.Small(f"Rendering: {rendering}")
+    ], color="info")
+
+
+def chi_square_info(stats):
+    if np.isnan(stats['chi2']):
+        return dbc.Alert("Chi-square test needs at least two categories on each axis", color="warning")
+    
+    significant = stats['p_value'] < 0.05
+    children = [
+        html.Strong("Chi-Square Test of Independence: "),
+        f"χ² = {stats['chi2']:.2f}, df = {stats['dof']}, p = {stats['p_value']:.3g}",
+        html.Br(),
+        html.Small(f"{'Significant' if significant else 'No significant'} association at the 5% level · "
+                   f"Cramér's V = {stats['cramers_v']:.3f} · n = {stats['n']:,}"),
+    ]
+    if stats['min_expected'] < 5:
+        children += [html.Br(), html.Small("Some expected counts are below 5, so the p-value is approximate.")]
+    return dbc.Alert(children, color="info")
+
+
 # Controls visibility
-@app.callback(
+# Runs in the browser, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggleBivariateControls'),
     Output('two-var-controls', 'style'),
+    Output('two-var-output', 'style'),
+    Output('heatmap-controls', 'style'),
+    Output('heatmap-output', 'style'),
     Input('analysis-type', 'value')
 )
-def toggle_controls(analysis_type):
-    if analysis_type == 'heatmap':
-        return {'display': 'none'}
-    return {'display': 'block'}
+
+
+# Chart theme is applied in the browser to the figures the server produced
+for graph_id, store_id in [('bivariate-plot', 'two-var-figure'), ('heatmap-plot', 'heatmap-figure')]:
+    app.clientside_callback(
+        ClientsideFunction(namespace='ui', function_name='themeFigure'),
+        Output(graph_id, 'figure'),
+        Input(store_id, 'data'),
+        Input('chart-theme', 'value')
+    )
 
 
 # Dropdown options
@@ -142,288 +269,343 @@ def update_bivariate_options(stored_data):
         return [], []
 
     try:
-        if isinstance(stored_data, str):
-            df = pd.read_json(io.StringIO(stored_data), orient='split')
-        elif isinstance(stored_data, dict):
-            df = pd.DataFrame(stored_data)
-        else:
+        df = load_dataframe(stored_data)
+        if df is None:
             return [], []
         
         options = [{'label': col, 'value': col} for col in df.columns]
         return options, options
         
     except Exception as e:
-        print(f"Error loading data: {e}")
+        log_event('callback_error', level='error', callback='update_bivariate_options', error=str(e))
         return [], []
 
 
 # Visualization
+# The heatmap, the two-variable chart and its info card are separate callbacks,
+# each listening only to the inputs it depends on. The last rendered inputs are
+# kept in a dcc.Store per view, so re-selecting the same view (or changing a
+# control the current chart ignores) raises PreventUpdate instead of rebuilding.
+
+def message_figure(text):
+    fig = go.Figure()
+    fig.add_annotation(text=text, xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+    return fig
+
+
+def view_key(stored_data, *params):
+    """Identity of a rendered view; None (never equal) when the data is not a dataset handle"""
+    if not is_handle(stored_data):
+        return None
+    return [stored_data, *params]
+
+
+def load_bivariate_data(stored_data):
+    df = load_dataframe(stored_data)
+    if df is None:
+        raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+    return df
+
+
+# Heatmap
 @app.callback(
-    Output('bivariate-plot', 'figure'),
-    Output('correlation-info', 'children'),
+    Output('heatmap-figure', 'data'),
+    Output('heatmap-info', 'children'),
+    Output('heatmap-rendered', 'data'),
     Input('analysis-type', 'value'),
-    Input('bivariate-x', 'value'),
-    Input('bivariate-y', 'value'),
-    Input('bivariate-chart-type', 'value'),
-    Input('stored-data', 'data')
+    Input('heatmap-method', 'value'),
+    Input('stored-data', 'data'),
+    Input('active-filters', 'data'),
+    State('heatmap-rendered', 'data')
 )
-def update_visualization(analysis_type, x_col, y_col, chart_type, stored_data):
+def update_heatmap(analysis_type, heatmap_method, stored_data, filters, rendered):
+    if analysis_type != 'heatmap':
+        raise PreventUpdate
     
-    # Initialize info as empty
-    info = ""
+    stored_data = apply_filters(stored_data, filters)
+    method = heatmap_method if heatmap_method in METHODS else 'pearson'
+    key = view_key(stored_data, method)
+    if key is not None and key == rendered:
+        raise PreventUpdate
     
     if stored_data is None:
-        fig = go.Figure()
-        fig.add_annotation(text="Please upload data first", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-        return fig, ""
-
+        return message_figure("Please upload data first"), "", None
+    
     try:
-        if isinstance(stored_data, str):
-            df = pd.read_json(io.StringIO(stored_data), orient='split')
-        elif isinstance(stored_data, dict):
-            df = pd.DataFrame(stored_data)
-        else:
-            raise ValueError(f"Unexpected data type: {type(stored_data)}")
-            
+        df = load_bivariate_data(stored_data)
     except Exception as e:
-        fig = go.Figure()
-        fig.add_annotation(text=f"Error loading data: {str(e)}", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-        return fig, ""
+        return message_figure(f"Error loading data: {str(e)}"), "", None
+    
+    try:
+        fig, info = cached_figure((stored_data, 'heatmap', method), lambda: build_heatmap(df, stored_data, method))
+        return fig, info, key
+        
+    except Exception as e:
+        return message_figure(f"Error creating heatmap: {str(e)}"), "", None
 
-    # Heatmap
-    if analysis_type == 'heatmap':
-        try:
-            numeric_df = df.select_dtypes(include=['number'])
-            
-            if numeric_df.shape[1] < 2:
-                fig = go.Figure()
-                fig.add_annotation(text="Need at least 2 numeric columns for correlation heatmap", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-                return fig, ""
-            
-            corr_matrix = numeric_df.corr()
-            
-            fig = go.Figure(data=go.Heatmap(
-                z=corr_matrix.values, 
-                x=corr_matrix.columns, 
-                y=corr_matrix.columns, 
-                colorscale='RdBu', 
-                zmid=0, 
-                text=corr_matrix.values.round(2), 
-                texttemplate='%{text}', 
-                textfont={"size": 10}, 
-                colorbar=dict(title="Correlation")
-            ))
-            
-            fig.update_layout(
-                title="Correlation Heatmap", 
-                xaxis_title="Variables", 
-                yaxis_title="Variables", 
-                plot_bgcolor='rgba(0,0,0,0)', 
-                paper_bgcolor='rgba(0,0,0,0)', 
-                font=dict(color='white'), 
-                height=600
-            )
-            
-            info = dbc.Card([
-                dbc.CardHeader(html.H5("📊 Correlation Analysis Info", style={'color': '#00d9ff'})),
-                dbc.CardBody([
-                    html.P([
-                        html.Strong("How to read: "),
-                        "Values range from -1 to +1"
-                    ]),
-                    html.Ul([
-                        html.Li("1.0 = Perfect positive correlation (values increase together)"),
-                        html.Li("0.0 = No correlation"),
-                        html.Li("-1.0 = Perfect negative correlation (one increases, other decreases)"),
-                    ]),
-                    html.P([
-                        html.Strong("Number of numeric variables: "),
-                        f"{numeric_df.shape[1]}"
-                    ], className="mb-0")
-                ])
-            ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
-            
-            return fig, info
-            
-        except Exception as e:
-            fig = go.Figure()
-            fig.add_annotation(text=f"Error creating heatmap: {str(e)}", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-            fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-            return fig, ""
 
-    if x_col is None or y_col is None:
-        fig = go.Figure()
-        fig.add_annotation(text="Please select X & Y columns", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-        return fig, ""
+def build_heatmap(df, stored_data, method):
+    digests = derive(stored_data, 'column-digests', lambda: column_digests(df))
+    corr_matrix = derive(stored_data, ('correlation', method), lambda: correlation_matrix(df, method, digests))
+    kind = "categorical" if method == 'cramers_v' else "numeric"
+    
+    if corr_matrix.shape[1] < 2:
+        return message_figure(f"Need at least 2 {kind} columns for {METHODS[method]} heatmap"), ""
+    
+    if method == 'cramers_v':
+        scale = dict(colorscale='Blues', zmin=0, zmax=1)
+    else:
+        scale = dict(colorscale='RdBu', zmid=0)
+    
+    fig = go.Figure(data=go.Heatmap(
+        z=corr_matrix.values, 
+        x=corr_matrix.columns, 
+        y=corr_matrix.columns, 
+        text=corr_matrix.values.round(2), 
+        texttemplate='%{text}', 
+        textfont={"size": 10}, 
+        colorbar=dict(title=METHODS[method]),
+        **scale
+    ))
+    
+    fig.update_layout(
+        title="Correlation Heatmap" if method == 'pearson' else f"{METHODS[method]} Heatmap", 
+        xaxis_title="Variables", 
+        yaxis_title="Variables", 
+        plot_bgcolor='rgba(0,0,0,0)', 
+        paper_bgcolor='rgba(0,0,0,0)', 
+        font=dict(color='white'), 
+        height=600
+    )
+    
+    if method == 'cramers_v':
+        how_to_read = [
+            "Values range from 0 to 1",
+            html.Ul([
+                html.Li("1.0 = One category fully determines the other"),
+                html.Li("0.0 = No association"),
+                html.Li("Based on the chi-square statistic of each contingency table"),
+            ]),
+        ]
+    else:
+        how_to_read = [
+            "Values range from -1 to +1",
+            html.Ul([
+                html.Li("1.0 = Perfect positive correlation (values increase together)"),
+                html.Li("0.0 = No correlation"),
+                html.Li("-1.0 = Perfect negative correlation (one increases, other decreases)"),
+            ]),
+        ]
+        if method == 'spearman':
+            how_to_read.append(html.P("Spearman compares ranks, so it also captures monotonic non-linear relationships."))
+    
+    info = dbc.Card([
+        dbc.CardHeader(html.H5("📊 Correlation Analysis Info", style={'color': '#00d9ff'})),
+        dbc.CardBody([
+            html.P([
+                html.Strong("How to read: "),
+                how_to_read[0]
+            ]),
+            *how_to_read[1:],
+            html.P([
+                html.Strong(f"Number of {kind} variables: "),
+                f"{corr_matrix.shape[1]}"
+            ], className="mb-0")
+        ])
+    ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
+    
+    return fig, info
 
-    try:
-        # Scatter
-        if chart_type == 'scatter':
-            if is_numeric_column(df[x_col]) and is_numeric_column(df[y_col]):
-                df_plot = df[[x_col, y_col]].dropna()
-                
-                if len(df_plot) == 0:
-                    fig = go.Figure()
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                    info = ""
-                else:
-                    fig = px.scatter(df_plot, x=x_col, y=y_col, trendline="ols", title=f"Scatter Plot: {x_col} vs {y_col}")
-                    
-                    corr = df_plot[[x_col, y_col]].corr().iloc[0, 1]
-                    
-                    info = dbc.Alert([
-                        html.Strong("Correlation Coefficient: "),
-                        f"{corr:.3f}",
-                        html.Br(),
-                        html.Small(f"Strength: {'Strong' if abs(corr) > 0.7 else 'Moderate' if abs(corr) > 0.4 else 'Weak'}")
-                    ], color="info")
-                
+
+def build_two_var_figure(df, stored_data, x_col, y_col, chart_type, render_mode):
+    # plotly.express is imported on first use to keep worker start-up fast
+    import plotly.express as px
+    
+    # Scatter
+    if chart_type == 'scatter':
+        if is_numeric_column(df[x_col]) and is_numeric_column(df[y_col]):
+            x, y = paired_values(df, x_col, y_col)
+            
+            if len(x) == 0:
+                fig = message_figure("No data available after removing missing values")
             else:
-                fig = go.Figure()
-                fig.add_annotation(text="Scatter plot requires both columns to be numeric", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                info = ""
-
-        # Bar
-        elif chart_type == 'bar':
-            if is_categorical_column(df[x_col]) and is_numeric_column(df[y_col]):
-                df_plot = df[[x_col, y_col]].dropna()
+                mode = scatter_mode(render_mode, len(x))
+                title = f"Scatter Plot: {x_col} vs {y_col}"
                 
-                if len(df_plot) == 0:
-                    fig = go.Figure()
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+                if mode == 'density':
+                    density = derive(stored_data, ('scatter-density', x_col, y_col), lambda: density_grid(x, y))
+                    fig = density_figure(density, title, x_col, y_col)
+                elif mode == 'sample':
+                    index = derive(stored_data, ('scatter-sample', x_col, y_col), lambda: stratified_sample(x, y))
+                    fig = sample_figure(x, y, index, title, x_col, y_col)
                 else:
-                    df_plot[x_col] = df_plot[x_col].astype(str)
-                    
-                    grouped = df_plot.groupby(x_col)[y_col].mean().reset_index()
-                    fig = px.bar(grouped, x=x_col, y=y_col, title=f"Bar Chart: {x_col} vs {y_col}")
-                    fig.update_traces(marker=dict(line=dict(color='#00d9ff', width=1)))
-                info = ""
-            else:
-                fig = go.Figure()
-                fig.add_annotation(text="Bar chart requires X categorical and Y numeric", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                info = ""
-
-        # Grouped Bar Chart (for categorical vs categorical)
-        elif chart_type == 'grouped_bar':
-            if is_categorical_column(df[x_col]) and is_categorical_column(df[y_col]):
-                df_plot = df[[x_col, y_col]].dropna()
+                    fig = px.scatter(x=x, y=y, labels={'x': x_col, 'y': y_col}, title=title)
                 
-                if len(df_plot) == 0:
-                    fig = go.Figure()
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    df_plot[x_col] = df_plot[x_col].astype(str)
-                    df_plot[y_col] = df_plot[y_col].astype(str)
-                    
-                    crosstab = pd.crosstab(df_plot[x_col], df_plot[y_col])
-                    
-                    fig = go.Figure()
-                    for col in crosstab.columns:
-                        fig.add_trace(go.Bar(
-                            name=col,
-                            x=crosstab.index,
-                            y=crosstab[col],
-                            marker=dict(line=dict(color='#00d9ff', width=1))
-                        ))
-                    
-                    fig.update_layout(
-                        barmode='group',  # Bars side-by-side
-                        title=f"Grouped Bar Chart: {x_col} vs {y_col}",
-                        xaxis_title=x_col,
-                        yaxis_title="Count"
-                    )
-                info = ""
+                # The trendline is fitted on every row, whatever the rendering
+                fit = derive(stored_data, ('ols', x_col, y_col), lambda: fit_xy(x, y))
+                fig = add_trendline(fig, fit, (x.min(), x.max()))
+        else:
+            fig = message_figure("Scatter plot requires both columns to be numeric")
+
+    # Bar
+    elif chart_type == 'bar':
+        if is_categorical_column(df[x_col]) and is_numeric_column(df[y_col]):
+            df_plot = df[[x_col, y_col]].dropna()
+            
+            if len(df_plot) == 0:
+                fig = message_figure("No data available after removing missing values")
             else:
-                fig = go.Figure()
-                fig.add_annotation(text="Grouped bar chart requires both X and Y to be categorical", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                info = ""
-
-        # Stacked Bar
-        elif chart_type == 'stacked_bar':
-            if is_categorical_column(df[x_col]) and is_categorical_column(df[y_col]):
-                df_plot = df[[x_col, y_col]].dropna()
+                df_plot[x_col] = df_plot[x_col].astype(str)
                 
-                if len(df_plot) == 0:
-                    fig = go.Figure()
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    df_plot[x_col] = df_plot[x_col].astype(str)
-                    df_plot[y_col] = df_plot[y_col].astype(str)
-                    
-                    crosstab = pd.crosstab(df_plot[x_col], df_plot[y_col])
-                    
-                    fig = go.Figure()
-                    for col in crosstab.columns:
-                        fig.add_trace(go.Bar(
-                            name=col, 
-                            x=crosstab.index, 
-                            y=crosstab[col], 
-                            marker=dict(line=dict(color='#00d9ff', width=1))
-                        ))
-                    
-                    fig.update_layout(
-                        barmode='stack',  # Bars stacked on top
-                        title=f"Stacked Bar Chart: {x_col} vs {y_col}", 
-                        xaxis_title=x_col, 
-                        yaxis_title="Count"
-                    )
-                info = ""
+                grouped = df_plot.groupby(x_col)[y_col].mean().reset_index()
+                fig = px.bar(grouped, x=x_col, y=y_col, title=f"Bar Chart: {x_col} vs {y_col}")
+                fig.update_traces(marker=dict(line=dict(color='#00d9ff', width=1)))
+        else:
+            fig = message_figure("Bar chart requires X categorical and Y numeric")
+
+    # Grouped / Stacked Bar Chart (for categorical vs categorical)
+    # Both read the same cached crosstab, so switching between them only changes barmode
+    elif chart_type in ('grouped_bar', 'stacked_bar'):
+        name = "Grouped bar chart" if chart_type == 'grouped_bar' else "Stacked bar chart"
+        if is_categorical_column(df[x_col]) and is_categorical_column(df[y_col]):
+            summary = derive(stored_data, ('crosstab', x_col, y_col), lambda: crosstab_summary(df, x_col, y_col))
+            
+            if summary['table'].empty:
+                fig = message_figure("No data available after removing missing values")
             else:
-                fig = go.Figure()
-                fig.add_annotation(text="Stacked bar chart requires both X and Y to be categorical", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                info = ""
-
-        # Box
-        elif chart_type == 'box':
-            if is_categorical_column(df[x_col]) and is_numeric_column(df[y_col]):
-                df_plot = df[[x_col, y_col]].dropna()
-                
-                if len(df_plot) == 0:
-                    fig = go.Figure()
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    df_plot[x_col] = df_plot[x_col].astype(str)
-                    
-                    fig = px.box(df_plot, x=x_col, y=y_col, title=f"Box Plot: {x_col} vs {y_col}")
-                info = ""
+                fig = crosstab_figure(
+                    summary['table'],
+                    barmode='group' if chart_type == 'grouped_bar' else 'stack',
+                    title=f"{'Grouped' if chart_type == 'grouped_bar' else 'Stacked'} Bar Chart: {x_col} vs {y_col}"
+                )
+        else:
+            fig = message_figure(f"{name} requires both X and Y to be categorical")
+
+    # Box
+    elif chart_type == 'box':
+        if is_categorical_column(df[x_col]) and is_numeric_column(df[y_col]):
+            df_plot = df[[x_col, y_col]].dropna()
+            
+            if len(df_plot) == 0:
+                fig = message_figure("No data available after removing missing values")
             else:
-                fig = go.Figure()
-                fig.add_annotation(text="Box plot requires X categorical and Y numeric", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                info = ""
-
-        # Violin
-        elif chart_type == 'violin':
-            if is_categorical_column(df[x_col]) and is_numeric_column(df[y_col]):
-                df_plot = df[[x_col, y_col]].dropna()
-                
-                if len(df_plot) == 0:
-                    fig = go.Figure()
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    df_plot[x_col] = df_plot[x_col].astype(str)
-                    
-                    fig = px.violin(df_plot, x=x_col, y=y_col, box=True, title=f"Violin Plot: {x_col} vs {y_col}")
-                info = ""
+                groups = derive(stored_data, ('box', x_col, y_col),
+                                lambda: [(label, box_summary(values)) for label, values in grouped_values(df, x_col, y_col)])
+                fig = box_figure(groups, f"Box Plot: {x_col} vs {y_col}", x_col, y_col)
+        else:
+            fig = message_figure("Box plot requires X categorical and Y numeric")
+
+    # Violin
+    elif chart_type == 'violin':
+        if is_categorical_column(df[x_col]) and is_numeric_column(df[y_col]):
+            df_plot = df[[x_col, y_col]].dropna()
+            
+            if len(df_plot) == 0:
+                fig = message_figure("No data available after removing missing values")
             else:
-                fig = go.Figure()
-                fig.add_annotation(text="Violin plot requires X categorical and Y numeric", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                info = ""
-        
+                groups = derive(stored_data, ('violin', x_col, y_col),
+                                lambda: [(label, kde_summary(values)) for label, values in grouped_values(df, x_col, y_col)])
+                fig = violin_figure(groups, f"Violin Plot: {x_col} vs {y_col}", x_col, y_col)
         else:
-            # Unknown chart type
-            fig = go.Figure()
-            fig.add_annotation(text="Unknown chart type selected", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-            info = ""
+            fig = message_figure("Violin plot requires X categorical and Y numeric")
+    
+    else:
+        # Unknown chart type
+        fig = message_figure("Unknown chart type selected")
+
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='white'), height=600)
+    return fig
+
+
+# Two-variable chart
+@app.callback(
+    Output('two-var-figure', 'data'),
+    Output('two-var-rendered', 'data'),
+    Input('analysis-type', 'value'),
+    Input('bivariate-x', 'value'),
+    Input('bivariate-y', 'value'),
+    Input('bivariate-chart-type', 'value'),
+    Input('scatter-render-mode', 'value'),
+    Input('stored-data', 'data'),
+    Input('active-filters', 'data'),
+    State('two-var-rendered', 'data')
+)
+def update_two_var_plot(analysis_type, x_col, y_col, chart_type, render_mode, stored_data, filters, rendered):
+    if analysis_type == 'heatmap':
+        raise PreventUpdate
+    
+    stored_data = apply_filters(stored_data, filters)
+    # The rendering mode only matters for scatter plots
+    mode = render_mode if chart_type == 'scatter' else None
+    key = view_key(stored_data, x_col, y_col, chart_type, mode)
+    if key is not None and key == rendered:
+        raise PreventUpdate
+    
+    if stored_data is None:
+        return message_figure("Please upload data first"), None
+    
+    try:
+        df = load_bivariate_data(stored_data)
+    except Exception as e:
+        return message_figure(f"Error loading data: {str(e)}"), None
+    
+    if x_col is None or y_col is None:
+        return message_figure("Please select X & Y columns"), None
+    
+    try:
+        fig, = cached_figure((stored_data, 'two-var', x_col, y_col, chart_type, mode),
+                             lambda: (build_two_var_figure(df, stored_data, x_col, y_col, chart_type, render_mode),))
+        return fig, key
+    except Exception as e:
+        return message_figure(f"Error creating visualization: {str(e)}"), None
 
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='white'), height=600)
-        return fig, info
 
+# Two-variable info card
+@app.callback(
+    Output('correlation-info', 'children'),
+    Input('analysis-type', 'value'),
+    Input('bivariate-x', 'value'),
+    Input('bivariate-y', 'value'),
+    Input('bivariate-chart-type', 'value'),
+    Input('scatter-render-mode', 'value'),
+    Input('stored-data', 'data'),
+    Input('active-filters', 'data')
+)
+def update_two_var_info(analysis_type, x_col, y_col, chart_type, render_mode, stored_data, filters):
+    if analysis_type == 'heatmap':
+        raise PreventUpdate
+    if ctx.triggered_id == 'scatter-render-mode' and chart_type != 'scatter':
+        raise PreventUpdate
+    stored_data = apply_filters(stored_data, filters)
+    if stored_data is None or x_col is None or y_col is None or chart_type not in ('scatter', 'grouped_bar', 'stacked_bar'):
+        return ""
+    
+    try:
+        df = load_bivariate_data(stored_data)
+        if chart_type in ('grouped_bar', 'stacked_bar'):
+            if not (is_categorical_column(df[x_col]) and is_categorical_column(df[y_col])):
+                return ""
+            summary = derive(stored_data, ('crosstab', x_col, y_col), lambda: crosstab_summary(df, x_col, y_col))
+            return chi_square_info(summary['stats'])
+        
+        if not (is_numeric_column(df[x_col]) and is_numeric_column(df[y_col])):
+            return ""
+        
+        x, y = paired_values(df, x_col, y_col)
+        if len(x) == 0:
+            return ""
+        
+        mode = scatter_mode(render_mode, len(x))
+        if mode == 'density':
+            rendering = f"Density heatmap of {len(x):,} points"
+        elif mode == 'sample':
+            index = derive(stored_data, ('scatter-sample', x_col, y_col), lambda: stratified_sample(x, y))
+            rendering = f"Stratified sample of {len(index):,} / {len(x):,} points"
+        else:
+            rendering = f"All {len(x):,} points"
+        
+        fit = derive(stored_data, ('ols', x_col, y_col), lambda: fit_xy(x, y))
+        return regression_info(fit, rendering)
     except Exception as e:
-        fig = go.Figure()
-        fig.add_annotation(text=f"Error creating visualization: {str(e)}", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-        return fig, ""
\ No newline at end of file
+        return dbc.Alert(f"Error computing statistics: {str(e)}", color="danger")
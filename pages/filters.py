@@ -0,0 +1,98 @@
+from dash import html, dcc, Input, Output, State, ctx, no_update
+import dash_bootstrap_components as dbc
+from app import app
+from data_loader import load_dataframe
+from data_store import derive
+from row_filter import bitmap_index, filter_summary, filterable_columns, normalize_filters
+
+
+def filter_panel():
+    """Global filter panel, part of the main layout so the filter follows the user across pages"""
+    return html.Div([
+        dcc.Store(id='active-filters', data={}),
+        dbc.Accordion([
+            dbc.AccordionItem([
+                dbc.Row([
+                    dbc.Col([
+                        dcc.Dropdown(id='filter-column', placeholder="Filter column...", style={'color': 'black'})
+                    ], width=4),
+                    dbc.Col([
+                        dcc.Dropdown(id='filter-values', multi=True, placeholder="Keep rows with...", style={'color': 'black'})
+                    ], width=5),
+                    dbc.Col([
+                        dbc.Button([html.I(className="fas fa-filter"), " Apply"], id='filter-apply', color="primary", className="me-2"),
+                        dbc.Button([html.I(className="fas fa-times"), " Clear"], id='filter-clear', color="secondary")
+                    ], width=3)
+                ], className="mb-2"),
+                html.Div(id='filter-summary')
+            ], title="Global Filters")
+        ], start_collapsed=True, className="mb-3")
+    ])
+
+
+# Filterable columns (categorical codes from convert_data_types)
+@app.callback(
+    Output('filter-column', 'options'),
+    Input('stored-data', 'data')
+)
+def update_filter_columns(stored_data):
+    df = load_dataframe(stored_data)
+    if df is None:
+        return []
+    columns = derive(stored_data, 'filterable-columns', lambda: filterable_columns(df))
+    return [{'label': col, 'value': col} for col in columns]
+
+
+# Values of the selected column, with their row counts, pre-selecting the active filter
+@app.callback(
+    Output('filter-values', 'options'),
+    Output('filter-values', 'value'),
+    Input('filter-column', 'value'),
+    State('stored-data', 'data'),
+    State('active-filters', 'data')
+)
+def update_filter_values(column, stored_data, filters):
+    df = load_dataframe(stored_data)
+    if df is None or column is None or column not in df.columns:
+        return [], []
+    index = bitmap_index(stored_data, df, column)
+    options = [{'label': f"{label} ({count:,})", 'value': label} for label, count in zip(index.labels, index.counts)]
+    return options, (filters or {}).get(column, [])
+
+
+# Add/replace the filter of one column, clear all, or reset when a new dataset is loaded
+@app.callback(
+    Output('active-filters', 'data'),
+    Input('filter-apply', 'n_clicks'),
+    Input('filter-clear', 'n_clicks'),
+    Input('stored-data', 'data'),
+    State('filter-column', 'value'),
+    State('filter-values', 'value'),
+    State('active-filters', 'data'),
+    prevent_initial_call=True
+)
+def update_active_filters(apply_clicks, clear_clicks, stored_data, column, values, filters):
+    triggered = ctx.triggered_id
+    if triggered in ('filter-clear', 'stored-data'):
+        return {}
+    if triggered == 'filter-apply' and column:
+        filters = dict(filters or {})
+        filters[column] = values or []
+        return normalize_filters(filters)
+    return no_update
+
+
+@app.callback(
+    Output('filter-summary', 'children'),
+    Input('active-filters', 'data'),
+    Input('stored-data', 'data')
+)
+def update_filter_summary(filters, stored_data):
+    filters = normalize_filters(filters)
+    if not filters or stored_data is None:
+        return html.Small("No filters applied - all rows are used.", className="text-muted")
+    matches, total = filter_summary(stored_data, filters)
+    badges = [dbc.Badge(f"{col}: {', '.join(values)}", color="info", className="me-2") for col, values in filters.items()]
+    return html.Div(badges + [
+        html.Small(f"{matches:,} of {total:,} rows match", className="text-muted ms-2")
+    ])
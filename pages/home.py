@@ -1,9 +1,11 @@
 import dash
 from dash import dcc, html
 import dash_bootstrap_components as dbc
+from functools import lru_cache
 
 dash.register_page(__name__, path="/")   
 
+@lru_cache(maxsize=None)
 def home_page():
     return dbc.Container([
         # Header
@@ -154,4 +156,4 @@ def home_page():
         ])
     ], fluid=True)
 
-layout = home_page()
\ No newline at end of file
+layout = home_page  # built on first request, then cached
\ No newline at end of file
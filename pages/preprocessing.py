@@ -1,25 +1,74 @@
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, Input, Output, State, ClientsideFunction
 import dash
 import dash_bootstrap_components as dbc
 import pandas as pd
-from sklearn.preprocessing import StandardScaler, MinMaxScaler, LabelEncoder
-from sklearn.model_selection import train_test_split
+import base64
+import pickle
+from functools import lru_cache
 from app import app
-import io
+from data_store import put_dataset
+from data_serializer import SERIALIZERS, available_formats, arrow_compatible, encode_dataframe
+import data_loader
+from data_profile import get_profile
+from table_view import summary_table
+from version_history import get_history, materialize, session_history
+from pipeline import apply_step, describe_step, from_json, run_pipeline, to_column_transformer, to_json
+
+DOWNLOAD_FORMAT_LABELS = {'parquet': 'Parquet', 'arrow': 'Arrow IPC'}
 
 
 # Helper function to safely load DataFrame from stored data
 def load_dataframe(data):
-    """Load DataFrame from stored data, handling both JSON string and dict/list formats"""
-    if isinstance(data, str):
-        return pd.read_json(io.StringIO(data), orient='split')
-    else:
-        return pd.DataFrame(data)
+    """Load a private copy of the stored DataFrame through the shared loader"""
+    df = data_loader.load_dataframe(data)
+    if df is None:
+        raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+    # Shallow copy - the loaded frame is shared with the analysis pages and the
+    # version history, so steps assign whole columns (df[col] = ...) instead of
+    # modifying them in place; columns a step does not touch stay shared
+    return df.copy(deep=False)
+
+
+def store_dataframe(df):
+    """Register a transformed DataFrame server-side and return its handle.
+
+    The frame is persisted to the spill directory, so the web workers can load
+    results of background callbacks and of steps run by another worker.
+    """
+    return put_dataset(df)
+
+
+def recorded_step(handle, step):
+    """preprocessing-step payload: the pipeline step(s) that produced the dataset `handle`"""
+    return {'handle': handle, 'steps': step if isinstance(step, list) else [step]}
+
+
+def report_progress(set_progress, done, total):
+    percent = int(done * 100 / total) if total else 100
+    set_progress((percent, f"{percent}%"))
+
+
+def background_options(name):
+    """running/cancel/progress wiring shared by the heavy background callbacks"""
+    return dict(
+        background=True,
+        running=[
+            (Output(f'apply-{name}', 'disabled'), True, False),
+            (Output(f'cancel-{name}', 'disabled'), False, True),
+            (Output(f'{name}-progress', 'style'), {'display': 'flex'}, {'display': 'none'}),
+        ],
+        cancel=[Input(f'cancel-{name}', 'n_clicks')],
+        progress=[Output(f'{name}-progress', 'value'), Output(f'{name}-progress', 'label')],
+    )
 
 
+@lru_cache(maxsize=None)
 def preprocessing_page():
     return dbc.Container([
         dcc.Store(id='preprocessing-data', storage_type='memory'),
+        dcc.Store(id='preprocessing-history', storage_type='memory'),
+        dcc.Store(id='preprocessing-step', storage_type='memory'),
+        dcc.Download(id='download-pipeline'),
         dcc.Download(id='download-dataframe-csv'),
         
         dbc.Row([
@@ -31,6 +80,47 @@ def preprocessing_page():
             ], width=12)
         ]),
         
+        # Version History
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardBody([
+                        dbc.Button([html.I(className="fas fa-undo me-2"), "Undo"], id='history-undo',
+                                   color="secondary", className="me-2", disabled=True),
+                        dbc.Button([html.I(className="fas fa-redo me-2"), "Redo"], id='history-redo',
+                                   color="secondary", className="me-3", disabled=True),
+                        html.Span(id='history-status', className="text-muted")
+                    ])
+                ], className="mb-3", style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
+            ], width=12)
+        ]),
+        
+        # Recorded Pipeline
+        dbc.Row([
+            dbc.Col([
+                dbc.Card([
+                    dbc.CardHeader(html.H5("Recorded Pipeline", style={'color': '#00d9ff'})),
+                    dbc.CardBody([
+                        html.P("Every step below is recorded. Export it and re-apply it to the next survey export "
+                               "in one pass.", className="text-muted mb-3"),
+                        html.Div(id='pipeline-steps', className="mb-3"),
+                        dbc.Button([html.I(className="fas fa-file-code me-2"), "Export JSON"],
+                                   id='export-pipeline-json', color="info", className="me-2"),
+                        dbc.Button([html.I(className="fas fa-cubes me-2"), "Export sklearn ColumnTransformer"],
+                                   id='export-pipeline-sklearn', color="info", className="me-2"),
+                        dcc.Upload(
+                            id='pipeline-upload',
+                            children=dbc.Button([html.I(className="fas fa-play me-2"), "Apply Pipeline JSON"],
+                                                color="success"),
+                            accept='.json',
+                            style={'display': 'inline-block'}
+                        ),
+                        html.Div(id='pipeline-status', className="mt-3")
+                    ])
+                ], className="mb-3", style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
+            ], width=12)
+        ]),
+        
         # Drop Columns Section - NEW
         dbc.Row([
             dbc.Col([
@@ -227,7 +317,10 @@ def preprocessing_page():
                             value='standard',
                             className="mb-3"
                         ),
-                        dbc.Button("Apply Normalization", id='apply-normalize', color="success"),
+                        dbc.Button("Apply Normalization", id='apply-normalize', color="success", className="me-2"),
+                        dbc.Button("Cancel", id='cancel-normalize', color="secondary", disabled=True),
+                        dbc.Progress(id='normalize-progress', value=0, striped=True, animated=True,
+                                     className="mt-3", style={'display': 'none'}),
                         html.Div(id='normalize-output', className="mt-3")
                     ])
                 ], className="mb-3", style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
@@ -249,7 +342,10 @@ def preprocessing_page():
                             value='label',
                             className="mb-3"
                         ),
-                        dbc.Button("Apply Encoding", id='apply-encoding', color="success"),
+                        dbc.Button("Apply Encoding", id='apply-encoding', color="success", className="me-2"),
+                        dbc.Button("Cancel", id='cancel-encoding', color="secondary", disabled=True),
+                        dbc.Progress(id='encoding-progress', value=0, striped=True, animated=True,
+                                     className="mt-3", style={'display': 'none'}),
                         html.Div(id='encoding-output', className="mt-3")
                     ])
                 ], className="mb-3", style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
@@ -267,7 +363,10 @@ def preprocessing_page():
                                   marks={i: f'{i}%' for i in range(10, 45, 5)}),
                         dbc.Label("Random State", className="mt-3"),
                         dbc.Input(id='random-state', type='number', value=42, className="mb-3"),
-                        dbc.Button("Perform Split", id='apply-split', color="success"),
+                        dbc.Button("Perform Split", id='apply-split', color="success", className="me-2"),
+                        dbc.Button("Cancel", id='cancel-split', color="secondary", disabled=True),
+                        dbc.Progress(id='split-progress', value=0, striped=True, animated=True,
+                                     className="mt-3", style={'display': 'none'}),
                         html.Div(id='split-output', className="mt-3")
                     ])
                 ], className="mb-3", style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
@@ -283,8 +382,19 @@ def preprocessing_page():
                     dbc.CardBody([
                         html.P("Download your transformed dataset after applying preprocessing steps", 
                               className="text-muted mb-3"),
+                        dcc.RadioItems(
+                            id='download-format',
+                            options=[{'label': ' CSV', 'value': 'csv'}] + [
+                                {'label': f" {DOWNLOAD_FORMAT_LABELS[fmt]}", 'value': fmt}
+                                for fmt in available_formats() if fmt in DOWNLOAD_FORMAT_LABELS
+                            ],
+                            value='csv',
+                            inline=True,
+                            labelStyle={'marginRight': '20px'},
+                            className="mb-3"
+                        ),
                         dbc.Button(
-                            [html.I(className="fas fa-file-download me-2"), "Download CSV"],
+                            [html.I(className="fas fa-file-download me-2"), "Download"],
                             id='btn-download-csv',
                             color="success",
                             size="lg",
@@ -311,10 +421,145 @@ def preprocessing_page():
 # =================== LOAD DATA INTO LOCAL STORE ===================
 @app.callback(
     Output('preprocessing-data', 'data'),
-    Input('stored-data', 'data')
+    Output('preprocessing-history', 'data'),
+    Input('stored-data', 'data'),
+    Input('session-id', 'data')
 )
-def load_preprocessing_data(stored_data):
-    return stored_data
+def load_preprocessing_data(stored_data, session_id):
+    if session_id is None:
+        return stored_data, None
+    # One undo/redo history per session and dataset; coming back to the page
+    # resumes at the version the session was on
+    history_id = session_history(session_id, stored_data)
+    current = get_history(history_id).current
+    return (materialize(current) if current is not None else None) or stored_data, history_id
+
+
+# =================== VERSION HISTORY (UNDO / REDO) ===================
+# Every step writes its result handle to preprocessing-data; it is recorded
+# here as a new version, so the steps themselves know nothing about history.
+@app.callback(
+    Output('history-undo', 'disabled'),
+    Output('history-redo', 'disabled'),
+    Output('history-status', 'children'),
+    Output('pipeline-steps', 'children'),
+    Input('preprocessing-data', 'data'),
+    State('preprocessing-history', 'data'),
+    State('preprocessing-step', 'data')
+)
+def record_version(data, history_id, step):
+    history = get_history(history_id)
+    if data is None:
+        return True, True, "", ""
+    if history is None:
+        # Neither this worker nor the shared spill directory knows the session's history
+        message = "Undo history is not available for this session." if history_id else ""
+        return True, True, message, ""
+    
+    current = history.current
+    if current is None or current.handle != data:
+        df = data_loader.load_dataframe(data)
+        if df is None:
+            return True, True, "Dataset is no longer available on the server.", ""
+        steps = step['steps'] if step and step.get('handle') == data else None
+        current = history.record(data, df, steps)
+    
+    if current.steps:
+        pipeline_steps = html.Ol([html.Li(describe_step(s)) for s in current.steps], className="mb-0")
+    else:
+        pipeline_steps = html.Small("No steps recorded yet.", className="text-muted")
+    
+    return (
+        not history.can_undo,
+        not history.can_redo,
+        f"Version {history.position + 1} of {len(history.versions)}: {current.label} "
+        f"({history.nbytes() / 1024 / 1024:.1f} MB of history)",
+        pipeline_steps
+    )
+
+
+@app.callback(
+    Output('preprocessing-data', 'data', allow_duplicate=True),
+    Input('history-undo', 'n_clicks'),
+    Input('history-redo', 'n_clicks'),
+    State('preprocessing-history', 'data'),
+    prevent_initial_call=True
+)
+def undo_redo(undo_clicks, redo_clicks, history_id):
+    history = get_history(history_id)
+    if history is None:
+        return dash.no_update
+    offset = -1 if dash.ctx.triggered_id == 'history-undo' else 1
+    version = history.step(offset)
+    if version is None:
+        return dash.no_update
+    handle = materialize(version)
+    if handle is None:
+        # The version's dataset is gone from every worker, stay where we were
+        history.step(-offset)
+        return dash.no_update
+    return handle
+
+
+# =================== RECORDED PIPELINE ===================
+@app.callback(
+    Output('download-pipeline', 'data'),
+    Output('pipeline-status', 'children'),
+    Input('export-pipeline-json', 'n_clicks'),
+    Input('export-pipeline-sklearn', 'n_clicks'),
+    State('preprocessing-history', 'data'),
+    State('stored-data', 'data'),
+    prevent_initial_call=True
+)
+def export_pipeline(json_clicks, sklearn_clicks, history_id, stored_data):
+    history = get_history(history_id)
+    if history is None or history.current is None or not history.current.steps:
+        return None, dbc.Alert("No preprocessing steps recorded yet.", color="warning")
+    steps = history.current.steps
+    
+    try:
+        if dash.ctx.triggered_id == 'export-pipeline-json':
+            return dict(content=to_json(steps), filename="preprocessing_pipeline.json"), ""
+        
+        # Unfitted transformer over the columns of the loaded dataset
+        df = data_loader.load_dataframe(stored_data)
+        if df is None:
+            raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+        transformer = to_column_transformer(steps, df)
+        return dcc.send_bytes(pickle.dumps(transformer), "preprocessing_pipeline.pkl"), ""
+    except Exception as e:
+        return None, dbc.Alert(f"Error: {str(e)}", color="danger")
+
+
+@app.callback(
+    Output('pipeline-status', 'children', allow_duplicate=True),
+    Output('preprocessing-data', 'data', allow_duplicate=True),
+    Output('preprocessing-step', 'data', allow_duplicate=True),
+    Input('pipeline-upload', 'contents'),
+    State('pipeline-upload', 'filename'),
+    State('preprocessing-data', 'data'),
+    prevent_initial_call=True
+)
+def apply_pipeline(contents, filename, data):
+    if contents is None or data is None:
+        return "", dash.no_update, dash.no_update
+    
+    try:
+        steps = from_json(base64.b64decode(contents.split(',', 1)[1]).decode('utf-8'))
+        df = data_loader.load_dataframe(data)
+        if df is None:
+            raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+        
+        # All steps run on the in-memory frame; only the final result is registered
+        df = run_pipeline(df, steps)
+        updated_data = store_dataframe(df)
+        
+        return dbc.Alert(
+            f"✓ Applied {len(steps)} step(s) from {filename}. Dataset now has {len(df)} rows × {len(df.columns)} columns.",
+            color="success"
+        ), updated_data, recorded_step(updated_data, steps)
+    except Exception as e:
+        return dbc.Alert(f"Error applying {filename}: {str(e)}", color="danger"), dash.no_update, dash.no_update
 
 
 # =================== POPULATE DROPDOWN OPTIONS (UPDATED) ===================
@@ -340,7 +585,8 @@ def update_preprocessing_options(data):
 # =================== DROP COLUMNS CALLBACK ===================
 @app.callback(
     [Output('drop-column-status', 'children'),
-     Output('preprocessing-data', 'data', allow_duplicate=True)],
+     Output('preprocessing-data', 'data', allow_duplicate=True),
+     Output('preprocessing-step', 'data', allow_duplicate=True)],
     Input('drop-columns-btn', 'n_clicks'),
     [State('drop-column-dropdown', 'value'),
      State('preprocessing-data', 'data')],
@@ -348,14 +594,15 @@ def update_preprocessing_options(data):
 )
 def drop_selected_columns(n_clicks, columns_to_drop, data):
     if n_clicks == 0 or not columns_to_drop or data is None:
-        return "", data
+        return "", data, dash.no_update
     
     try:
         df = load_dataframe(data)
         original_columns = len(df.columns)
         
-        df = df.drop(columns=columns_to_drop)
-        updated_data = df.to_json(date_format='iso', orient='split')
+        step = {'op': 'drop', 'columns': list(columns_to_drop)}
+        df = apply_step(df, step)
+        updated_data = store_dataframe(df)
         
         success_msg = dbc.Alert([
             html.I(className="fas fa-check-circle me-2"),
@@ -368,25 +615,23 @@ def drop_selected_columns(n_clicks, columns_to_drop, data):
             ])
         ], color="success", dismissable=True)
         
-        return success_msg, updated_data
+        return success_msg, updated_data, recorded_step(updated_data, step)
         
     except Exception as e:
         error_msg = dbc.Alert([
             html.I(className="fas fa-exclamation-triangle me-2"),
             f"Error: {str(e)}"
         ], color="danger", dismissable=True)
-        return error_msg, data
+        return error_msg, data, dash.no_update
 
 
 # =================== SHOW/HIDE CUSTOM VALUE INPUT ===================
-@app.callback(
+# Runs in the browser, see assets/clientside.js
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggleCustomInput'),
     Output('custom-fill-value', 'style'),
     Input('missing-method-select', 'value')
 )
-def toggle_custom_input(method):
-    if method == 'custom':
-        return {'display': 'block'}
-    return {'display': 'none'}
 
 
 # =================== DOWNLOAD CSV CALLBACK ===================
@@ -394,15 +639,29 @@ def toggle_custom_input(method):
     Output('download-dataframe-csv', 'data'),
     Output('download-status', 'children'),
     Input('btn-download-csv', 'n_clicks'),
+    State('download-format', 'value'),
     State('preprocessing-data', 'data'),
     prevent_initial_call=True
 )
-def download_csv(n_clicks, data):
+def download_csv(n_clicks, file_format, data):
     if data is None:
         return None, dbc.Badge("⚠ No data to download", color="warning")
     
     try:
-        df = load_dataframe(data)
+        df = data_loader.load_dataframe(data)
+        if df is None:
+            raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+        
+        if file_format in DOWNLOAD_FORMAT_LABELS:
+            # Binary columnar formats keep category / Int64 / int32 dtypes
+            if not arrow_compatible(df):
+                return None, dbc.Badge(f"✗ {DOWNLOAD_FORMAT_LABELS[file_format]} cannot store interval (binned) columns - use CSV", color="warning")
+            fmt, payload = encode_dataframe(df.reset_index(drop=True), [file_format])
+            return (
+                dcc.send_bytes(payload, f"processed_data.{SERIALIZERS[fmt].extension}"),
+                dbc.Badge("✓ Download started!", color="success")
+            )
+        
         csv_string = df.to_csv(index=False, encoding='utf-8')
         
         return (
@@ -425,9 +684,11 @@ def check_missing(n_clicks, data):
         return "", {'display': 'none'}
     
     try:
-        df = load_dataframe(data)
-        missing = df.isnull().sum()
-        missing_pct = (df.isnull().sum() / len(df) * 100).round(2)
+        profile = get_profile(data)
+        if profile is None:
+            raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+        missing = pd.Series({name: col.missing for name, col in profile.columns.items()}, dtype='int64')
+        missing_pct = pd.Series({name: col.missing_pct for name, col in profile.columns.items()}, dtype='float64').round(2)
         
         missing_df = pd.DataFrame({
             'Column': missing.index,
@@ -451,13 +712,7 @@ def check_missing(n_clicks, data):
                 className="mb-3"
             )
         
-        table = dbc.Table.from_dataframe(
-            missing_df,
-            striped=True,
-            bordered=True,
-            hover=True,
-            className="table-dark"
-        )
+        table = summary_table('missing-table', missing_df)
         
         return html.Div([alert, table]), section_style
         
@@ -468,7 +723,8 @@ def check_missing(n_clicks, data):
 # =================== HANDLE MISSING VALUES ===================
 @app.callback(
     [Output('missing-action-output', 'children'),
-     Output('preprocessing-data', 'data', allow_duplicate=True)],
+     Output('preprocessing-data', 'data', allow_duplicate=True),
+     Output('preprocessing-step', 'data', allow_duplicate=True)],
     [Input('apply-missing-single', 'n_clicks'),
      Input('apply-missing-all', 'n_clicks')],
     [State('missing-column-select', 'value'),
@@ -479,7 +735,7 @@ def check_missing(n_clicks, data):
 )
 def handle_missing_values(n_single, n_all, column, method, custom_value, data):
     if data is None or method is None:
-        return "", data
+        return "", data, dash.no_update
     
     try:
         df = load_dataframe(data)
@@ -487,51 +743,31 @@ def handle_missing_values(n_single, n_all, column, method, custom_value, data):
         
         ctx = dash.callback_context
         if not ctx.triggered:
-            return "", data
+            return "", data, dash.no_update
         
         button_id = ctx.triggered[0]['prop_id'].split('.')[0]
         
         if button_id == 'apply-missing-single':
             if column is None:
-                return dbc.Alert("Please select a column", color="warning"), data
+                return dbc.Alert("Please select a column", color="warning"), data, dash.no_update
             columns_to_process = [column]
         else:
             columns_to_process = df.columns[df.isnull().any()].tolist()
         
-        for col in columns_to_process:
-            if method == 'drop':
-                df = df.dropna(subset=[col])
-            elif method == 'mean':
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    df[col].fillna(df[col].mean(), inplace=True)
-            elif method == 'median':
-                if pd.api.types.is_numeric_dtype(df[col]):
-                    df[col].fillna(df[col].median(), inplace=True)
-            elif method == 'mode':
-                mode_val = df[col].mode()
-                if len(mode_val) > 0:
-                    df[col].fillna(mode_val[0], inplace=True)
-            elif method == 'zero':
-                df[col].fillna(0, inplace=True)
-            elif method == 'ffill':
-                df[col].fillna(method='ffill', inplace=True)
-            elif method == 'bfill':
-                df[col].fillna(method='bfill', inplace=True)
-            elif method == 'custom':
-                if custom_value:
-                    df[col].fillna(custom_value, inplace=True)
-        
-        updated_data = df.to_json(date_format='iso', orient='split')
+        step = {'op': 'impute', 'columns': columns_to_process, 'method': method, 'value': custom_value}
+        df = apply_step(df, step)
+        
+        updated_data = store_dataframe(df)
         new_missing = df.isnull().sum().sum()
         
         message = f"✓ Handled missing values using '{method}' method. "
         message += f"Missing values reduced from {original_missing} to {new_missing}. "
         message += f"Processed {len(columns_to_process)} column(s)."
         
-        return dbc.Alert(message, color="success"), updated_data
+        return dbc.Alert(message, color="success"), updated_data, recorded_step(updated_data, step)
         
     except Exception as e:
-        return dbc.Alert(f"Error: {str(e)}", color="danger"), data
+        return dbc.Alert(f"Error: {str(e)}", color="danger"), data, dash.no_update
 
 
 # =================== CHECK DATA TYPES ===================
@@ -546,21 +782,18 @@ def check_dtypes(n_clicks, data):
         return "", {'display': 'none'}
     
     try:
-        df = load_dataframe(data)
+        profile = get_profile(data)
+        if profile is None:
+            raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+        columns = list(profile.columns.values())
         dtypes_df = pd.DataFrame({
-            'Column': df.dtypes.index,
-            'Data Type': df.dtypes.values.astype(str),
-            'Non-Null Count': df.count().values,
-            'Null Count': df.isnull().sum().values
+            'Column': [col.name for col in columns],
+            'Data Type': [col.dtype for col in columns],
+            'Non-Null Count': [col.count for col in columns],
+            'Null Count': [col.missing for col in columns]
         })
         
-        table = dbc.Table.from_dataframe(
-            dtypes_df,
-            striped=True,
-            bordered=True,
-            hover=True,
-            className="table-dark"
-        )
+        table = summary_table('dtypes-table', dtypes_df)
         
         return html.Div([table]), {'display': 'block'}
         
@@ -571,7 +804,8 @@ def check_dtypes(n_clicks, data):
 # =================== CONVERT DATA TYPES ===================
 @app.callback(
     [Output('dtype-action-output', 'children'),
-     Output('preprocessing-data', 'data', allow_duplicate=True)],
+     Output('preprocessing-data', 'data', allow_duplicate=True),
+     Output('preprocessing-step', 'data', allow_duplicate=True)],
     Input('apply-dtype-conversion', 'n_clicks'),
     [State('dtype-column-select', 'value'),
      State('dtype-target-select', 'value'),
@@ -580,40 +814,30 @@ def check_dtypes(n_clicks, data):
 )
 def convert_dtype(n_clicks, column, target_type, data):
     if n_clicks is None or data is None or column is None or target_type is None:
-        return "", data
+        return "", data, dash.no_update
     
     try:
         df = load_dataframe(data)
         original_type = df[column].dtype
         
-        if target_type == 'int':
-            df[column] = pd.to_numeric(df[column], errors='coerce').fillna(0).astype(int)
-        elif target_type == 'float':
-            df[column] = pd.to_numeric(df[column], errors='coerce')
-        elif target_type == 'str':
-            df[column] = df[column].astype(str)
-        elif target_type == 'datetime':
-            df[column] = pd.to_datetime(df[column], errors='coerce')
-        elif target_type == 'category':
-            df[column] = df[column].astype('category')
-        elif target_type == 'bool':
-            df[column] = df[column].astype(bool)
-        
-        updated_data = df.to_json(date_format='iso', orient='split')
+        step = {'op': 'cast', 'column': column, 'target': target_type}
+        df = apply_step(df, step)
+        updated_data = store_dataframe(df)
         
         return dbc.Alert(
             f"✓ Converted '{column}' from {original_type} to {target_type}",
             color="success"
-        ), updated_data
+        ), updated_data, recorded_step(updated_data, step)
         
     except Exception as e:
-        return dbc.Alert(f"Error: {str(e)}", color="danger"), data
+        return dbc.Alert(f"Error: {str(e)}", color="danger"), data, dash.no_update
 
 
 # =================== DISCRETIZATION ===================
 @app.callback(
     Output('discretize-output', 'children'),
     Output('preprocessing-data', 'data', allow_duplicate=True),
+    Output('preprocessing-step', 'data', allow_duplicate=True),
     Input('apply-discretize', 'n_clicks'),
     State('discretize-column', 'value'),
     State('n-bins', 'value'),
@@ -622,125 +846,127 @@ def convert_dtype(n_clicks, column, target_type, data):
 )
 def discretize_column(n_clicks, column, bins, data):
     if n_clicks is None or data is None or column is None:
-        return "", data
+        return "", data, dash.no_update
     
     try:
         df = load_dataframe(data)
         
         if not pd.api.types.is_numeric_dtype(df[column]):
-            return dbc.Alert("Error: Column must be numeric for discretization", color="danger"), data
+            return dbc.Alert("Error: Column must be numeric for discretization", color="danger"), data, dash.no_update
         
-        df[column + '_binned'] = pd.cut(df[column], bins=bins)
-        updated_data = df.to_json(date_format='iso', orient='split')
+        step = {'op': 'bin', 'column': column, 'bins': bins}
+        df = apply_step(df, step)
+        updated_data = store_dataframe(df)
         
         return dbc.Alert(
             f"✓ Column '{column}' has been discretized into {bins} bins. New column: '{column}_binned'", 
             color="success"
-        ), updated_data
+        ), updated_data, recorded_step(updated_data, step)
         
     except Exception as e:
-        return dbc.Alert(f"Error: {str(e)}", color="danger"), data
+        return dbc.Alert(f"Error: {str(e)}", color="danger"), data, dash.no_update
 
 
-# =================== NORMALIZATION ===================
+# =================== NORMALIZATION (BACKGROUND) ===================
 @app.callback(
     Output('normalize-output', 'children'),
     Output('preprocessing-data', 'data', allow_duplicate=True),
+    Output('preprocessing-step', 'data', allow_duplicate=True),
     Input('apply-normalize', 'n_clicks'),
     State('normalization-type', 'value'),
     State('preprocessing-data', 'data'),
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    **background_options('normalize')
 )
-def normalize_data(n_clicks, norm_type, data):
+def normalize_data(set_progress, n_clicks, norm_type, data):
     if n_clicks is None or data is None:
-        return "", data
+        return "", data, dash.no_update
     
     try:
         df = load_dataframe(data)
         numeric_cols = df.select_dtypes(include='number').columns
         
         if len(numeric_cols) == 0:
-            return dbc.Alert("Error: No numeric columns found to normalize", color="warning"), data
+            return dbc.Alert("Error: No numeric columns found to normalize", color="warning"), data, dash.no_update
         
-        if norm_type == 'standard':
-            scaler = StandardScaler()
-        else:
-            scaler = MinMaxScaler()
+        step = {'op': 'scale', 'columns': numeric_cols.tolist(), 'method': norm_type}
+        df = apply_step(df, step, progress=lambda done, total: report_progress(set_progress, done, total))
         
-        df[numeric_cols] = scaler.fit_transform(df[numeric_cols])
-        updated_data = df.to_json(date_format='iso', orient='split')
+        updated_data = store_dataframe(df)
         
         return dbc.Alert(
             f"✓ Applied {norm_type} normalization to {len(numeric_cols)} numeric columns.", 
             color="success"
-        ), updated_data
+        ), updated_data, recorded_step(updated_data, step)
         
     except Exception as e:
-        return dbc.Alert(f"Error: {str(e)}", color="danger"), data
+        return dbc.Alert(f"Error: {str(e)}", color="danger"), data, dash.no_update
 
 
-# =================== ENCODING (FIXED) ===================
+# =================== ENCODING (BACKGROUND) ===================
 @app.callback(
     Output('encoding-output', 'children'),
     Output('preprocessing-data', 'data', allow_duplicate=True),
+    Output('preprocessing-step', 'data', allow_duplicate=True),
     Input('apply-encoding', 'n_clicks'),
     State('encoding-type', 'value'),
     State('preprocessing-data', 'data'),
-    prevent_initial_call=True
+    prevent_initial_call=True,
+    **background_options('encoding')
 )
-def encode_data(n_clicks, enc_type, data):
+def encode_data(set_progress, n_clicks, enc_type, data):
     if n_clicks is None or data is None:
-        return "", data
+        return "", data, dash.no_update
     
     try:
         df = load_dataframe(data)
         
-        # Get categorical columns (both object and category types)
-        categorical_cols = df.select_dtypes(include=['object', 'category']).columns.tolist()
+        # Get categorical columns (object, Arrow string and category types)
+        categorical_cols = df.select_dtypes(include=['object', 'string', 'category']).columns.tolist()
         
         if len(categorical_cols) == 0:
-            return dbc.Alert("Error: No categorical columns found to encode", color="warning"), data
-        
-        # CRITICAL FIX: Convert all categorical columns to string to avoid dict/category issues
-        for col in categorical_cols:
-            df[col] = df[col].astype(str)
+            return dbc.Alert("Error: No categorical columns found to encode", color="warning"), data, dash.no_update
         
-        if enc_type == 'label':
-            for col in categorical_cols:
-                le = LabelEncoder()
-                df[col] = le.fit_transform(df[col])
-        else:  # one-hot
-            df = pd.get_dummies(df, columns=categorical_cols)
+        step = {'op': 'encode', 'columns': categorical_cols, 'method': enc_type}
+        df = apply_step(df, step, progress=lambda done, total: report_progress(set_progress, done, total))
         
-        updated_data = df.to_json(date_format='iso', orient='split')
+        updated_data = store_dataframe(df)
         
         return dbc.Alert(
             f"✓ Applied {enc_type} encoding to {len(categorical_cols)} categorical columns.", 
             color="success"
-        ), updated_data
+        ), updated_data, recorded_step(updated_data, step)
         
     except Exception as e:
         import traceback
         traceback.print_exc()
-        return dbc.Alert(f"Error: {str(e)}", color="danger"), data
+        return dbc.Alert(f"Error: {str(e)}", color="danger"), data, dash.no_update
 
 
-# =================== TRAIN-TEST SPLIT ===================
+# =================== TRAIN-TEST SPLIT (BACKGROUND) ===================
 @app.callback(
     Output('split-output', 'children'),
     Input('apply-split', 'n_clicks'),
     State('test-size', 'value'),
     State('random-state', 'value'),
-    State('preprocessing-data', 'data')
+    State('preprocessing-data', 'data'),
+    prevent_initial_call=True,
+    **background_options('split')
 )
-def split_data(n_clicks, test_size, random_state, data):
+def split_data(set_progress, n_clicks, test_size, random_state, data):
     if n_clicks is None or data is None:
         return ""
     
     try:
-        df = load_dataframe(data)
+        report_progress(set_progress, 0, 2)
+        df = data_loader.load_dataframe(data)
+        if df is None:
+            raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
+        report_progress(set_progress, 1, 2)
         test_frac = test_size / 100
+        from sklearn.model_selection import train_test_split
         train_df, test_df = train_test_split(df, test_size=test_frac, random_state=random_state)
+        report_progress(set_progress, 2, 2)
         
         return dbc.Alert([
             html.H5("✓ Train-Test Split Complete", className="alert-heading"),
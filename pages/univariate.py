@@ -1,10 +1,17 @@
-from dash import html, dcc, Input, Output, State
+from dash import html, dcc, Input, Output, State, ClientsideFunction
 import dash_bootstrap_components as dbc
-import plotly.express as px
 import plotly.graph_objects as go
 import pandas as pd
-import io
+from functools import lru_cache
 from app import app
+from data_loader import load_dataframe
+from data_profile import get_profile
+from data_store import derive
+from row_filter import apply_filters
+from figure_cache import cached_figure
+from metrics import log_event
+from plot_aggregates import (box_figure, box_summary, histogram_counts, histogram_figure, kde_summary,
+                             numeric_values, violin_figure)
 
 
 def is_categorical_column(series):
@@ -15,6 +22,7 @@ def is_numeric_column(series):
     return pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
 
 
+@lru_cache(maxsize=None)
 def univariate_page():
     return dbc.Container([
         dbc.Row([
@@ -80,7 +88,10 @@ def univariate_page():
             dbc.Col([
                 dbc.Card([
                     dbc.CardBody([
-                        dcc.Loading(id="loading-univariate", children=dcc.Graph(id='univariate-plot', style={'height': '600px'}))
+                        dcc.Loading(id="loading-univariate", children=[
+                            dcc.Store(id='univariate-figure'),
+                            dcc.Graph(id='univariate-plot', style={'height': '600px'})
+                        ])
                     ])
                 ], style={'backgroundColor': 'rgba(0,0,0,0)', 'border': '1px solid #00d9ff'})
             ], width=12)
@@ -105,15 +116,21 @@ def univariate_page():
     ], fluid=True)
 
 
-# Bins control
-@app.callback(
+# Bins control (runs in the browser, see assets/clientside.js)
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='toggleBinsControl'),
     Output('bins-control', 'style'),
     Input('univariate-chart-type', 'value')
 )
-def toggle_bins_control(chart_type):
-    if chart_type == 'histogram':
-        return {'display': 'block'}
-    return {'display': 'none'}
+
+
+# Chart theme is applied in the browser to the figure the server produced
+app.clientside_callback(
+    ClientsideFunction(namespace='ui', function_name='themeFigure'),
+    Output('univariate-plot', 'figure'),
+    Input('univariate-figure', 'data'),
+    Input('chart-theme', 'value')
+)
 
 
 # Dropdown options
@@ -126,31 +143,32 @@ def update_univariate_options(stored_data):
         return []
     
     try:
-        if isinstance(stored_data, str):
-            df = pd.read_json(io.StringIO(stored_data), orient='split')
-        elif isinstance(stored_data, dict):
-            df = pd.DataFrame(stored_data)
-        else:
+        df = load_dataframe(stored_data)
+        if df is None:
             return []
         
         options = [{'label': col, 'value': col} for col in df.columns]
         return options
         
     except Exception as e:
-        print(f"Error loading data: {e}")
+        log_event('callback_error', level='error', callback='update_univariate_options', error=str(e))
         return []
 
 
 # Plot and stats
 @app.callback(
-    Output('univariate-plot', 'figure'),
+    Output('univariate-figure', 'data'),
     Output('univariate-stats', 'children'),
     Input('univariate-column', 'value'),
     Input('univariate-chart-type', 'value'),
     Input('histogram-bins', 'value'),
-    Input('stored-data', 'data')
+    Input('stored-data', 'data'),
+    Input('active-filters', 'data')
 )
-def update_univariate_plot(column, chart_type, bins, stored_data):
+def update_univariate_plot(column, chart_type, bins, stored_data, filters):
+    
+    # Plot the rows left by the global filter panel
+    stored_data = apply_filters(stored_data, filters)
     
     if stored_data is None:
         fig = go.Figure()
@@ -165,12 +183,9 @@ def update_univariate_plot(column, chart_type, bins, stored_data):
         return fig, ""
     
     try:
-        if isinstance(stored_data, str):
-            df = pd.read_json(io.StringIO(stored_data), orient='split')
-        elif isinstance(stored_data, dict):
-            df = pd.DataFrame(stored_data)
-        else:
-            raise ValueError(f"Unexpected data type: {type(stored_data)}")
+        df = load_dataframe(stored_data)
+        if df is None:
+            raise ValueError("Dataset is no longer available on the server. Please upload the file again.")
         
         if column not in df.columns:
             fig = go.Figure()
@@ -178,135 +193,149 @@ def update_univariate_plot(column, chart_type, bins, stored_data):
             fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
             return fig, ""
         
-        is_numeric = is_numeric_column(df[column])
-        is_categorical = is_categorical_column(df[column])
-        
         if bins is None or bins < 5 or bins > 200:
             bins = 30
         
-        fig = go.Figure()
-        stats_card = None
+        # Revisited views are served from the figure cache; bins only matter for histograms
+        key = (stored_data, 'univariate', column, chart_type, bins if chart_type == 'histogram' else None)
+        return cached_figure(key, lambda: build_univariate_figure(df, stored_data, column, chart_type, bins))
         
-        # Histogram
-        if chart_type == 'histogram':
-            if is_numeric:
-                df_plot = df.dropna(subset=[column])
-                
-                if len(df_plot) == 0:
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    fig = px.histogram(df_plot, x=column, nbins=bins, title=f"Histogram of {column}")
-                    fig.update_traces(marker=dict(line=dict(color='#00d9ff', width=1)))
-                
-                stats_card = create_numeric_stats_card(df[column], column)
+    except Exception as e:
+        fig = go.Figure()
+        fig.add_annotation(text=f"Error creating visualization: {str(e)}", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
+        return fig, ""
+
+
+def build_univariate_figure(df, stored_data, column, chart_type, bins):
+    profile = get_profile(stored_data)
+    is_numeric = is_numeric_column(df[column])
+    is_categorical = is_categorical_column(df[column])
+    
+    # plotly.express is only needed by the bar/pie branches, imported on first use
+    import plotly.express as px
+    
+    fig = go.Figure()
+    stats_card = None
+    
+    # Histogram
+    if chart_type == 'histogram':
+        if is_numeric:
+            df_plot = df.dropna(subset=[column])
+            
+            if len(df_plot) == 0:
+                fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
             else:
-                fig.add_annotation(text="Histogram requires numeric data. Try Bar Chart or Pie Chart for categorical data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        
-        # Box Plot
-        elif chart_type == 'box':
-            if is_numeric:
-                df_plot = df.dropna(subset=[column])
-                
-                if len(df_plot) == 0:
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    fig = px.box(df_plot, y=column, title=f"Box Plot of {column}")
-                
-                stats_card = create_numeric_stats_card(df[column], column)
+                hist = derive(stored_data, ('histogram', column, bins),
+                              lambda: histogram_counts(numeric_values(df[column]), bins))
+                fig = histogram_figure(hist, column, f"Histogram of {column}")
+            
+            stats_card = create_numeric_stats_card(profile[column], column)
+        else:
+            fig.add_annotation(text="Histogram requires numeric data. Try Bar Chart or Pie Chart for categorical data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+    
+    # Box Plot
+    elif chart_type == 'box':
+        if is_numeric:
+            df_plot = df.dropna(subset=[column])
+            
+            if len(df_plot) == 0:
+                fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
             else:
-                fig.add_annotation(text="Box Plot requires numeric data. Try Bar Chart or Pie Chart for categorical data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        
-        # Violin Plot
-        elif chart_type == 'violin':
-            if is_numeric:
-                df_plot = df.dropna(subset=[column])
-                
-                if len(df_plot) == 0:
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    fig = px.violin(df_plot, y=column, box=True, title=f"Violin Plot of {column}")
-                
-                stats_card = create_numeric_stats_card(df[column], column)
+                summary = derive(stored_data, ('box', column),
+                                 lambda: box_summary(numeric_values(df[column])))
+                fig = box_figure([(column, summary)], f"Box Plot of {column}", y_title=column)
+            
+            stats_card = create_numeric_stats_card(profile[column], column)
+        else:
+            fig.add_annotation(text="Box Plot requires numeric data. Try Bar Chart or Pie Chart for categorical data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+    
+    # Violin Plot
+    elif chart_type == 'violin':
+        if is_numeric:
+            df_plot = df.dropna(subset=[column])
+            
+            if len(df_plot) == 0:
+                fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
             else:
-                fig.add_annotation(text="Violin Plot requires numeric data. Try Bar Chart or Pie Chart for categorical data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        
-        # Bar Chart
-        elif chart_type == 'bar':
-            if is_categorical or not is_numeric:
-                df_plot = df[[column]].copy()
-                df_plot = df_plot.dropna(subset=[column])
-                
-                if len(df_plot) == 0:
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    df_plot[column] = df_plot[column].astype(str)
-                    
-                    value_counts = df_plot[column].value_counts().reset_index()
-                    value_counts.columns = [column, 'Count']
-                    
-                    fig = px.bar(value_counts, x=column, y='Count', title=f"Bar Chart of {column}")
-                    fig.update_traces(marker=dict(line=dict(color='#00d9ff', width=1)))
-                
-                stats_card = create_categorical_stats_card(df[column], column)
+                summary = derive(stored_data, ('violin', column),
+                                 lambda: kde_summary(numeric_values(df[column])))
+                fig = violin_figure([(column, summary)], f"Violin Plot of {column}", y_title=column)
+            
+            stats_card = create_numeric_stats_card(profile[column], column)
+        else:
+            fig.add_annotation(text="Violin Plot requires numeric data. Try Bar Chart or Pie Chart for categorical data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+    
+    # Bar Chart
+    elif chart_type == 'bar':
+        if is_categorical or not is_numeric:
+            df_plot = df[[column]].copy()
+            df_plot = df_plot.dropna(subset=[column])
+            
+            if len(df_plot) == 0:
+                fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
             else:
-                df_plot = df.dropna(subset=[column])
+                df_plot[column] = df_plot[column].astype(str)
                 
-                if len(df_plot) == 0:
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    fig = px.histogram(df_plot, x=column, nbins=20, title=f"Bar Chart of {column}")
-                    fig.update_traces(marker=dict(line=dict(color='#00d9ff', width=1)))
+                value_counts = df_plot[column].value_counts().reset_index()
+                value_counts.columns = [column, 'Count']
                 
-                stats_card = create_numeric_stats_card(df[column], column)
-        
-        # Pie Chart
-        elif chart_type == 'pie':
-            if is_categorical or not is_numeric:
-                df_plot = df[[column]].copy()
-                df_plot = df_plot.dropna(subset=[column])
+                fig = px.bar(value_counts, x=column, y='Count', title=f"Bar Chart of {column}")
+                fig.update_traces(marker=dict(line=dict(color='#00d9ff', width=1)))
+            
+            stats_card = create_categorical_stats_card(profile[column], column)
+        else:
+            df_plot = df.dropna(subset=[column])
+            
+            if len(df_plot) == 0:
+                fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+            else:
+                hist = derive(stored_data, ('histogram', column, 20),
+                              lambda: histogram_counts(numeric_values(df[column]), 20))
+                fig = histogram_figure(hist, column, f"Bar Chart of {column}")
+            
+            stats_card = create_numeric_stats_card(profile[column], column)
+    
+    # Pie Chart
+    elif chart_type == 'pie':
+        if is_categorical or not is_numeric:
+            df_plot = df[[column]].copy()
+            df_plot = df_plot.dropna(subset=[column])
+            
+            if len(df_plot) == 0:
+                fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+            else:
+                df_plot[column] = df_plot[column].astype(str)
                 
-                if len(df_plot) == 0:
-                    fig.add_annotation(text="No data available after removing missing values", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-                else:
-                    df_plot[column] = df_plot[column].astype(str)
-                    
-                    value_counts = df_plot[column].value_counts().reset_index()
-                    value_counts.columns = [column, 'Count']
-                    
-                    fig = px.pie(value_counts, names=column, values='Count', title=f"Pie Chart of {column}")
+                value_counts = df_plot[column].value_counts().reset_index()
+                value_counts.columns = [column, 'Count']
                 
-                stats_card = create_categorical_stats_card(df[column], column)
-            else:
-                fig.add_annotation(text="Pie Chart works best with categorical data. Try Histogram for numeric data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='white'), height=600)
-        
-        return fig, stats_card if stats_card else ""
-        
-    except Exception as e:
-        fig = go.Figure()
-        fig.add_annotation(text=f"Error creating visualization: {str(e)}", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
-        fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)')
-        return fig, ""
+                fig = px.pie(value_counts, names=column, values='Count', title=f"Pie Chart of {column}")
+            
+            stats_card = create_categorical_stats_card(profile[column], column)
+        else:
+            fig.add_annotation(text="Pie Chart works best with categorical data. Try Histogram for numeric data.", xref="paper", yref="paper", x=0.5, y=0.5, showarrow=False, font=dict(color="white", size=16))
+    
+    fig.update_layout(plot_bgcolor='rgba(0,0,0,0)', paper_bgcolor='rgba(0,0,0,0)', font=dict(color='white'), height=600)
+    
+    return fig, stats_card if stats_card else ""
 
 
-def create_numeric_stats_card(series, column_name):
-    series_clean = series.dropna()
-    
-    if len(series_clean) == 0:
+def create_numeric_stats_card(column_profile, column_name):
+    if column_profile.count == 0:
         return dbc.Alert("No valid data available for statistics", color="warning")
     
     stats = {
-        'Count': len(series_clean),
-        'Mean': series_clean.mean(),
-        'Median': series_clean.median(),
-        'Std Dev': series_clean.std(),
-        'Min': series_clean.min(),
-        'Max': series_clean.max(),
-        'Q1': series_clean.quantile(0.25),
-        'Q3': series_clean.quantile(0.75),
-        'Missing': series.isna().sum(),
-        'Missing %': (series.isna().sum() / len(series) * 100)
+        'Count': column_profile.count,
+        'Mean': column_profile.mean,
+        'Median': column_profile.median,
+        'Std Dev': column_profile.std,
+        'Min': column_profile.min,
+        'Max': column_profile.max,
+        'Q1': column_profile.q1,
+        'Q3': column_profile.q3,
+        'Missing': column_profile.missing,
+        'Missing %': column_profile.missing_pct
     }
     
     return dbc.Card([
@@ -333,30 +362,28 @@ def create_numeric_stats_card(series, column_name):
     ], style={'backgroundColor': 'rgba(0, 217, 255, 0.1)', 'border': '1px solid #00d9ff'})
 
 
-def create_categorical_stats_card(series, column_name):
-    series_clean = series.dropna()
-    
-    if len(series_clean) == 0:
+def create_categorical_stats_card(column_profile, column_name):
+    if column_profile.count == 0:
         return dbc.Alert("No valid data available for statistics", color="warning")
     
-    series_str = series_clean.astype(str)
-    value_counts = series_str.value_counts()
+    value_counts = column_profile.top_values
+    most_common, most_common_count = column_profile.most_common
     
-    missing_count = series.isna().sum()
-    missing_pct = (missing_count / len(series) * 100)
+    missing_count = column_profile.missing
+    missing_pct = column_profile.missing_pct
     
     return dbc.Card([
         dbc.CardHeader(html.H5(f"📊 Statistics for {column_name}", style={'color': '#00d9ff'})),
         dbc.CardBody([
-            html.P([html.Strong("Total Values: "), f"{len(series)}"]),
-            html.P([html.Strong("Valid Values: "), f"{len(series_clean)}"]),
-            html.P([html.Strong("Unique Categories: "), f"{len(value_counts)}"]),
-            html.P([html.Strong("Most Common: "), f"{value_counts.index[0]} ({value_counts.iloc[0]} occurrences)"]),
+            html.P([html.Strong("Total Values: "), f"{column_profile.total}"]),
+            html.P([html.Strong("Valid Values: "), f"{column_profile.count}"]),
+            html.P([html.Strong("Unique Categories: "), f"{column_profile.cardinality}"]),
+            html.P([html.Strong("Most Common: "), f"{most_common} ({most_common_count} occurrences)"]),
             html.P([html.Strong("Missing Values: "), f"{missing_count} ({missing_pct:.1f}%)"]),
             html.Hr(),
             html.H6("Category Distribution (Valid Data Only):", style={'color': '#00d9ff'}),
             html.Div([
-                html.P(f"{cat}: {count} ({count/len(series_clean)*100:.1f}%)")
+                html.P(f"{cat}: {count} ({count/column_profile.count*100:.1f}%)")
                 for cat, count in value_counts.head(10).items()
             ])
         ])
@@ -0,0 +1,406 @@
+import json
+from functools import partial
+
+import numpy as np
+import pandas as pd
+
+# Declarative preprocessing pipeline.
+# Every preprocessing step is described by a JSON-serializable dict, e.g.
+#   {'op': 'impute', 'columns': ['Age'], 'method': 'median'}
+#   {'op': 'scale', 'columns': ['Age', 'Years_in_Tech'], 'method': 'standard'}
+# The preprocessing page applies steps through apply_step() and records them,
+# so the same list can be exported, replayed on a new upload in one pass over
+# an in-memory frame (run_pipeline), or compiled to an sklearn ColumnTransformer.
+
+PIPELINE_VERSION = 1
+OPERATIONS = ('drop', 'impute', 'cast', 'bin', 'scale', 'encode')
+IMPUTE_METHODS = ('drop', 'mean', 'median', 'mode', 'zero', 'ffill', 'bfill', 'custom')
+CAST_TARGETS = ('int', 'float', 'str', 'datetime', 'category', 'bool')
+
+
+def _require_columns(df, columns):
+    missing = [col for col in columns if col not in df.columns]
+    if missing:
+        raise ValueError(f"Column(s) not in dataset: {', '.join(map(str, missing))}")
+
+
+def cast_series(series, target):
+    if target == 'int':
+        return pd.to_numeric(series, errors='coerce').fillna(0).astype(int)
+    if target == 'float':
+        return pd.to_numeric(series, errors='coerce')
+    if target == 'str':
+        return series.astype(str)
+    if target == 'datetime':
+        return pd.to_datetime(series, errors='coerce')
+    if target == 'category':
+        return series.astype('category')
+    if target == 'bool':
+        return series.astype(bool)
+    raise ValueError(f"Unknown target type '{target}'")
+
+
+def _fill(series, value):
+    """series with missing values replaced by value.
+
+    Categorical and nullable integer columns keep their dtype between callbacks,
+    so a fill value outside the categories or the integer type needs room first.
+    """
+    if not series.hasnans:
+        return series
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        if value not in dtype.categories:
+            try:
+                series = series.cat.add_categories([value])
+            except (TypeError, ValueError):
+                series = series.astype(object)
+    elif pd.api.types.is_integer_dtype(dtype) and isinstance(dtype, pd.api.extensions.ExtensionDtype):
+        numeric = isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+        series = series.astype('float64' if numeric else object)
+    elif isinstance(dtype, pd.StringDtype) and not isinstance(value, str):
+        series = series.astype(object)
+    return series.fillna(value)
+
+
+def impute_series(series, method, value=None):
+    """Filled copy of series (method 'drop' is handled on the frame)"""
+    if method in ('mean', 'median'):
+        if not pd.api.types.is_numeric_dtype(series):
+            return series
+        # Nullable integer columns (e.g. Age as Int64) cannot hold a fractional fill value
+        if pd.api.types.is_integer_dtype(series):
+            series = series.astype('float64')
+        return series.fillna(series.mean() if method == 'mean' else series.median())
+    if method == 'mode':
+        mode_val = series.mode()
+        return series.fillna(mode_val[0]) if len(mode_val) > 0 else series
+    if method == 'zero':
+        return _fill(series, 0)
+    if method == 'ffill':
+        return series.ffill()
+    if method == 'bfill':
+        return series.bfill()
+    if method == 'custom':
+        return _fill(series, value) if value not in (None, '') else series
+    raise ValueError(f"Unknown imputation method '{method}'")
+
+
+def apply_step(df, step, progress=None):
+    """Apply one step to df and return the result.
+
+    Columns are assigned, never modified in place, so df may be a shallow copy
+    that shares its untouched columns with other frames. `progress(done, total)`
+    is called per column by the scale and encode steps.
+    """
+    op = step['op']
+    if op == 'drop':
+        _require_columns(df, step['columns'])
+        return df.drop(columns=step['columns'])
+
+    if op == 'impute':
+        _require_columns(df, step['columns'])
+        for col in step['columns']:
+            if step['method'] == 'drop':
+                df = df.dropna(subset=[col])
+            else:
+                df[col] = impute_series(df[col], step['method'], step.get('value'))
+        return df
+
+    if op == 'cast':
+        _require_columns(df, [step['column']])
+        df[step['column']] = cast_series(df[step['column']], step['target'])
+        return df
+
+    if op == 'bin':
+        column = step['column']
+        _require_columns(df, [column])
+        if not pd.api.types.is_numeric_dtype(df[column]):
+            raise ValueError("Column must be numeric for discretization")
+        df[column + '_binned'] = pd.cut(df[column], bins=step['bins'])
+        return df
+
+    if op == 'scale':
+        _require_columns(df, step['columns'])
+        # scikit-learn is imported on first use to keep worker start-up fast
+        from sklearn.preprocessing import StandardScaler, MinMaxScaler
+        # Scalers work column by column, so scaling one column at a time gives the
+        # same result as one fit_transform while letting us report progress
+        for i, col in enumerate(step['columns']):
+            scaler = StandardScaler() if step['method'] == 'standard' else MinMaxScaler()
+            df[col] = scaler.fit_transform(df[[col]]).ravel()
+            if progress:
+                progress(i + 1, len(step['columns']))
+        return df
+
+    if op == 'encode':
+        columns = step['columns']
+        _require_columns(df, columns)
+        if step['method'] == 'label':
+            from sklearn.preprocessing import LabelEncoder
+            for i, col in enumerate(columns):
+                # Convert to string first to avoid dict/category issues
+                df[col] = LabelEncoder().fit_transform(df[col].astype(str))
+                if progress:
+                    progress(i + 1, len(columns))
+            return df
+        # One dummy block per column, joined once - same layout as get_dummies(df, columns=...)
+        dummies = []
+        for i, col in enumerate(columns):
+            dummies.append(pd.get_dummies(df[col].astype(str), prefix=col))
+            if progress:
+                progress(i + 1, len(columns))
+        return pd.concat([df.drop(columns=columns)] + dummies, axis=1)
+
+    raise ValueError(f"Unknown pipeline operation '{op}'")
+
+
+def run_pipeline(df, steps, progress=None):
+    """Apply every step to df in one pass: one shallow copy, no intermediate serialization"""
+    df = df.copy(deep=False)
+    for i, step in enumerate(steps):
+        df = apply_step(df, step)
+        if progress:
+            progress(i + 1, len(steps))
+    return df
+
+
+def validate_steps(steps):
+    if not isinstance(steps, list):
+        raise ValueError("A pipeline is a list of steps")
+    for step in steps:
+        if not isinstance(step, dict) or step.get('op') not in OPERATIONS:
+            raise ValueError(f"Invalid pipeline step: {step!r}")
+        if step['op'] == 'impute' and step.get('method') not in IMPUTE_METHODS:
+            raise ValueError(f"Unknown imputation method in step: {step!r}")
+        if step['op'] == 'cast' and step.get('target') not in CAST_TARGETS:
+            raise ValueError(f"Unknown target type in step: {step!r}")
+    return steps
+
+
+def to_json(steps):
+    return json.dumps({'version': PIPELINE_VERSION, 'steps': steps}, indent=2)
+
+
+def from_json(text):
+    spec = json.loads(text)
+    if isinstance(spec, dict):
+        if spec.get('version', PIPELINE_VERSION) > PIPELINE_VERSION:
+            raise ValueError(f"Pipeline version {spec['version']} is newer than this dashboard supports")
+        spec = spec.get('steps')
+    return validate_steps(spec)
+
+
+def describe_step(step):
+    op = step['op']
+    if op == 'drop':
+        return f"Drop {', '.join(map(str, step['columns']))}"
+    if op == 'impute':
+        return f"Impute {len(step['columns'])} column(s) with '{step['method']}'"
+    if op == 'cast':
+        return f"Cast {step['column']} to {step['target']}"
+    if op == 'bin':
+        return f"Bin {step['column']} into {step['bins']} bins"
+    if op == 'scale':
+        return f"Scale {len(step['columns'])} column(s) ({step['method']})"
+    return f"Encode {len(step['columns'])} column(s) ({step['method']})"
+
+
+# =================== SKLEARN EXPORT ===================
+
+# FunctionTransformer stages receive a DataFrame or, after another stage, an array.
+# Stateless stages reuse the pandas functions above, so the compiled transformer
+# gives the same values as run_pipeline.
+
+def _plain_frame(X):
+    """Categorical, Arrow string and nullable columns as object / float64 with NaN for missing"""
+    X = pd.DataFrame(X)
+    columns = {}
+    for col in X.columns:
+        series = X[col]
+        if isinstance(series.dtype, pd.api.extensions.ExtensionDtype):
+            if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+                series = series.astype('float64')
+            else:
+                series = series.astype(object).where(series.notna(), np.nan)
+        columns[col] = series
+    return pd.DataFrame(columns, index=X.index)
+
+
+def _str_frame(X):
+    return pd.DataFrame(X).astype(str)
+
+
+def _cast_frame(X, target):
+    return pd.DataFrame(X).apply(lambda series: cast_series(series, target))
+
+
+def _impute_frame(X, method, value=None):
+    return pd.DataFrame(X).apply(lambda series: impute_series(series, method, value))
+
+
+class BinTransformer:
+    """Equal-width bins fitted like pd.cut(series, bins); the output is the bin
+    number, NaN for missing values and values outside the fitted range"""
+
+    def __init__(self, bins=5):
+        self.bins = bins
+
+    def get_params(self, deep=True):
+        return {'bins': self.bins}
+
+    def set_params(self, **params):
+        for name, value in params.items():
+            setattr(self, name, value)
+        return self
+
+    @staticmethod
+    def _values(X):
+        X = pd.DataFrame(X)
+        return X.columns, [pd.to_numeric(X[col], errors='coerce').to_numpy(dtype='float64', na_value=np.nan)
+                           for col in X.columns]
+
+    def fit(self, X, y=None):
+        columns, values = self._values(X)
+        self.feature_names_in_ = np.asarray([str(col) for col in columns], dtype=object)
+        self.edges_ = [pd.cut(column, bins=self.bins, retbins=True)[1] for column in values]
+        return self
+
+    def transform(self, X):
+        _, values = self._values(X)
+        return np.column_stack([pd.cut(column, bins=edges, labels=False).astype('float64')
+                                for column, edges in zip(values, self.edges_)])
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X).transform(X)
+
+    def get_feature_names_out(self, input_features=None):
+        names = self.feature_names_in_ if input_features is None else input_features
+        return np.asarray([f"{name}_binned" for name in names], dtype=object)
+
+
+def _estimators(op, params):
+    """sklearn estimators of one (op, params) stage of a column chain"""
+    from sklearn.impute import SimpleImputer
+    from sklearn.preprocessing import FunctionTransformer, MinMaxScaler, OneHotEncoder, OrdinalEncoder, StandardScaler
+
+    def function(func, **kwargs):
+        return FunctionTransformer(partial(func, **kwargs) if kwargs else func, feature_names_out='one-to-one')
+
+    if op == 'impute':
+        method, value = params
+        # Mean, median and mode are fitted on the training data, the other methods are stateless
+        if method in ('mean', 'median'):
+            return [SimpleImputer(strategy=method, keep_empty_features=True)]
+        if method == 'mode':
+            return [SimpleImputer(strategy='most_frequent', keep_empty_features=True)]
+        return [function(_impute_frame, method=method, value=value)]
+    if op == 'cast':
+        return [function(_cast_frame, target=params[0])]
+    if op == 'bin':
+        return [BinTransformer(bins=params[0])]
+    if op == 'scale':
+        return [StandardScaler() if params[0] == 'standard' else MinMaxScaler()]
+    # The encoding step works on the text form of each value, missing values included
+    if params[0] == 'label':
+        return [function(_str_frame), OrdinalEncoder(handle_unknown='use_encoded_value', unknown_value=-1)]
+    return [function(_str_frame), OneHotEncoder(handle_unknown='ignore', sparse_output=False)]
+
+
+def _numeric_after(op, params, numeric):
+    """Whether a column is numeric after a stage, as is_numeric_dtype would say on run_pipeline's frame"""
+    if op == 'cast':
+        return params[0] in ('int', 'float', 'bool')
+    if op == 'impute' and params[0] == 'custom':
+        value = params[1]
+        return numeric and isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+    if op == 'bin':
+        return False
+    if op in ('scale', 'encode'):
+        return True
+    return numeric
+
+
+def to_column_transformer(steps, df):
+    """Compile steps into an (unfitted) sklearn ColumnTransformer over the columns of df.
+
+    df is the frame the steps start from; only its columns and dtypes are used.
+    Each output column gets the chain of steps that touched it and keeps the name
+    run_pipeline gives it; columns with the same chain share one transformer.
+    Row-dropping imputation has no ColumnTransformer equivalent and raises ValueError.
+    """
+    from sklearn.compose import ColumnTransformer
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import FunctionTransformer
+
+    # output column -> (input column, [(op, params), ...], numeric)
+    chains = {col: (col, [], pd.api.types.is_numeric_dtype(df[col])) for col in df.columns}
+
+    def extend(col, op, params):
+        if col not in chains:
+            raise ValueError(f"Column '{col}' is not available at this step of the pipeline")
+        source, stages, numeric = chains[col]
+        # Like impute_series, mean and median leave non-numeric columns as they are
+        if not (op == 'impute' and params[0] in ('mean', 'median') and not numeric):
+            stages = stages + [(op, params)]
+        chains[col] = (source, stages, _numeric_after(op, params, numeric))
+
+    for step in steps:
+        op = step['op']
+        if op == 'drop':
+            for col in step['columns']:
+                chains.pop(col, None)
+        elif op == 'impute':
+            if step['method'] == 'drop':
+                raise ValueError("Dropping rows with missing values cannot be compiled to a ColumnTransformer")
+            for col in step['columns']:
+                extend(col, 'impute', (step['method'], step.get('value')))
+        elif op == 'cast':
+            extend(step['column'], 'cast', (step['target'],))
+        elif op == 'bin':
+            column = step['column']
+            if column not in chains:
+                raise ValueError(f"Column '{column}' is not available at this step of the pipeline")
+            if not chains[column][2]:
+                raise ValueError("Column must be numeric for discretization")
+            source, stages, _ = chains[column]
+            chains[column + '_binned'] = (source, stages + [('bin', (step['bins'],))], False)
+        else:
+            for col in step['columns']:
+                extend(col, op, (step['method'],))
+
+    groups = {}
+    for source, stages, _ in chains.values():
+        groups.setdefault(tuple(stages), []).append(source)
+
+    transformers = []
+    names = set()
+    for stages, sources in groups.items():
+        if not stages:
+            transformers.append(('unchanged', 'passthrough', sources))
+            continue
+        name = '+'.join(f"{op}_{params[0]}" for op, params in stages)
+        # Chains differing only in a parameter (two custom fill values, bin counts) get numbered names
+        unique_name, suffix = name, 2
+        while unique_name in names:
+            unique_name, suffix = f"{name}_{suffix}", suffix + 1
+        names.add(unique_name)
+        # Categorical / nullable columns are handed to sklearn as plain object / float columns
+        estimators = [FunctionTransformer(_plain_frame, feature_names_out='one-to-one')]
+        estimators += [estimator for op, params in stages for estimator in _estimators(op, params)]
+        transformers.append((unique_name, make_pipeline(*estimators), sources))
+    return ColumnTransformer(transformers, remainder='drop', verbose_feature_names_out=False)
+
+
+if __name__ == '__main__':
+    import sys
+    from data_cleaning import clean_data
+
+    if len(sys.argv) < 4:
+        print("Usage: python pipeline.py <pipeline.json> <survey.csv> <output.csv>")
+        sys.exit(1)
+    with open(sys.argv[1], encoding='utf-8') as f:
+        pipeline_steps = from_json(f.read())
+    frame = run_pipeline(clean_data(pd.read_csv(sys.argv[2])), pipeline_steps)
+    frame.to_csv(sys.argv[3], index=False)
+    print(f"Applied {len(pipeline_steps)} step(s): {len(frame)} rows × {len(frame.columns)} columns -> {sys.argv[3]}")
@@ -0,0 +1,317 @@
+import math
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from regression import confidence_band, predict
+
+# Server-side aggregation for the analysis charts.
+# Instead of embedding every raw row in the figure and letting plotly.js bin
+# it in the browser, the counts are computed here with NumPy and the figure
+# only carries one bar per bin.
+
+
+def numeric_values(series):
+    """Finite values of a numeric (possibly nullable) series as a float array"""
+    values = series.dropna().to_numpy(dtype='float64', na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def nice_bin_size(span, nbins):
+    """Smallest 1/2/2.5/5 x 10^k bin width giving at most nbins bins (plotly-style)"""
+    raw = span / max(nbins, 1)
+    if raw <= 0:
+        return 1.0
+    magnitude = 10 ** math.floor(math.log10(raw))
+    for step in (1, 2, 2.5, 5, 10):
+        if raw <= step * magnitude:
+            return step * magnitude
+    return 10 * magnitude
+
+
+def histogram_counts(values, nbins):
+    """Equal-width bin counts for a float array; returns edges and counts"""
+    if len(values) == 0:
+        return {'edges': np.array([]), 'counts': np.array([], dtype='int64'), 'size': 0.0}
+    low, high = float(values.min()), float(values.max())
+    size = nice_bin_size(high - low, nbins)
+    integer_data = bool(np.all(values == np.round(values)))
+    if integer_data:
+        # Whole-number data: bins at least 1 wide and centred on the integers
+        size = max(1.0, math.ceil(size))
+        start = math.floor(low / size) * size - 0.5
+    else:
+        start = math.floor(low / size) * size
+    n_bins = int((high - start) // size) + 1
+    edges = start + size * np.arange(n_bins + 1)
+    # Bin against the edges themselves: (value - start) // size can round a value
+    # lying on an edge into the bin below it
+    index = np.clip(np.searchsorted(edges, values, side='right') - 1, 0, n_bins - 1)
+    counts = np.bincount(index, minlength=n_bins)
+    return {'edges': edges, 'counts': counts, 'size': size}
+
+
+def histogram_figure(hist, column, title):
+    edges, counts = hist['edges'], hist['counts']
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(
+        x=centers,
+        y=counts,
+        width=hist['size'],
+        customdata=np.column_stack([edges[:-1], edges[1:]]) if len(counts) else None,
+        hovertemplate=f"{column}=%{{customdata[0]:.4g}} - %{{customdata[1]:.4g}}<br>count=%{{y}}<extra></extra>",
+        marker=dict(line=dict(color='#00d9ff', width=1)),
+    ))
+    fig.update_layout(title=title, xaxis_title=column, yaxis_title="count", bargap=0)
+    return fig
+
+
+# === Box and violin summaries ===
+# Box plots ship Plotly's precomputed q1/median/q3/fence fields plus a capped
+# outlier sample; violins ship a KDE evaluated on a fixed grid. Either way the
+# figure size depends on the number of groups, not on the number of rows.
+
+MAX_OUTLIERS = 500
+KDE_POINTS = 200
+
+
+def grouped_values(df, x_col, y_col):
+    """(label, float array of y) per x category, in order of first appearance like px.box"""
+    plot = df[[x_col, y_col]].dropna()
+    codes, uniques = pd.factorize(plot[x_col])
+    values = plot[y_col].to_numpy(dtype='float64', na_value=np.nan)
+    keep = np.isfinite(values)
+    codes, values = codes[keep], values[keep]
+    order = np.argsort(codes, kind='stable')
+    bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+    return [(str(uniques[i]), values[order[bounds[i]:bounds[i + 1]]])
+            for i in range(len(uniques)) if bounds[i + 1] > bounds[i]]
+
+
+def box_summary(values):
+    """Quartiles, Tukey whiskers (1.5 IQR) and outliers of a float array"""
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    outliers = np.sort(values[(values < q1 - 1.5 * iqr) | (values > q3 + 1.5 * iqr)])
+    if len(outliers) > MAX_OUTLIERS:
+        # Evenly spaced sample keeps the most extreme points at both ends
+        outliers = outliers[np.linspace(0, len(outliers) - 1, MAX_OUTLIERS).astype('int64')]
+    return {
+        'count': len(values),
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'mean': float(values.mean()),
+        'lowerfence': float(inside.min()),
+        'upperfence': float(inside.max()),
+        'outliers': outliers,
+    }
+
+
+def kde_summary(values, points=KDE_POINTS):
+    """Gaussian KDE on a fixed grid (Silverman bandwidth, binned like plotly's soft span)"""
+    std = values.std(ddof=1) if len(values) > 1 else 0.0
+    q1, q3 = np.percentile(values, [25, 75])
+    spread = min(std, (q3 - q1) / 1.349) or std
+    bandwidth = 1.059 * spread * len(values) ** -0.2
+    if not bandwidth:
+        bandwidth = 0.1 * (abs(float(values.mean())) or 1.0)
+    grid = np.linspace(values.min() - 2 * bandwidth, values.max() + 2 * bandwidth, points)
+    # Bin the rows onto the grid first so the kernel sum is points x points, not rows x points
+    step = grid[1] - grid[0]
+    weights = np.bincount(np.clip(np.rint((values - grid[0]) / step).astype('int64'), 0, points - 1),
+                          minlength=points)
+    kernel = np.exp(-0.5 * ((grid[:, None] - grid[None, :]) / bandwidth) ** 2)
+    density = kernel @ weights / (len(values) * bandwidth * np.sqrt(2 * np.pi))
+    summary = box_summary(values)
+    summary.update({'grid': grid, 'density': density})
+    return summary
+
+
+def _precomputed_box(labels, summaries, **kwargs):
+    return go.Box(
+        x=labels,
+        q1=[s['q1'] for s in summaries],
+        median=[s['median'] for s in summaries],
+        q3=[s['q3'] for s in summaries],
+        mean=[s['mean'] for s in summaries],
+        lowerfence=[s['lowerfence'] for s in summaries],
+        upperfence=[s['upperfence'] for s in summaries],
+        showlegend=False,
+        **kwargs
+    )
+
+
+def _outlier_trace(labels, summaries):
+    x = [label for label, s in zip(labels, summaries) for _ in range(len(s['outliers']))]
+    y = np.concatenate([s['outliers'] for s in summaries]) if summaries else []
+    return go.Scatter(x=x, y=y, mode='markers', name='outliers', showlegend=False,
+                      marker=dict(color='#636efa', size=4, opacity=0.6))
+
+
+def box_figure(groups, title, x_title=None, y_title=None):
+    """Box plot from [(label, box_summary)]"""
+    labels = [label for label, _ in groups]
+    summaries = [summary for _, summary in groups]
+    fig = go.Figure([
+        _precomputed_box(labels, summaries, marker=dict(color='#636efa'), boxmean=False),
+        _outlier_trace(labels, summaries),
+    ])
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title)
+    return fig
+
+
+def violin_figure(groups, title, x_title=None, y_title=None):
+    """Violin plot from [(label, kde_summary)], drawn as filled KDE outlines with a box inside"""
+    fig = go.Figure()
+    positions = list(range(len(groups)))
+    for position, (label, summary) in zip(positions, groups):
+        half_width = summary['density'] / summary['density'].max() * 0.4
+        fig.add_trace(go.Scatter(
+            x=np.concatenate([position - half_width, (position + half_width)[::-1]]),
+            y=np.concatenate([summary['grid'], summary['grid'][::-1]]),
+            fill='toself',
+            mode='lines',
+            line=dict(color='#636efa', width=1),
+            name=label,
+            hoverinfo='skip',
+            showlegend=False,
+        ))
+    summaries = [summary for _, summary in groups]
+    fig.add_trace(_precomputed_box(positions, summaries, width=0.08, marker=dict(color='#636efa'),
+                                   fillcolor='rgba(255,255,255,0.6)', line=dict(color='#636efa', width=1)))
+    fig.add_trace(_outlier_trace(positions, summaries))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title,
+                      xaxis=dict(tickmode='array', tickvals=positions, ticktext=[label for label, _ in groups]))
+    return fig
+
+
+# === Crosstab bar charts ===
+
+def crosstab_figure(table, barmode, title):
+    """One bar trace per column of a crosstab; barmode 'group' or 'stack'"""
+    fig = go.Figure([
+        go.Bar(name=str(col), x=table.index, y=table[col].to_numpy(), marker=dict(line=dict(color='#00d9ff', width=1)))
+        for col in table.columns
+    ])
+    fig.update_layout(barmode=barmode, title=title, xaxis_title=table.index.name, yaxis_title="Count")
+    return fig
+
+
+# === Large scatter plots ===
+# Above SCATTER_MAX_POINTS the scatter plot is rendered either as a 2D
+# histogram heatmap or as a grid-stratified sample, so the browser never
+# receives every row. Statistics are always computed on the full data.
+
+SCATTER_MAX_POINTS = int(os.environ.get('SCATTER_MAX_POINTS', 50_000))
+DENSITY_BINS = 200
+SAMPLE_GRID = 50
+SCATTER_MODES = ['auto', 'exact', 'density', 'sample']
+
+
+def paired_values(df, x_col, y_col):
+    """Rows where both columns are finite, as two float arrays"""
+    x = df[x_col].to_numpy(dtype='float64', na_value=np.nan)
+    y = df[y_col].to_numpy(dtype='float64', na_value=np.nan)
+    keep = np.isfinite(x) & np.isfinite(y)
+    return x[keep], y[keep]
+
+
+def scatter_mode(requested, n_points, max_points=SCATTER_MAX_POINTS):
+    """Resolve 'auto' to 'exact' or 'density' depending on the number of points"""
+    if requested in ('exact', 'density', 'sample'):
+        return requested
+    return 'density' if n_points > max_points else 'exact'
+
+
+def _cell_index(values, grid):
+    low, high = values.min(), values.max()
+    if high == low:
+        return np.zeros(len(values), dtype='int64')
+    return np.minimum(((values - low) / (high - low) * grid).astype('int64'), grid - 1)
+
+
+def stratified_sample(x, y, max_points=SCATTER_MAX_POINTS, grid=SAMPLE_GRID, seed=0):
+    """Row positions of a sample of at most max_points, taking the same quota from
+    every occupied cell of a grid x grid raster so sparse regions and outliers survive"""
+    if len(x) <= max_points:
+        return np.arange(len(x))
+    cells = _cell_index(x, grid) * grid + _cell_index(y, grid)
+    counts = np.bincount(cells, minlength=grid * grid)
+
+    # Largest per-cell quota that keeps the total within max_points
+    low, high = 1, int(counts.max())
+    while low < high:
+        quota = (low + high + 1) // 2
+        if np.minimum(counts, quota).sum() <= max_points:
+            low = quota
+        else:
+            high = quota - 1
+
+    shuffled = np.random.default_rng(seed).permutation(len(x))
+    order = shuffled[np.argsort(cells[shuffled], kind='stable')]
+    starts = np.cumsum(counts) - counts
+    rank = np.arange(len(x)) - starts[cells[order]]
+    return np.sort(order[rank < low])
+
+
+def density_grid(x, y, bins=DENSITY_BINS):
+    counts, x_edges, y_edges = np.histogram2d(x, y, bins=bins)
+    z = counts.T
+    z[z == 0] = np.nan  # empty cells stay transparent
+    return {
+        'x': (x_edges[:-1] + x_edges[1:]) / 2,
+        'y': (y_edges[:-1] + y_edges[1:]) / 2,
+        'z': z,
+        'count': len(x),
+    }
+
+
+def density_figure(density, title, x_title, y_title):
+    fig = go.Figure(go.Heatmap(
+        x=density['x'],
+        y=density['y'],
+        z=density['z'],
+        colorscale='Viridis',
+        colorbar=dict(title="Points"),
+        hovertemplate=f"{x_title}=%{{x:.4g}}<br>{y_title}=%{{y:.4g}}<br>points=%{{z}}<extra></extra>",
+    ))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title)
+    return fig
+
+
+def sample_figure(x, y, index, title, x_title, y_title):
+    fig = go.Figure(go.Scattergl(x=x[index], y=y[index], mode='markers', marker=dict(color='#636efa', size=4), showlegend=False))
+    fig.update_layout(title=title, xaxis_title=x_title, yaxis_title=y_title)
+    return fig
+
+
+def add_trendline(fig, fit, x_range, points=50):
+    """OLS line with its confidence band (from regression.fit_ols) across x_range"""
+    if fit is None:
+        return fig
+    x_line = np.linspace(x_range[0], x_range[1], points)
+    lower, upper = confidence_band(fit, x_line)
+    fig.add_trace(go.Scatter(
+        x=np.concatenate([x_line, x_line[::-1]]),
+        y=np.concatenate([upper, lower[::-1]]),
+        fill='toself',
+        fillcolor='rgba(255, 107, 107, 0.2)',
+        line=dict(width=0),
+        name=f"{fit['level']:.0%} CI",
+        hoverinfo='skip',
+        showlegend=False,
+    ))
+    fig.add_trace(go.Scatter(
+        x=x_line,
+        y=predict(fit, x_line),
+        mode='lines',
+        name='OLS trendline',
+        line=dict(color='#ff6b6b', width=2),
+        hovertemplate=f"y = {fit['slope']:.4g}x + {fit['intercept']:.4g}<br>R² = {fit['r2']:.3f}<extra></extra>",
+        showlegend=False,
+    ))
+    return fig
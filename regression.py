@@ -0,0 +1,78 @@
+import numpy as np
+
+# Closed-form simple linear regression for the scatter-plot trendline.
+# Everything is derived from six sufficient statistics (n and the shifted
+# sums of x, y, x², y², xy), so a fit costs one pass over the rows and never
+# builds a model object.
+
+CONFIDENCE_LEVEL = 0.95
+
+
+def sufficient_stats(x, y):
+    """n and sums of x, y, x², y², xy for two float arrays (shifted by their first value for precision)"""
+    if len(x) == 0:
+        return {'n': 0, 'shift_x': 0.0, 'shift_y': 0.0, 'sx': 0.0, 'sy': 0.0, 'sxx': 0.0, 'syy': 0.0, 'sxy': 0.0}
+    shift_x, shift_y = float(x[0]), float(y[0])
+    dx, dy = x - shift_x, y - shift_y
+    return {
+        'n': len(x),
+        'shift_x': shift_x,
+        'shift_y': shift_y,
+        'sx': float(dx.sum()),
+        'sy': float(dy.sum()),
+        'sxx': float(dx @ dx),
+        'syy': float(dy @ dy),
+        'sxy': float(dx @ dy),
+    }
+
+
+def fit_ols(stats, level=CONFIDENCE_LEVEL):
+    """Slope, intercept, r, R² and standard errors of y = intercept + slope * x; None if x is constant"""
+    n = stats['n']
+    if n < 2:
+        return None
+    # Centred sums of squares and cross-products
+    ssx = stats['sxx'] - stats['sx'] ** 2 / n
+    ssy = stats['syy'] - stats['sy'] ** 2 / n
+    spxy = stats['sxy'] - stats['sx'] * stats['sy'] / n
+    if ssx <= 0:
+        return None
+
+    x_mean = stats['shift_x'] + stats['sx'] / n
+    y_mean = stats['shift_y'] + stats['sy'] / n
+    slope = spxy / ssx
+    intercept = y_mean - slope * x_mean
+    r = spxy / np.sqrt(ssx * ssy) if ssy > 0 else 0.0
+    residual_ss = max(ssy - slope * spxy, 0.0)
+    dof = n - 2
+    from scipy.special import stdtrit  # imported on first fit, scipy is slow to load
+    sigma = np.sqrt(residual_ss / dof) if dof > 0 else np.nan
+    return {
+        'n': n,
+        'slope': slope,
+        'intercept': intercept,
+        'r': r,
+        'r2': r ** 2,
+        'x_mean': x_mean,
+        'ssx': ssx,
+        'sigma': sigma,
+        'slope_se': sigma / np.sqrt(ssx),
+        'level': level,
+        't_crit': float(stdtrit(dof, 0.5 + level / 2)) if dof > 0 else np.nan,
+    }
+
+
+def predict(fit, x):
+    return fit['intercept'] + fit['slope'] * np.asarray(x, dtype='float64')
+
+
+def confidence_band(fit, x):
+    """Lower and upper confidence limits of the fitted mean at x"""
+    x = np.asarray(x, dtype='float64')
+    half_width = fit['t_crit'] * fit['sigma'] * np.sqrt(1 / fit['n'] + (x - fit['x_mean']) ** 2 / fit['ssx'])
+    fitted = predict(fit, x)
+    return fitted - half_width, fitted + half_width
+
+
+def fit_xy(x, y, level=CONFIDENCE_LEVEL):
+    return fit_ols(sufficient_stats(x, y), level)
@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+import pandas as pd
+
+from data_loader import load_dataframe
+from data_store import derive, get_dataset, is_handle, put_dataset, view_handle
+
+# Global row filters shared by every page.
+# Each filterable column gets a bitmap index: its categorical codes (as set by
+# convert_data_types) plus one packed bitmap per category. A filter
+# {column: [labels]} ORs the bitmaps of the selected labels within a column and
+# ANDs the columns together, so evaluating it touches n/8 bytes per selected
+# label instead of comparing strings row by row. The resulting row mask and
+# the filtered frame are cached per dataset version, and the filtered frame is
+# registered under its own handle so profiles, figures and tables computed on
+# it are cached exactly like those of an uploaded dataset.
+
+MAX_FILTER_LEVELS = 100
+
+
+def filterable_columns(df):
+    """Categorical columns (or low-cardinality text/bool columns) a filter can be built on"""
+    columns = []
+    for col in df.columns:
+        series = df[col]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            if len(series.cat.categories) <= MAX_FILTER_LEVELS:
+                columns.append(col)
+        elif pd.api.types.is_bool_dtype(series) or pd.api.types.is_object_dtype(series) or isinstance(series.dtype, pd.StringDtype):
+            if series.nunique() <= MAX_FILTER_LEVELS:
+                columns.append(col)
+    return columns
+
+
+class BitmapIndex:
+    """Packed per-category bitmaps of one column"""
+
+    def __init__(self, series):
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.to_numpy()
+            levels = series.cat.categories
+        else:
+            codes, levels = pd.factorize(series, sort=True)
+        self.n = len(series)
+        self.labels = [str(level) for level in levels]
+        self.codes = {label: code for code, label in enumerate(self.labels)}
+        self.counts = np.bincount(codes[codes >= 0], minlength=len(self.labels))
+        self.bitmaps = [np.packbits(codes == code) for code in range(len(self.labels))]
+
+    def select(self, labels):
+        """Packed bitmap of the rows holding any of the given labels (None if none are known)"""
+        codes = [self.codes[label] for label in labels if label in self.codes]
+        if not codes:
+            return None
+        bitmap = self.bitmaps[codes[0]].copy()
+        for code in codes[1:]:
+            bitmap |= self.bitmaps[code]
+        return bitmap
+
+
+def bitmap_index(stored_data, df, column):
+    return derive(stored_data, ('bitmap-index', column), lambda: BitmapIndex(df[column]))
+
+
+def normalize_filters(filters):
+    """Drop empty selections and order the filter so equal filters share one cache key"""
+    return {str(col): sorted(str(v) for v in values) for col, values in sorted((filters or {}).items()) if values}
+
+
+def filter_key(filters):
+    return json.dumps(normalize_filters(filters), sort_keys=True)
+
+
+def row_mask(stored_data, df, filters):
+    """Boolean mask of the rows matching every column filter"""
+    def compute():
+        bitmap = None
+        for col, labels in normalize_filters(filters).items():
+            if col not in df.columns:
+                continue
+            selected = bitmap_index(stored_data, df, col).select(labels)
+            if selected is None:
+                return np.zeros(len(df), dtype=bool)
+            bitmap = selected if bitmap is None else bitmap & selected
+        if bitmap is None:
+            return np.ones(len(df), dtype=bool)
+        return np.unpackbits(bitmap, count=len(df)).view(bool)
+
+    return derive(stored_data, ('filter-mask', filter_key(filters)), compute)
+
+
+def apply_filters(stored_data, filters):
+    """Handle of the filtered view of the dataset in a dcc.Store (unchanged when no filter applies)"""
+    filters = normalize_filters(filters)
+    if not filters or not is_handle(stored_data):
+        return stored_data
+    key = filter_key(filters)
+    handle = view_handle(stored_data, key)
+    if get_dataset(handle) is not None:
+        return handle
+    df = load_dataframe(stored_data)
+    if df is None:
+        return stored_data
+    mask = row_mask(stored_data, df, filters)
+    if mask.all():
+        return stored_data
+    # Every worker derives the same view from the persisted dataset, no need to write it
+    return put_dataset(df[mask].reset_index(drop=True), persist=False, handle=handle)
+
+
+def filter_summary(stored_data, filters):
+    """(matching rows, total rows) of the dataset under the filter"""
+    df = load_dataframe(stored_data)
+    if df is None:
+        return 0, 0
+    return int(row_mask(stored_data, df, filters).sum()), len(df)
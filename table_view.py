@@ -0,0 +1,169 @@
+import json
+import operator
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from dash import dash_table
+
+from data_loader import load_dataframe
+from data_store import is_handle
+
+# Server-side paging, sorting and filtering for dash_table.DataTable
+# (page_action/sort_action/filter_action='custom'). The browser only ever
+# receives the rows of the current page; the filtered and sorted row order
+# of the last few views is cached so paging through it is a slice.
+
+PAGE_SIZE = 10
+MAX_CACHED_VIEWS = 8
+
+TABLE_STYLE = dict(
+    style_table={'overflowX': 'auto'},
+    style_header={'backgroundColor': '#1a1a2e', 'color': '#00d9ff', 'fontWeight': 'bold', 'border': '1px solid #444'},
+    style_filter={'backgroundColor': '#2a2a2a', 'color': 'white', 'border': '1px solid #444'},
+    style_cell={'backgroundColor': '#222', 'color': 'white', 'border': '1px solid #444', 'textAlign': 'left',
+                'minWidth': '90px', 'maxWidth': '300px', 'overflow': 'hidden', 'textOverflow': 'ellipsis'},
+    style_data_conditional=[{'if': {'row_index': 'odd'}, 'backgroundColor': '#2b2b2b'}],
+    css=[{'selector': '.dash-filter input', 'rule': 'color: white !important;'}],
+)
+
+# Filter syntax produced by the DataTable filter row, as in the Dash docs
+FILTER_OPERATORS = [['ge ', '>='], ['le ', '<='], ['lt ', '<'], ['gt ', '>'], ['ne ', '!='], ['eq ', '='],
+                    ['contains '], ['datestartswith ']]
+COMPARISONS = {'ge': operator.ge, 'le': operator.le, 'lt': operator.lt, 'gt': operator.gt,
+               'ne': operator.ne, 'eq': operator.eq}
+
+_views = OrderedDict()
+_lock = threading.Lock()
+
+
+def table_columns(df):
+    return [{'name': str(col), 'id': str(col),
+             'type': 'numeric' if pd.api.types.is_numeric_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]) else 'text'}
+            for col in df.columns]
+
+
+def split_filter_part(filter_part):
+    """'{col} op value' -> (column id, operator name, value)"""
+    for operator_type in FILTER_OPERATORS:
+        for op in operator_type:
+            if op in filter_part:
+                name_part, value_part = filter_part.split(op, 1)
+                name = name_part[name_part.find('{') + 1: name_part.rfind('}')]
+                value_part = value_part.strip()
+                quote = value_part[:1]
+                if quote and quote == value_part[-1] and quote in ("'", '"', '`'):
+                    value = value_part[1:-1].replace('\\' + quote, quote)
+                else:
+                    try:
+                        value = float(value_part)
+                    except ValueError:
+                        value = value_part
+                return name, operator_type[0].strip(), value
+    return None, None, None
+
+
+def _condition(series, op, value):
+    if op == 'contains':
+        return series.astype(str).str.contains(str(value), case=False, regex=False).to_numpy() & series.notna().to_numpy()
+    if op == 'datestartswith':
+        return series.astype(str).str.startswith(str(value)).to_numpy() & series.notna().to_numpy()
+    numeric = pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series)
+    if numeric and isinstance(value, float):
+        values = series.to_numpy(dtype='float64', na_value=np.nan)
+        return COMPARISONS[op](values, value) & ~np.isnan(values)
+    # Text comparison for categorical / object columns (and non-numeric filter values)
+    return COMPARISONS[op](series.astype(str), str(value)).to_numpy() & series.notna().to_numpy()
+
+
+def filter_mask(df, filter_query):
+    mask = np.ones(len(df), dtype=bool)
+    columns = {str(col): col for col in df.columns}
+    for part in (filter_query or '').split(' && '):
+        name, op, value = split_filter_part(part)
+        if name in columns and op is not None:
+            if isinstance(value, float) and value.is_integer() and not pd.api.types.is_numeric_dtype(df[columns[name]]):
+                value = str(int(value))
+            mask &= _condition(df[columns[name]], op, value)
+    return mask
+
+
+def view_positions(df, filter_query, sort_by):
+    """Row positions of df after filtering and sorting"""
+    positions = np.flatnonzero(filter_mask(df, filter_query))
+    columns = {str(col): col for col in df.columns}
+    sort_by = [s for s in (sort_by or []) if s['column_id'] in columns]
+    if sort_by and len(positions) > 1:
+        keys = df.iloc[positions][[columns[s['column_id']] for s in sort_by]].reset_index(drop=True)
+        order = keys.sort_values(list(keys.columns), ascending=[s['direction'] == 'asc' for s in sort_by],
+                                 kind='mergesort', na_position='last').index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def _cached_positions(stored_data, df, filter_query, sort_by):
+    if not is_handle(stored_data):
+        return view_positions(df, filter_query, sort_by)
+    key = (stored_data, filter_query or '', json.dumps(sort_by or [], sort_keys=True))
+    with _lock:
+        if key in _views:
+            _views.move_to_end(key)
+            return _views[key]
+    positions = view_positions(df, filter_query, sort_by)
+    with _lock:
+        _views[key] = positions
+        while len(_views) > MAX_CACHED_VIEWS:
+            _views.popitem(last=False)
+    return positions
+
+
+def page_records(df, positions):
+    """JSON-safe records for a page of rows (categories, intervals and timestamps as text)"""
+    page = df.iloc[positions]
+    page.columns = [str(col) for col in page.columns]
+    return json.loads(page.to_json(orient='records', date_format='iso', default_handler=str))
+
+
+def query_page(stored_data, page_current, page_size, sort_by, filter_query):
+    """(records of the requested page, page count, matching row count) for the dataset in a dcc.Store"""
+    df = load_dataframe(stored_data)
+    if df is None:
+        return [], 1, 0
+    page_size = page_size or PAGE_SIZE
+    positions = _cached_positions(stored_data, df, filter_query, sort_by)
+    page_count = max(1, -(-len(positions) // page_size))
+    page_current = min(page_current or 0, page_count - 1)
+    start = page_current * page_size
+    return page_records(df, positions[start:start + page_size]), page_count, len(positions)
+
+
+def paged_table(table_id, df, page_size=PAGE_SIZE):
+    """DataTable whose rows are served page by page by a callback using query_page()"""
+    return dash_table.DataTable(
+        id=table_id,
+        columns=table_columns(df),
+        data=[],
+        page_current=0,
+        page_size=page_size,
+        page_action='custom',
+        sort_action='custom',
+        sort_mode='multi',
+        sort_by=[],
+        filter_action='custom',
+        filter_query='',
+        **TABLE_STYLE
+    )
+
+
+def summary_table(table_id, df, page_size=15):
+    """DataTable for small summary frames; paging, sorting and filtering run in the browser"""
+    return dash_table.DataTable(
+        id=table_id,
+        columns=table_columns(df),
+        data=page_records(df, np.arange(len(df))),
+        page_size=page_size,
+        sort_action='native',
+        filter_action='native',
+        **TABLE_STYLE
+    )
@@ -0,0 +1,24 @@
+import io
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.generator import survey_csv  # noqa: E402
+from data_cleaning import clean_data  # noqa: E402
+from dtype_optimizer import optimize_dtypes  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def raw_survey():
+    """Synthetic survey export as read_csv returns it"""
+    return pd.read_csv(io.BytesIO(survey_csv(3000, seed=1)))
+
+
+@pytest.fixture(scope='session')
+def survey(raw_survey):
+    """Cleaned, dtype-optimized survey, as an upload is registered"""
+    return optimize_dtypes(clean_data(raw_survey))[0]
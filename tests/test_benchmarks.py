@@ -0,0 +1,47 @@
+import io
+import json
+
+import pandas as pd
+
+from benchmarks import run
+from benchmarks.generator import CANONICAL, UNSEEN_TOKENS, dirty_tokens, generate_survey, survey_csv
+from data_cleaning import NORMALIZATION_TABLE
+
+
+def test_generated_survey_has_the_export_layout():
+    df = generate_survey(500, seed=3)
+    assert len(df) == 500
+    assert list(df.columns[:5]) == ['Timestamp', 'Age', 'Gender', 'Country', 'state']
+    assert set(CANONICAL) | {'comments', 'Years_in_Tech', 'Sick_Leave_Days'} <= set(df.columns)
+    assert df['state'].notna().eq(df['Country'] == 'United States').all()
+    assert (df['Years_in_Current_Role'] <= df['Years_in_Tech']).all()
+
+    again = pd.read_csv(io.BytesIO(survey_csv(500, seed=3)))
+    assert list(again.columns) == list(df.columns)
+    assert again['Age'].tolist() == df['Age'].tolist()
+
+
+def test_generated_answers_mix_in_dirty_and_unseen_tokens():
+    df = generate_survey(5000, seed=0)
+    for column in ('Gender', 'Country', 'treatment', 'self_employed'):
+        values = set(df[column].dropna())
+        assert set(CANONICAL[column]) <= values
+        assert values - set(CANONICAL[column]) <= set(dirty_tokens(column))
+        assert values - set(CANONICAL[column])
+    assert set(df['Gender'].dropna()) & set(NORMALIZATION_TABLE['Gender']['mapping'])
+    for column, tokens in UNSEEN_TOKENS.items():
+        assert set(tokens) <= set(df[column].dropna())
+    assert df['Gender'].isna().any()
+
+
+def test_runner_writes_a_report_at_a_tiny_size(tmp_path, capsys):
+    output = tmp_path / 'bench.json'
+    run.main(['--rows', '200', '--repeat', '1', '--output', str(output)])
+    report = json.loads(output.read_text())
+    assert report['meta']['rows'] == [200]
+    results = report['results']
+    assert [r for r in results if 'error' in r] == []
+    assert {r['group'] for r in results} >= {'ingest', 'cleaning', 'serializer', 'home', 'univariate', 'bivariate',
+                                             'preprocessing'}
+    assert all(r['best_s'] >= 0 for r in results)
+    assert 'Wrote' in capsys.readouterr().out
@@ -0,0 +1,92 @@
+import json
+
+import plotly.graph_objects as go
+import pytest
+from dash.exceptions import PreventUpdate
+
+import index  # noqa: F401  registers the app and its callbacks
+from benchmarks.run import invoke
+from data_store import put_dataset
+from figure_cache import figure_cache
+from pages import bivariate
+
+
+def annotations(fig):
+    fig = go.Figure(fig)
+    return [annotation.text for annotation in fig.layout.annotations]
+
+
+@pytest.mark.parametrize('chart_type, x_col, y_col', [('box', 'Gender', 'Age'), ('scatter', 'Age', 'Years_in_Tech'),
+                                                      ('grouped_bar', 'Gender', 'treatment')])
+def test_two_var_plot_from_legacy_json_payload(survey, chart_type, x_col, y_col):
+    # Older sessions keep the dataset itself in the store instead of a handle
+    payload = survey.to_json(orient='split', date_format='iso')
+    fig, key = invoke(bivariate.update_two_var_plot, 'two_var', x_col, y_col, chart_type, 'auto', payload, None, None)
+    assert key is None
+    assert annotations(fig) == []
+    assert len(go.Figure(fig).data) > 0
+
+
+def test_two_var_plot_is_cached_per_handle(survey):
+    handle = put_dataset(survey)
+    hits = figure_cache.stats()['hits']
+    first, key = invoke(bivariate.update_two_var_plot, 'two_var', 'Gender', 'Age', 'box', 'auto', handle, None, None)
+    again, _ = invoke(bivariate.update_two_var_plot, 'two_var', 'Gender', 'Age', 'box', 'auto', handle, None, None)
+    assert key == [handle, 'Gender', 'Age', 'box', None]
+    assert figure_cache.stats()['hits'] == hits + 1
+    assert json.loads(go.Figure(again).to_json())['data'] == json.loads(go.Figure(first).to_json())['data']
+
+
+def test_heatmap_ignores_two_variable_mode(survey):
+    with pytest.raises(PreventUpdate):
+        invoke(bivariate.update_heatmap, 'two_var', 'pearson', put_dataset(survey), None, None)
+
+
+def test_heatmap_skips_a_view_it_already_rendered(survey):
+    handle = put_dataset(survey)
+    fig, info, key = invoke(bivariate.update_heatmap, 'heatmap', 'spearman', handle, None, None)
+    assert key == [handle, 'spearman']
+    assert annotations(fig) == []
+    with pytest.raises(PreventUpdate):
+        invoke(bivariate.update_heatmap, 'heatmap', 'spearman', handle, None, key)
+    # A different method is a new view
+    _, _, other = invoke(bivariate.update_heatmap, 'heatmap', 'pearson', handle, None, key)
+    assert other == [handle, 'pearson']
+
+
+def test_two_var_chart_ignores_heatmap_mode(survey):
+    with pytest.raises(PreventUpdate):
+        invoke(bivariate.update_two_var_plot, 'heatmap', 'Age', 'Years_in_Tech', 'scatter', 'auto',
+               put_dataset(survey), None, None)
+    with pytest.raises(PreventUpdate):
+        invoke(bivariate.update_two_var_info, 'heatmap', 'Age', 'Years_in_Tech', 'scatter', 'auto',
+               put_dataset(survey), None)
+
+
+def test_render_mode_only_rebuilds_scatter_plots(survey):
+    handle = put_dataset(survey)
+    _, key = invoke(bivariate.update_two_var_plot, 'two_var', 'Gender', 'Age', 'box', 'auto', handle, None, None)
+    with pytest.raises(PreventUpdate):
+        invoke(bivariate.update_two_var_plot, 'two_var', 'Gender', 'Age', 'box', 'density', handle, None, key,
+               triggered='scatter-render-mode.value')
+    with pytest.raises(PreventUpdate):
+        invoke(bivariate.update_two_var_info, 'two_var', 'Gender', 'Age', 'box', 'density', handle, None,
+               triggered='scatter-render-mode.value')
+
+    _, key = invoke(bivariate.update_two_var_plot, 'two_var', 'Age', 'Years_in_Tech', 'scatter', 'auto', handle, None, None)
+    fig, new_key = invoke(bivariate.update_two_var_plot, 'two_var', 'Age', 'Years_in_Tech', 'scatter', 'density',
+                          handle, None, key, triggered='scatter-render-mode.value')
+    assert new_key == [handle, 'Age', 'Years_in_Tech', 'scatter', 'density']
+    assert go.Figure(fig).data[0].type == 'heatmap'
+    info = invoke(bivariate.update_two_var_info, 'two_var', 'Age', 'Years_in_Tech', 'scatter', 'density', handle, None,
+                  triggered='scatter-render-mode.value')
+    assert info != ""
+
+
+def test_two_var_chart_without_a_handle_always_renders(survey):
+    # No handle means no view key, so a repeated call is never short-circuited
+    fig, key = invoke(bivariate.update_two_var_plot, 'two_var', 'Age', 'Years_in_Tech', 'scatter', 'auto', None, None, None)
+    assert key is None
+    assert annotations(fig) == ["Please upload data first"]
+    fig, _ = invoke(bivariate.update_two_var_plot, 'two_var', 'Age', 'Years_in_Tech', 'scatter', 'auto', None, None, key)
+    assert annotations(fig) == ["Please upload data first"]
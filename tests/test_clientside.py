@@ -0,0 +1,65 @@
+import json
+import os
+import shutil
+import subprocess
+
+import pytest
+
+import index  # noqa: F401  registers the app and its callbacks
+from app import app
+
+CLIENTSIDE_JS = os.path.join(app.config.assets_folder, 'clientside.js')
+
+
+def clientside_callbacks():
+    return [c for c in app._callback_list if c.get('clientside_function')]
+
+
+def run_js(script):
+    """Evaluate script in node after loading assets/clientside.js; returns its JSON output"""
+    node = shutil.which('node')
+    if node is None:
+        pytest.skip('node is not installed')
+    with open(CLIENTSIDE_JS) as f:
+        source = f.read()
+    program = 'var window = {dash_clientside: {no_update: "NO_UPDATE"}};\n' + source + '\nvar ui = window.dash_clientside.ui;\n'
+    result = subprocess.run([node, '-e', program + 'console.log(JSON.stringify(' + script + '));'],
+                            capture_output=True, text=True, timeout=30)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout)
+
+
+def test_every_clientside_callback_names_a_function_in_clientside_js():
+    with open(CLIENTSIDE_JS) as f:
+        source = f.read()
+    callbacks = clientside_callbacks()
+    assert {c['clientside_function']['function_name'] for c in callbacks} == {
+        'toggleBinsControl', 'toggleBivariateControls', 'toggleCustomInput', 'themeFigure'}
+    for callback in callbacks:
+        assert callback['clientside_function']['namespace'] == 'ui'
+        assert callback['clientside_function']['function_name'] + ': function' in source
+
+
+def test_clientside_functions_return_one_value_per_output():
+    outputs = {c['clientside_function']['function_name']: c['output'] for c in clientside_callbacks()}
+    assert outputs['toggleBivariateControls'].count('.style') == 4
+    results = run_js('[ui.toggleBinsControl("histogram"), ui.toggleBinsControl("box"), '
+                     'ui.toggleCustomInput("custom"), ui.toggleBivariateControls("heatmap"), '
+                     'ui.toggleBivariateControls("two_var")]')
+    shown, hidden = {'display': 'block'}, {'display': 'none'}
+    assert results == [shown, hidden, shown, [hidden, hidden, shown, shown], [shown, shown, hidden, hidden]]
+
+
+def test_theme_figure_restyles_without_touching_the_data():
+    figure = {'data': [{'type': 'bar', 'y': [1, 2]}], 'layout': {'title': {'text': 'Age'},
+                                                                 'annotations': [{'text': 'n = 2'}]}}
+    dark, light, empty = run_js(f'[ui.themeFigure({json.dumps(figure)}, false), '
+                                f'ui.themeFigure({json.dumps(figure)}, true), ui.themeFigure(null, true)]')
+    assert empty == 'NO_UPDATE'
+    for themed in (dark, light):
+        assert themed['data'] == figure['data']
+        assert themed['layout']['title'] == figure['layout']['title']
+    assert dark['layout']['font']['color'] == 'white'
+    assert light['layout']['paper_bgcolor'] == 'white'
+    assert light['layout']['xaxis']['gridcolor'] == '#e5e5e5'
+    assert light['layout']['annotations'][0]['font']['color'] == light['layout']['font']['color']
@@ -0,0 +1,21 @@
+import pandas as pd
+import pytest
+
+from contingency import chi_square, crosstab
+
+
+def test_crosstab_matches_pandas(survey):
+    expected = pd.crosstab(survey['Gender'].astype(object), survey['work_interfere'].astype(object))
+    result = crosstab(survey, 'Gender', 'work_interfere')
+    pd.testing.assert_frame_equal(result, expected, check_names=False, check_dtype=False)
+
+
+def test_chi_square_matches_scipy(survey):
+    from scipy.stats import chi2_contingency
+    table = crosstab(survey, 'family_history', 'treatment').to_numpy()
+    chi2, p_value, dof, expected = chi2_contingency(table, correction=False)
+    stats = chi_square(table)
+    assert stats['chi2'] == pytest.approx(chi2)
+    assert stats['p_value'] == pytest.approx(p_value)
+    assert stats['dof'] == dof
+    assert stats['min_expected'] == pytest.approx(expected.min())
@@ -0,0 +1,43 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from contingency import chi_square
+from correlation import clear_cache, correlation_matrix
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    clear_cache()
+    yield
+    clear_cache()
+
+
+def test_pearson_matches_pandas_with_missing_values(survey):
+    numeric = survey.select_dtypes('number')
+    expected = numeric.astype('float64').corr(method='pearson')
+    result = correlation_matrix(survey, 'pearson')
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_spearman_matches_pandas_on_complete_columns(survey):
+    numeric = survey.select_dtypes('number').dropna(axis=1)
+    expected = numeric.astype('float64').corr(method='spearman')
+    result = correlation_matrix(numeric, 'spearman')
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9, atol=1e-12)
+
+
+def test_cached_pairs_give_the_same_matrix_after_a_column_changes(survey):
+    first = correlation_matrix(survey, 'pearson')
+    changed = survey.assign(Years_in_Tech=survey['Years_in_Tech'] * 2 + 1)
+    second = correlation_matrix(changed, 'pearson')
+    pd.testing.assert_frame_equal(first, second, check_exact=False, rtol=1e-9, atol=1e-12)
+    cold = correlation_matrix(changed.drop(columns='Age'), 'pearson')
+    pd.testing.assert_frame_equal(cold, second.drop(index='Age', columns='Age'), check_exact=False, rtol=1e-9)
+
+
+def test_cramers_v_matches_its_crosstab(survey):
+    result = correlation_matrix(survey[['Gender', 'treatment', 'remote_work']], 'cramers_v')
+    table = pd.crosstab(survey['Gender'], survey['treatment']).to_numpy()
+    assert result.loc['Gender', 'treatment'] == pytest.approx(chi_square(table)['cramers_v'])
+    assert np.allclose(np.diag(result), 1.0)
@@ -0,0 +1,138 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import data_cleaning
+from benchmarks.generator import UNSEEN_TOKENS, survey_csv
+from data_cleaning import (NORMALIZATION_TABLE, FuzzyMatcher, clean_data, edit_distance, fuzzy_matcher,
+                           normalize_series)
+
+
+def normalized(column, values):
+    result = normalize_series(pd.Series(values, dtype=object), NORMALIZATION_TABLE[column])
+    return [None if pd.isna(value) else value for value in result]
+
+
+@pytest.mark.parametrize('column, raw', [
+    ('Gender', 'cis woman'),
+    ('Gender', 'Female-ish'),
+    ('Gender', 'trans man'),
+    ('Country', 'Iceland'),
+])
+def test_valid_answers_are_never_corrected_into_others(column, raw):
+    # Unlisted genders stay unmapped (dropped by 'allowed'), real countries stay as typed
+    expected = raw if column == 'Country' else None
+    assert normalized(column, [raw]) == [expected]
+
+
+def test_generator_unseen_tokens():
+    assert dict(zip(UNSEEN_TOKENS['Gender'], normalized('Gender', UNSEEN_TOKENS['Gender']))) == {
+        'Male ': 'Male', 'MALE': 'Male', 'femal': 'Female', 'Woman': 'Female',
+        'fluid': None, 'A little about you': None, 'p': None,
+    }
+    assert dict(zip(UNSEEN_TOKENS['Country'], normalized('Country', UNSEEN_TOKENS['Country']))) == {
+        'united states': 'United States', 'U.S.': 'U.S.', 'Deutschland': 'Deutschland', 'Holland': 'Holland',
+    }
+
+
+def test_unambiguous_typos_are_fixed():
+    assert normalized('Gender', ['femaile', 'malee', 'womna', 'cis femle']) == ['Female', 'Male', 'Female', 'Female']
+    assert normalized('Country', ['Germny', 'Swizterland', 'Autsria']) == ['Germany', 'Switzerland', 'Austria']
+
+
+def test_matcher_rules():
+    matcher = FuzzyMatcher({'mapping': {'yess': 'Yes', 'nop': 'No'}, 'allowed': ['Yes', 'No', 'Maybe'], 'fuzzy': 2,
+                            'markers': {'Yes': ['yes'], 'No': ['no']}})
+    assert matcher.match('  MAYBE ') == 'Maybe'
+    assert matcher.match('maybee') == 'Maybe'
+    # Too short to tell a typo from another answer
+    assert matcher.match('yea') is None
+    # Names markers of two answers
+    assert matcher.match('yes or no maybe') is None
+    # One edit from two different answers
+    ambiguous = FuzzyMatcher({'allowed': ['Bolder', 'Holder'], 'fuzzy': 2})
+    assert ambiguous.match('Folder') is None
+    assert ambiguous.match('Bolderr') == 'Bolder'
+
+
+def test_edit_distance():
+    assert edit_distance('female', 'female', 2) == 0
+    assert edit_distance('femal', 'female', 2) == 1
+    assert edit_distance('mael', 'male', 2) == 1  # neighbour swap counts once
+    assert edit_distance('cis woman', 'cis man', 2) == 2
+    assert edit_distance('iceland', 'australia', 2) == 3
+    assert edit_distance('abc', 'abcdef', 1) == 2
+
+
+def test_matchers_are_shared_per_spec_and_cache_tokens():
+    spec = NORMALIZATION_TABLE['Gender']
+    matcher = fuzzy_matcher(spec)
+    assert fuzzy_matcher(dict(spec)) is matcher
+    assert fuzzy_matcher({**spec, 'fuzzy': 1}) is not matcher
+    assert fuzzy_matcher(NORMALIZATION_TABLE['treatment']) is None
+    matcher.match('Femaile')
+    assert matcher.cache['femaile'] == 'Female'
+    assert data_cleaning._matchers
+
+
+def test_cache_evicts_the_oldest_tokens(monkeypatch):
+    monkeypatch.setattr(data_cleaning, 'FUZZY_CACHE_MAX_TOKENS', 3)
+    matcher = FuzzyMatcher({'allowed': ['Yes', 'No', 'Maybe'], 'fuzzy': 2})
+    for token in ['maybee', 'mayyybe', 'yes', 'no', 'nope']:
+        matcher.match(token)
+    assert list(matcher.cache) == ['yes', 'no', 'nope']
+    # An evicted token is matched again, with the same answer
+    assert matcher.match('maybee') == 'Maybe'
+    assert len(matcher.cache) == 3
+
+
+def test_clean_data_applies_the_fuzzy_rules(raw_survey):
+    cleaned = clean_data(raw_survey)
+    assert set(cleaned['Gender'].cat.categories) <= {'Male', 'Female', 'Non-Binary'}
+    raw = raw_survey['Gender'].astype(str).str.strip().str.lower()
+    assert (cleaned['Gender'][raw == 'femal'] == 'Female').all()
+    assert cleaned['Country'][raw_survey['Country'] == 'Holland'].eq('Holland').all()
+    assert np.isnan(normalize_series(pd.Series([np.nan]), NORMALIZATION_TABLE['Country']).iloc[0])
+
+
+@pytest.fixture
+def without_fuzzy(monkeypatch):
+    # The baseline had no fuzzy matching, compare the table-driven rules alone
+    for column in ('Gender', 'Country'):
+        monkeypatch.setitem(NORMALIZATION_TABLE, column, {**NORMALIZATION_TABLE[column], 'fuzzy': None})
+
+
+@pytest.mark.parametrize('seed', [0, 1, 2])
+def test_table_driven_clean_data_matches_the_baseline(without_fuzzy, seed):
+    from baseline_cleaning import clean_data as baseline_clean_data
+    raw = pd.read_csv(io.BytesIO(survey_csv(5000, seed=seed, dirty_rate=0.3)))
+    pd.testing.assert_frame_equal(clean_data(raw), baseline_clean_data(raw))
+
+
+def test_compat_wrappers_match_the_baseline(without_fuzzy, raw_survey):
+    import baseline_cleaning
+    columns = {col.lower(): col for col in raw_survey.columns}
+    for name in dir(baseline_cleaning):
+        col = columns.get(name[len('clean_'):])
+        if not name.startswith('clean_') or col is None:
+            continue
+        expected = getattr(baseline_cleaning, name)(raw_survey.copy())[col]
+        result = getattr(data_cleaning, name)(raw_survey.copy())[col]
+        # The wrappers return categoricals, the baseline functions strings
+        if isinstance(result.dtype, pd.CategoricalDtype) and not isinstance(expected.dtype, pd.CategoricalDtype):
+            result = result.astype(object)
+        pd.testing.assert_series_equal(result, expected, check_dtype=False, obj=name)
+
+
+def test_fuzzy_matching_only_changes_unlisted_gender_and_country_values(raw_survey):
+    from baseline_cleaning import clean_data as baseline_clean_data
+    cleaned, baseline = clean_data(raw_survey), baseline_clean_data(raw_survey)
+    changed = [col for col in cleaned.columns if not cleaned[col].astype(object).equals(baseline[col].astype(object))]
+    assert set(changed) <= {'Gender', 'Country'}
+    for col in changed:
+        differs = cleaned[col].astype(object).ne(baseline[col].astype(object)) & ~(cleaned[col].isna() & baseline[col].isna())
+        listed = set(NORMALIZATION_TABLE[col].get('mapping', {}))
+        raw = raw_survey[col].astype(str).str.lower() if col == 'Gender' else raw_survey[col]
+        assert not raw[differs].isin(listed).any()
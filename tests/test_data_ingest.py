@@ -0,0 +1,49 @@
+import io
+
+import pandas as pd
+import pytest
+
+from benchmarks.generator import survey_csv, upload_contents
+from data_cleaning import clean_data
+from data_ingest import read_uploaded_csv
+
+
+def _same_frame(chunked, whole):
+    assert list(chunked.columns) == list(whole.columns)
+    for col in whole.columns:
+        # Chunks are merged with union_categoricals, so compare values, not category order
+        left, right = chunked[col], whole[col]
+        if isinstance(right.dtype, pd.CategoricalDtype):
+            assert isinstance(left.dtype, pd.CategoricalDtype), col
+            left, right = left.astype(object), right.astype(object)
+        pd.testing.assert_series_equal(left, right, check_names=False, obj=col)
+
+
+@pytest.mark.parametrize('chunksize', [250, 1000, 100_000])
+def test_chunked_upload_matches_one_shot_read_and_clean(chunksize):
+    csv_bytes = survey_csv(2000, seed=3)
+    whole = clean_data(pd.read_csv(io.BytesIO(csv_bytes)))
+    chunked = read_uploaded_csv(upload_contents(csv_bytes), chunksize=chunksize)
+    assert len(chunked) == len(whole)
+    _same_frame(chunked, whole)
+
+
+def test_latin1_upload_decodes_like_read_csv():
+    csv_bytes = "Age,Gender,comments\n30,Male,caf\xe9\n41,female,\n".encode('latin-1')
+    whole = clean_data(pd.read_csv(io.BytesIO(csv_bytes), encoding='latin-1'))
+    _same_frame(read_uploaded_csv(upload_contents(csv_bytes), chunksize=1), whole)
+
+
+def test_column_type_changing_between_chunks_matches_one_shot_read():
+    rows = ["Age,Gender,employee_id,score,opted_in,notes"]
+    for i in range(60):
+        # employee_id is numeric for the first 50 rows, then ids turn alphanumeric
+        employee_id = i if i < 50 else f"E{i}"
+        age = 30 + i % 20 if i != 55 else 'unknown'
+        rows.append(f"{age},{'Male' if i % 2 else 'female'},{employee_id},{i * 0.5},{i % 3 == 0},{'' if i % 7 else 'note'}")
+    csv_bytes = ("\n".join(rows) + "\n").encode('utf-8')
+    whole = clean_data(pd.read_csv(io.BytesIO(csv_bytes)))
+    chunked = read_uploaded_csv(upload_contents(csv_bytes), chunksize=20)
+    _same_frame(chunked, whole)
+    assert {type(value) for value in chunked['employee_id']} == {str}
+    assert chunked['score'].dtype == 'float64' and chunked['opted_in'].dtype == bool
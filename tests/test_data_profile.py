@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_profile import build_profile
+
+
+@pytest.fixture(scope='module')
+def frame(survey):
+    """The survey plus a float column with gaps and an all-missing column"""
+    df = survey.copy()
+    rng = np.random.default_rng(0)
+    weights = rng.normal(70, 15, len(df))
+    weights[rng.random(len(df)) < 0.2] = np.nan
+    df['Weight'] = weights
+    df['Empty'] = pd.Series(np.nan, index=df.index, dtype='float64')
+    return df
+
+
+@pytest.fixture(scope='module')
+def profile(frame):
+    return build_profile(frame)
+
+
+def test_numeric_stats_match_describe(frame, profile):
+    numeric = [col for col in frame.columns if profile[col].is_numeric]
+    assert {'Age', 'Years_in_Tech', 'Weight'} <= set(numeric)
+    for col in numeric:
+        described = frame[col].astype('float64').describe()
+        stats = profile[col]
+        assert stats.count == described['count'], col
+        if stats.count == 0:
+            assert stats.mean is None and stats.median is None
+            continue
+        for field, key in [('mean', 'mean'), ('std', 'std'), ('min', 'min'), ('q1', '25%'),
+                           ('median', '50%'), ('q3', '75%'), ('max', 'max')]:
+            assert getattr(stats, field) == pytest.approx(described[key]), (col, field)
+        assert stats.cardinality == frame[col].nunique()
+
+
+def test_missing_counts_match_isna(frame, profile):
+    expected = frame.isna().sum()
+    for col in frame.columns:
+        assert profile[col].missing == expected[col], col
+        assert profile[col].count + profile[col].missing == len(frame)
+    assert profile.missing_total == expected.sum()
+    assert profile.missing_pct == pytest.approx(expected.sum() / frame.size * 100)
+
+    by_column = profile.missing_by_column()
+    assert by_column.to_dict() == expected[expected > 0].to_dict()
+    assert by_column.is_monotonic_decreasing
+
+
+def test_top_values_match_value_counts(frame, profile):
+    for col in frame.columns:
+        stats = profile[col]
+        if stats.is_numeric:
+            continue
+        counts = frame[col].value_counts()
+        counts = counts[counts > 0]
+        assert stats.cardinality == len(counts), col
+        assert stats.top_values.tolist() == counts.head(len(stats.top_values)).tolist(), col
+        assert len(stats.top_values) == min(len(counts), 10)
+        value, count = stats.most_common
+        assert count == counts.iloc[0]
+        assert frame[col].astype(str)[frame[col].notna()].eq(value).sum() == count
+
+
+def test_family_counts_cover_every_column(frame, profile):
+    families = profile.family_counts()
+    assert sum(families.values()) == frame.shape[1]
+    assert families['categorical'] == sum(isinstance(d, pd.CategoricalDtype) for d in frame.dtypes)
+    assert (profile.rows, profile.n_columns) == frame.shape
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pandas.testing import assert_frame_equal
+
+from data_serializer import arrow_compatible, decode_dataframe, encode_dataframe, is_available
+
+
+@pytest.mark.parametrize('fmt', ['arrow', 'parquet'])
+def test_arrow_formats_round_trip_values_and_dtypes(survey, fmt):
+    if not is_available(fmt):
+        pytest.skip('pyarrow is not installed')
+    encoded_as, payload = encode_dataframe(survey, [fmt])
+    assert encoded_as == fmt
+    assert_frame_equal(decode_dataframe(payload, fmt), survey)
+
+
+def test_json_round_trips_values(survey):
+    encoded_as, payload = encode_dataframe(survey, ['json'])
+    assert encoded_as == 'json'
+    decoded = decode_dataframe(payload, 'json')
+    # JSON drops category / compact integer dtypes, the values survive
+    assert list(decoded.columns) == list(survey.columns)
+    assert decoded.index.equals(survey.index)
+    for col in survey.columns:
+        expected = survey[col].astype(object).where(survey[col].notna(), None).tolist()
+        actual = decoded[col].astype(object).where(decoded[col].notna(), None).tolist()
+        assert actual == expected, col
+
+
+def discretized():
+    ages = pd.Series(np.arange(18, 78, dtype='float64'))
+    return pd.DataFrame({
+        'Age': ages,
+        'Age_bin': pd.cut(ages, bins=4),
+        'Age_interval': pd.arrays.IntervalArray.from_breaks(np.arange(61.0)),
+        'Joined': pd.period_range('2020-01', periods=60, freq='M'),
+    })
+
+
+def test_interval_and_period_columns_are_not_arrow_compatible(survey):
+    df = discretized()
+    assert arrow_compatible(survey)
+    assert arrow_compatible(df[['Age']])
+    assert not arrow_compatible(df[['Age', 'Age_bin']])  # categorical of intervals
+    assert not arrow_compatible(df[['Age', 'Age_interval']])
+    assert not arrow_compatible(df[['Age', 'Joined']])
+
+
+def test_interval_columns_fall_back_past_arrow():
+    df = discretized()
+    fmt, payload = encode_dataframe(df, ['arrow', 'parquet', 'pickle'])
+    assert fmt == 'pickle'
+    assert_frame_equal(decode_dataframe(payload, fmt), df)
+
+    fmt, payload = encode_dataframe(df[['Age', 'Age_bin']])
+    assert fmt == 'json'
+    decoded = decode_dataframe(payload, fmt)
+    assert decoded['Age'].tolist() == df['Age'].tolist()
+    assert len(decoded['Age_bin'].dropna()) == len(df)
+
+
+def test_no_usable_format_raises():
+    with pytest.raises(ValueError):
+        encode_dataframe(discretized(), ['arrow', 'parquet'])
@@ -0,0 +1,91 @@
+import pandas as pd
+
+from data_store import DatasetRegistry, dataset_digest
+
+
+def test_handle_resolves_in_another_worker(survey, tmp_path):
+    # Two registries sharing a spill directory stand in for two gunicorn workers
+    first = DatasetRegistry(spill_dir=str(tmp_path))
+    second = DatasetRegistry(spill_dir=str(tmp_path))
+    handle = first.put(survey)
+    assert handle == dataset_digest(survey)
+    pd.testing.assert_frame_equal(second.get(handle), survey)
+
+
+def test_unpersisted_views_stay_in_memory(survey, tmp_path):
+    first = DatasetRegistry(spill_dir=str(tmp_path))
+    second = DatasetRegistry(spill_dir=str(tmp_path))
+    handle = first.put(survey.head(10), persist=False)
+    assert first.get(handle) is not None
+    assert second.get(handle) is None
+
+
+def test_evicted_dataset_reloads_from_spill(survey, tmp_path):
+    registry = DatasetRegistry(max_items=1, spill_dir=str(tmp_path))
+    handle = registry.put(survey, persist=False)
+    registry.put(survey.head(10), persist=False)
+    assert handle not in registry
+    pd.testing.assert_frame_equal(registry.get(handle), survey)
+
+
+def test_spill_reads_do_not_block_memory_lookups(survey, tmp_path, monkeypatch):
+    import threading
+    import data_store
+
+    registry = DatasetRegistry(spill_dir=str(tmp_path))
+    spilled = DatasetRegistry(spill_dir=str(tmp_path)).put(survey)
+    in_memory = registry.put(survey.head(10), persist=False)
+
+    reading, release = threading.Event(), threading.Event()
+    decode = data_store.decode_dataframe
+
+    def slow_decode(data, fmt):
+        reading.set()
+        release.wait(5)
+        return decode(data, fmt)
+
+    monkeypatch.setattr(data_store, 'decode_dataframe', slow_decode)
+    loader = threading.Thread(target=registry.get, args=(spilled,))
+    loader.start()
+    try:
+        assert reading.wait(5)
+        # The registry lock is free while the other thread reads the spill file
+        assert registry._lock.acquire(timeout=1)
+        registry._lock.release()
+        assert registry.get(in_memory) is not None
+    finally:
+        release.set()
+        loader.join()
+    assert spilled in registry
+
+
+def test_recently_used_spill_files_are_not_pruned(survey, tmp_path):
+    import os
+    import time
+
+    # Byte budget of a single file: every new spill puts the directory over it
+    registry = DatasetRegistry(spill_dir=str(tmp_path), spill_max_bytes=1)
+    other_worker = DatasetRegistry(spill_dir=str(tmp_path))
+    first = registry.put(survey)
+    second = registry.put(survey.head(100))
+    # Both are recent: another worker may still hold either handle
+    assert other_worker.get(first) is not None and other_worker.get(second) is not None
+
+    old = time.time() - 2 * registry.spill_min_age_s
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (old, old))
+    registry.put(survey.head(10))
+    assert DatasetRegistry(spill_dir=str(tmp_path)).get(first) is None
+
+
+def test_reading_a_spill_file_marks_it_used(survey, tmp_path):
+    import os
+    import time
+
+    registry = DatasetRegistry(spill_dir=str(tmp_path))
+    handle = registry.put(survey)
+    path = registry._find_spilled(handle)[1]
+    old = time.time() - 2 * registry.spill_min_age_s
+    os.utime(path, (old, old))
+    DatasetRegistry(spill_dir=str(tmp_path)).get(handle)
+    assert os.path.getmtime(path) > old + registry.spill_min_age_s
@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_cleaning import clean_data
+from dtype_optimizer import CATEGORY_MAX_RATIO, TEXT_DTYPE, bytes_saved, optimize_dtypes, optimize_series
+
+
+def test_round_trip_keeps_every_value(raw_survey):
+    cleaned = clean_data(raw_survey)
+    optimized, report = optimize_dtypes(cleaned)
+    assert list(optimized.columns) == list(cleaned.columns)
+    for col in cleaned.columns:
+        # Same values and missing positions; only the storage type differs
+        assert optimized[col].astype(object).where(optimized[col].notna(), None).tolist() == \
+            cleaned[col].astype(object).where(cleaned[col].notna(), None).tolist(), col
+    assert bytes_saved(report) > 0
+    assert optimized.memory_usage(deep=True).sum() < cleaned.memory_usage(deep=True).sum()
+    changed = {entry['column'] for entry in report}
+    assert changed == {col for col in cleaned.columns if optimized[col].dtype != cleaned[col].dtype}
+
+
+def test_integers_shrink_to_the_smallest_signed_type():
+    assert optimize_series(pd.Series([0, 120])).dtype == np.int8
+    assert optimize_series(pd.Series([-1, 40_000])).dtype == np.int32
+    assert optimize_series(pd.Series([0, 2 ** 40])).dtype == np.int64
+    nullable = optimize_series(pd.Series([18, None, 70], dtype='Int64'))
+    assert str(nullable.dtype) == 'Int8' and nullable.isna().tolist() == [False, True, False]
+
+
+@pytest.mark.skipif(TEXT_DTYPE is None, reason="pyarrow is not installed")
+def test_text_becomes_categorical_or_arrow_strings():
+    repeated = pd.Series(['a', 'b'] * 10, dtype=object)
+    assert isinstance(optimize_series(repeated).dtype, pd.CategoricalDtype)
+    distinct = pd.Series([f"comment {i}" for i in range(int(10 / CATEGORY_MAX_RATIO))], dtype=object)
+    assert isinstance(optimize_series(distinct).dtype, pd.StringDtype)
+    mixed = pd.Series(['a', 1, 'b'], dtype=object)
+    assert optimize_series(mixed) is mixed
+
+
+@pytest.mark.parametrize('fmt', ['arrow', 'parquet', 'pickle'])
+def test_compact_dtypes_survive_a_spill_round_trip(survey, fmt):
+    from data_serializer import decode_dataframe, encode_dataframe, is_available
+    if not is_available(fmt):
+        pytest.skip(f"{fmt} serializer is not available")
+    used, payload = encode_dataframe(survey, [fmt])
+    restored = decode_dataframe(payload, used)
+    pd.testing.assert_frame_equal(restored, survey)
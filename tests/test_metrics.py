@@ -0,0 +1,21 @@
+import json
+
+from metrics import log_event, timed_callback
+
+
+def test_log_event_writes_one_json_object_per_line(capsys):
+    log_event('upload_loaded', filename='survey.csv', rows=3, columns=2)
+    log_event('upload_rejected', level='error', reason="CSV has no rows")
+    records = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [r['event'] for r in records] == ['upload_loaded', 'upload_rejected']
+    assert records[0]['level'] == 'info' and records[0]['rows'] == 3
+    assert records[1]['level'] == 'error'
+    assert all({'time', 'pid'} <= record.keys() for record in records)
+
+
+def test_callback_lines_share_the_log_format(capsys, monkeypatch):
+    monkeypatch.setattr('metrics.JSON_LOG', True)
+    timed_callback('tests.echo', lambda value: json.dumps(value))('x')
+    record = json.loads(capsys.readouterr().out)
+    assert record['event'] == 'callback' and record['callback'] == 'tests.echo'
+    assert record['level'] == 'info' and record['response_bytes'] == 3
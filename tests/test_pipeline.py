@@ -0,0 +1,116 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from pipeline import IMPUTE_METHODS, apply_step, from_json, run_pipeline, to_column_transformer, to_json
+
+
+def missing_columns(df):
+    return df.columns[df.isnull().any()].tolist()
+
+
+@pytest.mark.parametrize('method', IMPUTE_METHODS)
+def test_impute_all_missing_columns(survey, method):
+    columns = missing_columns(survey)
+    step = {'op': 'impute', 'columns': columns, 'method': method, 'value': 'unknown'}
+    result = apply_step(survey.copy(deep=False), step)
+    if method == 'ffill':
+        # Only a leading run of missing values has nothing to fill from
+        for col in columns:
+            assert result[col].loc[survey[col].first_valid_index():].notna().all()
+    elif method == 'bfill':
+        for col in columns:
+            assert result[col].loc[:survey[col].last_valid_index()].notna().all()
+    elif method in ('mean', 'median'):
+        numeric = [col for col in columns if pd.api.types.is_numeric_dtype(survey[col])]
+        assert not result[numeric].isnull().any().any()
+    else:
+        assert not result[columns].isnull().any().any()
+
+
+@pytest.mark.parametrize('column, value', [('Gender', 'unknown'), ('Age', 'unknown'), ('Age', 0),
+                                           ('state', 'n/a'), ('comments', 7)])
+def test_impute_custom_value_on_one_column(survey, column, value):
+    step = {'op': 'impute', 'columns': [column], 'method': 'custom', 'value': value}
+    result = apply_step(survey.copy(deep=False), step)
+    assert not result[column].isnull().any()
+    assert (result[column] == value).sum() == survey[column].isnull().sum()
+
+
+def test_impute_zero_keeps_categorical(survey):
+    result = apply_step(survey.copy(deep=False), {'op': 'impute', 'columns': ['Gender'], 'method': 'zero'})
+    assert isinstance(result['Gender'].dtype, pd.CategoricalDtype)
+    assert (result['Gender'] == 0).sum() == survey['Gender'].isnull().sum()
+
+
+def test_impute_leaves_input_untouched(survey):
+    before = survey['Age'].copy()
+    apply_step(survey.copy(deep=False), {'op': 'impute', 'columns': ['Age'], 'method': 'zero'})
+    pd.testing.assert_series_equal(survey['Age'], before)
+
+
+def assert_same_values(actual, expected, name):
+    if isinstance(expected.dtype, pd.CategoricalDtype) and isinstance(expected.cat.categories, pd.IntervalIndex):
+        # Bins: run_pipeline keeps the intervals, the transformer outputs the bin number
+        expected = expected.cat.codes.astype('float64').where(expected.notna())
+    try:
+        actual = pd.to_numeric(actual).astype('float64')
+        expected = pd.to_numeric(expected.astype(object)).astype('float64')
+    except (TypeError, ValueError):
+        actual, expected = actual.astype(object), expected.astype(object)
+        assert actual.isna().equals(expected.isna()), name
+        assert (actual[actual.notna()] == expected[expected.notna()]).all(), name
+        return
+    np.testing.assert_allclose(actual.to_numpy(), expected.to_numpy(), equal_nan=True, err_msg=name)
+
+
+def fitted_like_replay(df, steps):
+    ct = to_column_transformer(steps, df)
+    out = ct.fit_transform(df)
+    names = list(ct.get_feature_names_out())
+    expected = run_pipeline(df, steps)
+    assert sorted(names) == sorted(map(str, expected.columns))
+    out = pd.DataFrame(out, columns=names)
+    for name in names:
+        assert_same_values(out[name].reset_index(drop=True), expected[name].reset_index(drop=True), name)
+
+
+PIPELINES = {
+    'mean on all missing columns': lambda df: [
+        {'op': 'impute', 'columns': missing_columns(df), 'method': 'mean'}],
+    'median then scale': lambda df: [
+        {'op': 'impute', 'columns': ['Age'], 'method': 'median'},
+        {'op': 'scale', 'columns': ['Age', 'Years_in_Tech'], 'method': 'standard'}],
+    'mode then one-hot': lambda df: [
+        {'op': 'impute', 'columns': ['Gender', 'Country'], 'method': 'mode'},
+        {'op': 'encode', 'columns': ['Gender', 'Country'], 'method': 'onehot'}],
+    'label encoding with missing values': lambda df: [
+        {'op': 'encode', 'columns': ['Gender', 'work_interfere', 'state'], 'method': 'label'}],
+    'cast then bin': lambda df: [
+        {'op': 'cast', 'column': 'Age', 'target': 'float'},
+        {'op': 'bin', 'column': 'Age', 'bins': 5}],
+    'two custom fill values': lambda df: [
+        {'op': 'impute', 'columns': ['Gender'], 'method': 'custom', 'value': 'unknown'},
+        {'op': 'impute', 'columns': ['Country'], 'method': 'custom', 'value': 'nowhere'},
+        {'op': 'impute', 'columns': ['Age'], 'method': 'zero'},
+        {'op': 'drop', 'columns': ['comments']}],
+    'ffill then min-max': lambda df: [
+        {'op': 'impute', 'columns': ['Age'], 'method': 'ffill'},
+        {'op': 'scale', 'columns': ['Age'], 'method': 'minmax'}],
+}
+
+
+@pytest.mark.parametrize('name', PIPELINES)
+def test_column_transformer_matches_replay(survey, name):
+    fitted_like_replay(survey, PIPELINES[name](survey))
+
+
+def test_column_transformer_rejects_row_drops(survey):
+    with pytest.raises(ValueError):
+        to_column_transformer([{'op': 'impute', 'columns': ['Age'], 'method': 'drop'}], survey)
+
+
+def test_replay_of_recorded_steps_is_deterministic(survey):
+    steps = PIPELINES['mode then one-hot'](survey) + PIPELINES['median then scale'](survey)
+    steps = from_json(to_json(steps))
+    pd.testing.assert_frame_equal(run_pipeline(survey, steps), run_pipeline(survey, steps))
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from plot_aggregates import (density_grid, histogram_counts, nice_bin_size, numeric_values, scatter_mode,
+                             stratified_sample)
+
+
+@pytest.mark.parametrize('values', [
+    np.random.default_rng(0).normal(50, 12, 10_000),
+    np.random.default_rng(1).integers(18, 75, 10_000).astype('float64'),
+    np.array([3.0, 3.0, 3.0]),
+    np.array([-2.5, 0.0, 0.1, 7.75]),
+])
+@pytest.mark.parametrize('nbins', [1, 20, 100])
+def test_counts_match_numpy_histogram_on_the_same_edges(values, nbins):
+    hist = histogram_counts(values, nbins)
+    edges, counts = hist['edges'], hist['counts']
+    assert len(edges) == len(counts) + 1
+    assert np.allclose(np.diff(edges), hist['size'])
+    assert edges[0] <= values.min() and values.max() < edges[-1]
+    assert counts.sum() == len(values)
+    # np.histogram closes only the last bin, which already lies beyond the maximum
+    expected, _ = np.histogram(values, bins=edges)
+    assert np.array_equal(counts, expected)
+
+
+def test_integer_data_gets_unit_bins_centred_on_the_values():
+    values = np.array([18.0, 18.0, 19.0, 21.0])
+    hist = histogram_counts(values, 50)
+    assert hist['size'] == 1.0
+    centres = (hist['edges'][:-1] + hist['edges'][1:]) / 2
+    assert dict(zip(centres, hist['counts'])) == {18.0: 2, 19.0: 1, 20.0: 0, 21.0: 1}
+
+
+def test_bin_width_is_a_nice_number_within_the_requested_count():
+    for span, nbins in [(57, 20), (0.3, 7), (1234, 100)]:
+        size = nice_bin_size(span, nbins)
+        assert span / size <= nbins
+        assert round(size / 10 ** np.floor(np.log10(size)), 6) in (1, 2, 2.5, 5, 10)
+
+
+def test_numeric_values_drops_missing_and_infinite():
+    series = pd.Series([1, None, 3], dtype='Int8')
+    assert numeric_values(series).tolist() == [1.0, 3.0]
+    assert numeric_values(pd.Series([1.0, np.inf, np.nan])).tolist() == [1.0]
+
+
+def test_empty_input_has_no_bins():
+    hist = histogram_counts(np.array([]), 10)
+    assert len(hist['edges']) == 0 and len(hist['counts']) == 0
+
+
+def test_scatter_mode_switches_to_density_above_the_limit():
+    assert scatter_mode('auto', 1000, max_points=1000) == 'exact'
+    assert scatter_mode('auto', 1001, max_points=1000) == 'density'
+    assert scatter_mode(None, 0, max_points=1000) == 'exact'
+    for mode in ('exact', 'density', 'sample'):
+        assert scatter_mode(mode, 10, max_points=1000) == mode
+        assert scatter_mode(mode, 10_000, max_points=1000) == mode
+
+
+def clustered_points(n, seed=0):
+    """A dense blob plus a handful of far outliers"""
+    rng = np.random.default_rng(seed)
+    x = np.concatenate([rng.normal(0, 1, n), [40.0, -35.0, 38.0]])
+    y = np.concatenate([rng.normal(0, 1, n), [-30.0, 33.0, 36.0]])
+    return x, y
+
+
+def test_stratified_sample_keeps_everything_up_to_the_limit():
+    x, y = clustered_points(997)
+    assert np.array_equal(stratified_sample(x, y, max_points=1000), np.arange(1000))
+    assert np.array_equal(stratified_sample(x[:10], y[:10], max_points=1000), np.arange(10))
+
+
+@pytest.mark.parametrize('max_points', [2500, 5000, 20_000])
+def test_stratified_sample_stays_within_the_limit_and_keeps_outliers(max_points):
+    x, y = clustered_points(50_000)
+    index = stratified_sample(x, y, max_points=max_points, grid=50)
+    assert 0 < len(index) <= max_points
+    assert np.array_equal(index, np.unique(index))  # sorted, no repeats
+    assert index[0] >= 0 and index[-1] < len(x)
+    # The three outliers sit alone in their cells and always survive
+    assert set(range(len(x) - 3, len(x))) <= set(index.tolist())
+
+
+def test_stratified_sample_takes_one_quota_from_every_occupied_cell():
+    x, y = clustered_points(50_000)
+    grid = 20
+    index = stratified_sample(x, y, max_points=4000, grid=grid)
+
+    def cells(positions):
+        cx = np.minimum(((x - x.min()) / (x.max() - x.min()) * grid).astype(int), grid - 1)
+        cy = np.minimum(((y - y.min()) / (y.max() - y.min()) * grid).astype(int), grid - 1)
+        return np.bincount((cx * grid + cy)[positions], minlength=grid * grid)
+
+    everything, kept = cells(np.arange(len(x))), cells(index)
+    assert np.array_equal(kept > 0, everything > 0)
+    quota = kept.max()
+    assert np.array_equal(kept, np.minimum(everything, quota))
+
+
+def test_stratified_sample_is_deterministic_per_seed():
+    x, y = clustered_points(20_000)
+    assert np.array_equal(stratified_sample(x, y, 3000, seed=1), stratified_sample(x, y, 3000, seed=1))
+    assert not np.array_equal(stratified_sample(x, y, 3000, seed=1), stratified_sample(x, y, 3000, seed=2))
+
+
+def test_density_grid_counts_every_point():
+    x, y = clustered_points(10_000)
+    density = density_grid(x, y, bins=40)
+    z = density['z']
+    assert z.shape == (40, 40)
+    assert len(density['x']) == len(density['y']) == 40
+    assert density['count'] == len(x)
+    assert np.nansum(z) == len(x)
+    assert not (z == 0).any()  # empty cells are NaN, not zero
+    assert np.isnan(z).any()
+    # Rows are y bins, columns are x bins, as go.Heatmap expects
+    expected, _, _ = np.histogram2d(x, y, bins=40)
+    assert np.array_equal(np.nan_to_num(z), expected.T)
+    assert density['x'][0] > x.min() and density['x'][-1] < x.max()
@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from regression import confidence_band, fit_ols, fit_xy, sufficient_stats
+
+
+@pytest.mark.parametrize('offset', [0.0, 1e6])
+def test_fit_matches_numpy_polyfit(offset):
+    rng = np.random.default_rng(0)
+    x = rng.normal(offset, 3.0, 5000)
+    y = 2.5 * x - 7 + rng.normal(0, 4.0, 5000)
+    fit = fit_xy(x, y)
+    slope, intercept = np.polyfit(x, y, 1)
+    assert fit['slope'] == pytest.approx(slope, rel=1e-9)
+    assert fit['intercept'] == pytest.approx(intercept, rel=1e-6, abs=1e-6)
+    assert fit['r'] == pytest.approx(np.corrcoef(x, y)[0, 1], rel=1e-9)
+
+
+def test_standard_errors_match_scipy_linregress():
+    from scipy import stats
+    rng = np.random.default_rng(1)
+    x = rng.uniform(18, 70, 300)
+    y = 0.3 * x + rng.normal(0, 5, 300)
+    fit = fit_xy(x, y)
+    reference = stats.linregress(x, y)
+    assert fit['slope_se'] == pytest.approx(reference.stderr, rel=1e-9)
+    assert fit['t_crit'] == pytest.approx(stats.t.ppf(0.975, len(x) - 2), rel=1e-9)
+    lower, upper = confidence_band(fit, [fit['x_mean']])
+    half_width = fit['t_crit'] * fit['sigma'] / np.sqrt(len(x))
+    assert upper[0] - lower[0] == pytest.approx(2 * half_width)
+
+
+def test_degenerate_inputs_have_no_fit():
+    assert fit_ols(sufficient_stats(np.array([]), np.array([]))) is None
+    assert fit_xy(np.array([1.0]), np.array([2.0])) is None
+    assert fit_xy(np.full(10, 3.0), np.arange(10.0)) is None
@@ -0,0 +1,62 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_loader import load_dataframe
+from data_store import put_dataset
+from row_filter import BitmapIndex, apply_filters, filter_summary, filterable_columns, normalize_filters, row_mask
+
+
+def boolean_mask(df, filters):
+    """Reference result: isin per column, ANDed across columns"""
+    mask = np.ones(len(df), dtype=bool)
+    for col, labels in filters.items():
+        if labels:
+            mask &= df[col].astype(object).map(str).isin(labels).to_numpy() & df[col].notna().to_numpy()
+    return mask
+
+
+FILTERS = [
+    {},
+    {'Gender': ['Female']},
+    {'Gender': ['Female', 'Male'], 'treatment': ['Yes']},
+    {'Country': ['United States', 'Canada'], 'remote_work': ['No'], 'family_history': ['Yes']},
+    {'Gender': ['Female'], 'treatment': []},
+    {'Gender': ['Nobody']},
+]
+
+
+@pytest.mark.parametrize('filters', FILTERS)
+def test_bitmap_mask_matches_boolean_mask(survey, filters):
+    handle = put_dataset(survey)
+    df = load_dataframe(handle)
+    assert np.array_equal(row_mask(handle, df, filters), boolean_mask(df, filters))
+    assert filter_summary(handle, filters) == (int(boolean_mask(df, filters).sum()), len(df))
+
+
+def test_filtered_view_holds_the_matching_rows(survey):
+    handle = put_dataset(survey)
+    filters = {'treatment': ['Yes'], 'Gender': ['Female', 'Male']}
+    view = apply_filters(handle, filters)
+    expected = survey[boolean_mask(survey, filters)].reset_index(drop=True)
+    pd.testing.assert_frame_equal(load_dataframe(view), expected)
+    # Same filter in another order reuses the registered view
+    assert apply_filters(handle, {'Gender': ['Male', 'Female'], 'treatment': ['Yes']}) == view
+    assert apply_filters(handle, {}) == handle
+
+
+def test_bitmap_index_on_text_columns():
+    series = pd.Series(['b', 'a', None, 'b', 'c'] * 3, dtype=object)
+    index = BitmapIndex(series)
+    assert index.labels == ['a', 'b', 'c']
+    assert index.counts.tolist() == [3, 6, 3]
+    mask = np.unpackbits(index.select(['a', 'c']), count=len(series)).view(bool)
+    assert np.array_equal(mask, series.isin(['a', 'c']).to_numpy())
+    assert index.select(['z']) is None
+
+
+def test_filterable_columns_and_normalized_filters(survey):
+    columns = filterable_columns(survey)
+    assert 'Gender' in columns and 'treatment' in columns
+    assert 'Age' not in columns
+    assert normalize_filters({'b': ['y', 'x'], 'a': [], 'c': ['z']}) == {'b': ['x', 'y'], 'c': ['z']}
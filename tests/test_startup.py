@@ -0,0 +1,30 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import index
+from pages import bivariate, home, preprocessing, univariate
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.mark.parametrize('pathname, builder', [('/', home.home_page), ('/univariate', univariate.univariate_page),
+                                               ('/bivariate', bivariate.bivariate_page),
+                                               ('/preprocessing', preprocessing.preprocessing_page)])
+def test_page_layouts_are_built_once(pathname, builder):
+    layout = index.display_page(pathname)
+    assert layout is builder()
+    assert index.display_page(pathname) is layout
+
+
+def test_import_leaves_heavy_libraries_unloaded():
+    # A fresh interpreter: this test process has already imported them elsewhere
+    script = ('import sys, index; '
+              'print(__import__("json").dumps([m for m in ("sklearn", "plotly.express", "scipy") if m in sys.modules]))')
+    env = dict(os.environ, CALLBACK_METRICS_LOG='0')
+    result = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env=env, capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
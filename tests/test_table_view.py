@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from data_store import put_dataset
+from table_view import filter_mask, query_page, split_filter_part, view_positions
+
+
+@pytest.mark.parametrize('part, expected', [
+    ('{Age} ge 30', ('Age', 'ge', 30.0)),
+    ('{Age} >= 30', ('Age', 'ge', 30.0)),
+    ('{Age} < 25.5', ('Age', 'lt', 25.5)),
+    ('{Age} > 60', ('Age', 'gt', 60.0)),
+    ('{Gender} eq "Female"', ('Gender', 'eq', 'Female')),
+    ('{Gender} ne Male', ('Gender', 'ne', 'Male')),
+    ('{Country} contains \'United\'', ('Country', 'contains', 'United')),
+    ('{comments} eq "say \\"hi\\""', ('comments', 'eq', 'say "hi"')),
+    ('{Years in Tech} le 3', ('Years in Tech', 'le', 3.0)),
+    ('{Timestamp} datestartswith 2014-08', ('Timestamp', 'datestartswith', '2014-08')),
+])
+def test_split_filter_part(part, expected):
+    assert split_filter_part(part) == expected
+
+
+def test_split_filter_part_without_an_operator():
+    assert split_filter_part('{Age}') == (None, None, None)
+    assert split_filter_part('') == (None, None, None)
+
+
+@pytest.fixture(scope='module')
+def frame(survey):
+    return survey.reset_index(drop=True)
+
+
+def as_mask(selection):
+    return selection.fillna(False).to_numpy(dtype=bool)
+
+
+@pytest.mark.parametrize('query, expected', [
+    ('{Age} ge 30', lambda df: df['Age'] >= 30),
+    ('{Age} lt 25 && {Age} ne 18', lambda df: (df['Age'] < 25) & (df['Age'] != 18)),
+    ('{Years_in_Tech} eq 5', lambda df: df['Years_in_Tech'] == 5),
+    ('{Gender} eq "Female"', lambda df: df['Gender'] == 'Female'),
+    ('{Gender} ne "Male"', lambda df: df['Gender'].notna() & (df['Gender'] != 'Male')),
+    ('{Country} contains "united"', lambda df: df['Country'].str.contains('united', case=False, regex=False)),
+    ('{Gender} eq "Male" && {Age} gt 40 && {treatment} eq Yes',
+     lambda df: (df['Gender'] == 'Male') & (df['Age'] > 40) & (df['treatment'] == 'Yes')),
+])
+def test_filter_mask_matches_pandas(frame, query, expected):
+    mask = filter_mask(frame, query)
+    assert mask.dtype == bool
+    assert np.array_equal(mask, as_mask(expected(frame)))
+    assert 0 < mask.sum() < len(frame)
+
+
+def test_filter_mask_ignores_empty_and_unknown_filters(frame):
+    assert filter_mask(frame, None).all()
+    assert filter_mask(frame, '').all()
+    assert filter_mask(frame, '{missing} eq 3').all()
+
+
+def test_numbers_match_text_categories():
+    df = pd.DataFrame({'rating': pd.Categorical(['1', '2', '10', None]), 'score': [1.0, 2.0, np.nan, 10.0]})
+    assert filter_mask(df, '{rating} eq 1').tolist() == [True, False, False, False]
+    assert filter_mask(df, '{score} le 2').tolist() == [True, True, False, False]
+
+
+@pytest.mark.parametrize('query, sort_by', [
+    ('', [{'column_id': 'Age', 'direction': 'asc'}]),
+    ('{Gender} ne "Male"', [{'column_id': 'Gender', 'direction': 'asc'}, {'column_id': 'Age', 'direction': 'desc'}]),
+    ('{Age} gt 30', [{'column_id': 'Country', 'direction': 'desc'}, {'column_id': 'Years_in_Tech', 'direction': 'asc'}]),
+    ('{Age} gt 30', [{'column_id': 'missing', 'direction': 'asc'}]),
+])
+def test_view_positions_match_pandas(frame, query, sort_by):
+    expected = frame[filter_mask(frame, query)]
+    known = [s for s in sort_by if s['column_id'] in frame.columns]
+    if known:
+        expected = expected.sort_values([s['column_id'] for s in known], ascending=[s['direction'] == 'asc' for s in known],
+                                        kind='mergesort', na_position='last')
+    assert view_positions(frame, query, sort_by).tolist() == expected.index.tolist()
+
+
+def test_query_page_slices_the_view(frame):
+    handle = put_dataset(frame)
+    sort_by = [{'column_id': 'Age', 'direction': 'desc'}]
+    positions = view_positions(frame, '{Gender} eq "Female"', sort_by)
+
+    records, page_count, total = query_page(handle, 2, 25, sort_by, '{Gender} eq "Female"')
+    assert total == len(positions)
+    assert page_count == -(-len(positions) // 25)
+    assert [r['Age'] for r in records] == frame['Age'].iloc[positions[50:75]].tolist()
+
+    # Past the last page clamps to it
+    records, _, _ = query_page(handle, 10_000, 25, sort_by, '{Gender} eq "Female"')
+    assert 0 < len(records) <= 25
+    assert records[-1]['Years_in_Tech'] == frame['Years_in_Tech'].iloc[positions[-1]]
+
+    assert query_page(handle, 0, 25, None, '{Age} gt 1000') == ([], 1, 0)
+    assert query_page(None, 0, 25, None, '') == ([], 1, 0)
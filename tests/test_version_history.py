@@ -0,0 +1,143 @@
+import pandas as pd
+import pytest
+
+import data_store
+import version_history
+from data_store import DatasetRegistry, put_dataset
+from pipeline import apply_step
+from version_history import enforce_budget, get_history, materialize, session_history, total_bytes
+
+
+@pytest.fixture(autouse=True)
+def empty_histories(tmp_path, monkeypatch):
+    # A registry of its own: saved histories must not leak between tests
+    monkeypatch.setattr(data_store, 'registry', DatasetRegistry(spill_dir=str(tmp_path)))
+    version_history._histories.clear()
+    yield
+    version_history._histories.clear()
+
+
+def other_worker(tmp_path, monkeypatch):
+    """Switch to the state of another worker: empty memory, same spill directory"""
+    monkeypatch.setattr(data_store, 'registry', DatasetRegistry(spill_dir=str(tmp_path)))
+    version_history._histories.clear()
+
+
+def record_step(history, df, step):
+    df = apply_step(df.copy(deep=False), step)
+    return df, history.record(put_dataset(df), df, [step])
+
+
+def test_undo_redo_walks_the_versions(survey):
+    base = put_dataset(survey)
+    history = get_history(session_history('session', base))
+    history.record(base, survey)
+    scaled, second = record_step(history, survey, {'op': 'scale', 'columns': ['Age'], 'method': 'minmax'})
+    dropped, third = record_step(history, scaled, {'op': 'drop', 'columns': ['comments']})
+
+    assert history.step(-1) is second
+    assert history.step(-1).handle == base
+    assert history.step(-1) is None and not history.can_undo
+    assert history.step(1) is second
+    assert history.step(1) is third and not history.can_redo
+    pd.testing.assert_frame_equal(third.to_frame(), dropped)
+    assert [step['op'] for step in third.steps] == ['scale', 'drop']
+
+
+def test_unchanged_columns_are_shared_with_the_parent(survey):
+    base = put_dataset(survey)
+    history = get_history(session_history('session', base))
+    first = history.record(base, survey)
+    _, second = record_step(history, survey, {'op': 'scale', 'columns': ['Age'], 'method': 'minmax'})
+    assert second.columns['Gender'] is first.columns['Gender']
+    assert second.columns['Age'] is not first.columns['Age']
+
+
+def test_new_version_drops_the_redo_branch(survey):
+    base = put_dataset(survey)
+    history = get_history(session_history('session', base))
+    history.record(base, survey)
+    record_step(history, survey, {'op': 'drop', 'columns': ['comments']})
+    history.step(-1)
+    record_step(history, survey, {'op': 'drop', 'columns': ['state']})
+    assert len(history.versions) == 2 and not history.can_redo
+
+
+def test_history_survives_page_visits_of_the_same_session(survey):
+    base = put_dataset(survey)
+    history = get_history(session_history('session', base))
+    history.record(base, survey)
+    _, latest = record_step(history, survey, {'op': 'drop', 'columns': ['comments']})
+    assert get_history(session_history('session', base)) is history
+    assert materialize(history.current) == latest.handle
+    # Another dataset starts over
+    assert get_history(session_history('session', 'f' * 32)) is not history
+
+
+def test_byte_budget_is_shared_by_all_sessions(survey, monkeypatch):
+    histories = []
+    for session in ('first', 'second', 'third'):
+        base = put_dataset(survey)
+        history = get_history(session_history(session, base))
+        history.record(base, survey)
+        df = survey
+        for col in ('Age', 'Years_in_Tech', 'Sick_Leave_Days'):
+            df, _ = record_step(history, df, {'op': 'scale', 'columns': [col], 'method': 'standard'})
+        histories.append(history)
+    unbounded = total_bytes()
+    # All sessions share the loaded dataset's columns; each scaled column is extra
+    budget = unbounded - 1
+    enforce_budget(histories[-1], max_bytes=budget)
+    assert total_bytes() <= budget
+    # The least recently used session loses its oldest versions first
+    assert len(histories[0].versions) < 4
+    assert len(histories[-1].versions) == 4
+
+
+def test_tight_budget_keeps_only_the_active_current_version(survey):
+    for session in ('idle', 'active'):
+        base = put_dataset(survey)
+        history = get_history(session_history(session, base))
+        history.record(base, survey)
+        record_step(history, survey, {'op': 'scale', 'columns': ['Age'], 'method': 'standard'})
+    enforce_budget(history, max_bytes=1)
+    assert 'idle' not in version_history._histories
+    assert get_history('active') is history
+    assert len(history.versions) == 1 and history.current is not None
+    # The idle session's saved version list resumes it, its datasets load from the spill directory
+    idle = get_history('idle')
+    assert idle is not None and len(idle.versions) == 1
+    assert materialize(idle.current) == idle.current.handle
+
+
+def test_undo_and_redo_resume_on_another_worker(survey, tmp_path, monkeypatch):
+    base = put_dataset(survey)
+    history = get_history(session_history('session', base))
+    history.record(base, survey)
+    scaled, second = record_step(history, survey, {'op': 'scale', 'columns': ['Age'], 'method': 'minmax'})
+    dropped, third = record_step(history, scaled, {'op': 'drop', 'columns': ['comments']})
+
+    other_worker(tmp_path, monkeypatch)
+    elsewhere = get_history('session')
+    assert [v.handle for v in elsewhere.versions] == [base, second.handle, third.handle]
+    assert elsewhere.current.steps == third.steps
+    undone = elsewhere.step(-1)
+    assert materialize(undone) == second.handle
+    pd.testing.assert_frame_equal(undone.to_frame(), scaled)
+
+    # Back on the first worker, the undo made elsewhere is picked up
+    monkeypatch.undo()
+    monkeypatch.setattr(data_store, 'registry', DatasetRegistry(spill_dir=str(tmp_path)))
+    version_history._histories['session'] = history
+    resumed = get_history('session')
+    assert resumed.current.handle == second.handle and resumed.can_redo
+    # Columns this worker already holds are reused, not loaded again
+    assert resumed.versions[2].columns is third.columns
+    _, fourth = record_step(resumed, scaled, {'op': 'drop', 'columns': ['state']})
+    assert fourth.columns['Gender'] is resumed.versions[1].columns['Gender']
+    assert [step['op'] for step in fourth.steps] == ['scale', 'drop']
+
+
+def test_unknown_session_has_no_history():
+    assert get_history('never-seen') is None
+    assert get_history(None) is None
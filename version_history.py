@@ -0,0 +1,350 @@
+import os
+import threading
+import uuid
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from data_store import get_dataset, get_record, put_dataset, put_record
+
+# Undo/redo history of the preprocessing page.
+# Every dataset version produced by a preprocessing step is recorded as a set
+# of columns. A column the step left untouched is not stored again: the new
+# version points at the parent's Series (copy-on-write at column level), so a
+# step that rewrites one column of a 30-column frame costs one column of
+# memory. Versions are registered in the dataset registry under their own
+# handle; if the registry evicted one, undo/redo rebuilds it from the columns
+# kept here instead of re-uploading and re-cleaning the file.
+# There is one history per browser session; all of them share one byte budget.
+# The version list itself (handles, labels, steps) is also saved as a record in
+# data_store after every change, so an undo that lands on another worker
+# resumes the same history there; versions loaded that way get their columns
+# from the registry, which resolves persisted handles in any worker.
+
+# Process-wide: columns of every session's history, each shared column counted once
+MAX_HISTORY_BYTES = int(os.environ.get('PREPROCESSING_HISTORY_MAX_BYTES', 256 * 1024 * 1024))
+MAX_VERSIONS = int(os.environ.get('PREPROCESSING_HISTORY_MAX_VERSIONS', 20))
+MAX_SESSIONS = int(os.environ.get('PREPROCESSING_HISTORY_MAX_SESSIONS', 256))
+
+
+def _buffer_key(series):
+    """Identity of the memory behind a column: same key means the same values"""
+    if isinstance(series.dtype, np.dtype):
+        values = series.to_numpy()
+        return ('numpy', values.__array_interface__['data'][0], values.strides, len(values), str(values.dtype))
+    return ('extension', id(series.array))
+
+
+def _shared_column(parent, series):
+    """The parent's Series if `series` holds the same values (same buffer or equal content)"""
+    if parent is None or parent.dtype != series.dtype:
+        return None
+    if _buffer_key(parent) == _buffer_key(series) or parent.equals(series):
+        return parent
+    return None
+
+
+class Version:
+    """One dataset version: its registry handle, its columns in order and the
+    pipeline steps (see pipeline.py) that produced it from the loaded dataset"""
+
+    def __init__(self, handle, label, columns, index, steps):
+        self.handle = handle
+        self.label = label
+        self.columns = columns
+        self.index = index
+        self.steps = steps
+
+    def to_frame(self):
+        if self.columns is None:
+            return get_dataset(self.handle)
+        if not self.columns:
+            return pd.DataFrame(index=self.index)
+        return pd.concat(list(self.columns.values()), axis=1, copy=False)
+
+    def to_record(self):
+        return {'handle': self.handle, 'label': self.label, 'steps': self.steps}
+
+    @classmethod
+    def from_record(cls, record):
+        # Columns are resolved from the registry when first needed
+        return cls(record['handle'], record['label'], None, None, record['steps'])
+
+
+def _names(columns, limit=4):
+    names = [str(col) for col in columns]
+    if len(names) > limit:
+        return f"{', '.join(names[:limit])} and {len(names) - limit} more"
+    return ', '.join(names)
+
+
+def describe_change(parent, df):
+    """Short label of what a step changed, derived from the two versions"""
+    if parent is None:
+        return "Loaded dataset"
+    parts = []
+    if len(df) != len(parent.index):
+        parts.append(f"{len(parent.index) - len(df):,} rows removed")
+    added = [col for col in df.columns if col not in parent.columns]
+    dropped = [col for col in parent.columns if col not in df.columns]
+    if added:
+        parts.append(f"added {_names(added)}")
+    if dropped:
+        parts.append(f"dropped {_names(dropped)}")
+    return "; ".join(parts)
+
+
+class VersionHistory:
+    """Linear undo/redo stack of dataset versions of one session.
+
+    `base` is the handle of the loaded dataset the history starts from;
+    `session_id` is the key its version list is saved under (None: not saved).
+    """
+
+    def __init__(self, base=None, max_versions=MAX_VERSIONS, session_id=None):
+        self.base = base
+        self.max_versions = max_versions
+        self.session_id = session_id
+        self.versions = []
+        self.position = -1
+        # Changes with every edit, tells a worker its copy is behind the saved record
+        self.revision = uuid.uuid4().hex
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    @property
+    def current(self):
+        return self.versions[self.position] if self.versions else None
+
+    def record(self, handle, df, steps=None):
+        """Add df (registered under handle) as the newest version, dropping the redo branch.
+
+        `steps` are the pipeline steps that turned the current version into df.
+        """
+        with self._lock:
+            parent = self.current
+            if parent is not None and parent.handle == handle:
+                return parent
+            if parent is not None and not self._resolve(parent):
+                # Its dataset is gone everywhere: nothing to share columns or compare with
+                parent = None
+            same_rows = parent is not None and parent.index.equals(df.index)
+            columns = OrderedDict()
+            changed = []
+            for col in df.columns:
+                series = df[col]
+                shared = _shared_column(parent.columns.get(col), series) if same_rows else None
+                if shared is None and parent is not None and col in parent.columns:
+                    changed.append(col)
+                columns[col] = shared if shared is not None else series
+                if id(columns[col]) not in self._sizes:
+                    self._sizes[id(columns[col])] = int(series.memory_usage(index=False, deep=True))
+            if parent is None and self.versions:
+                label = "New version"
+            else:
+                label = describe_change(parent, df)
+            if changed and same_rows:
+                label = "; ".join(filter(None, [label, f"changed {_names(changed)}"]))
+            previous_steps = self.current.steps if self.current is not None else []
+            version = Version(handle, label or "No changes", columns, parent.index if same_rows else df.index,
+                              previous_steps + list(steps or []))
+            del self.versions[self.position + 1:]
+            self.versions.append(version)
+            self.position = len(self.versions) - 1
+            while len(self.versions) > self.max_versions and self.position > 0:
+                self._drop_oldest()
+            self.revision = uuid.uuid4().hex
+        enforce_budget(self)
+        save_history(self)
+        return version
+
+    def _resolve(self, version):
+        """Load the columns of a version restored from a record (lock held); False if unavailable"""
+        if version.columns is not None:
+            return True
+        df = get_dataset(version.handle)
+        if df is None:
+            return False
+        version.columns = OrderedDict(df.items())
+        version.index = df.index
+        for series in version.columns.values():
+            self._sizes.setdefault(id(series), int(series.memory_usage(index=False, deep=True)))
+        return True
+
+    def step(self, offset):
+        """Move offset versions back (-1, undo) or forward (+1, redo); returns the version or None"""
+        with self._lock:
+            target = self.position + offset
+            if not 0 <= target < len(self.versions):
+                return None
+            self.position = target
+            self.revision = uuid.uuid4().hex
+            version = self.versions[target]
+        save_history(self)
+        return version
+
+    def column_sizes(self):
+        """{id(column): bytes} of every column the history holds"""
+        with self._lock:
+            return dict(self._sizes)
+
+    def nbytes(self):
+        """Bytes held by the history, counting each shared column once"""
+        return sum(self.column_sizes().values())
+
+    def drop_oldest(self):
+        """Forget the oldest version unless it is the current one; False if nothing was dropped"""
+        with self._lock:
+            if self.position <= 0:
+                return False
+            self._drop_oldest()
+            self.revision = uuid.uuid4().hex
+            return True
+
+    def _drop_oldest(self):
+        self.versions.pop(0)
+        self.position -= 1
+        live = {id(series) for version in self.versions for series in (version.columns or {}).values()}
+        self._sizes = {key: size for key, size in self._sizes.items() if key in live}
+
+    def to_record(self):
+        with self._lock:
+            return {
+                'base': self.base,
+                'revision': self.revision,
+                'position': self.position,
+                'versions': [version.to_record() for version in self.versions],
+            }
+
+    @classmethod
+    def from_record(cls, session_id, record, previous=None):
+        """History saved by any worker; columns of versions `previous` (this worker's
+        older copy) still holds are reused instead of being loaded again"""
+        history = cls(record['base'], session_id=session_id)
+        history.revision = record['revision']
+        history.position = record['position']
+        known = {}
+        if previous is not None:
+            with previous._lock:
+                known = {version.handle: version for version in previous.versions if version.columns is not None}
+        for saved in record['versions']:
+            version = Version.from_record(saved)
+            if version.handle in known:
+                version.columns, version.index = known[version.handle].columns, known[version.handle].index
+                for series in version.columns.values():
+                    history._sizes.setdefault(id(series), int(series.memory_usage(index=False, deep=True)))
+            history.versions.append(version)
+        return history
+
+    @property
+    def can_undo(self):
+        return self.position > 0
+
+    @property
+    def can_redo(self):
+        return self.position < len(self.versions) - 1
+
+
+_histories = OrderedDict()
+_lock = threading.Lock()
+
+
+def new_session_id():
+    return uuid.uuid4().hex
+
+
+def save_history(history):
+    """Save the version list so every worker resumes the same history"""
+    if history.session_id is not None:
+        put_record('history', history.session_id, history.to_record())
+
+
+def _remember(session_id, history):
+    with _lock:
+        _histories[session_id] = history
+        _histories.move_to_end(session_id)
+        while len(_histories) > MAX_SESSIONS:
+            _histories.popitem(last=False)
+
+
+def session_history(session_id, base):
+    """Id of the session's history of the dataset `base` (kept in a dcc.Store).
+
+    The history survives page visits, in any worker; loading another dataset
+    starts a new one.
+    """
+    history = get_history(session_id)
+    if history is None or history.base != base:
+        history = VersionHistory(base, session_id=session_id)
+        save_history(history)
+    _remember(session_id, history)
+    return session_id
+
+
+def total_bytes(histories=None):
+    """Bytes held by all histories, counting columns shared between them once"""
+    if histories is None:
+        with _lock:
+            histories = list(_histories.values())
+    sizes = {}
+    for history in histories:
+        sizes.update(history.column_sizes())
+    return sum(sizes.values())
+
+
+def enforce_budget(active=None, max_bytes=None):
+    """Keep all histories together under MAX_HISTORY_BYTES.
+
+    The oldest versions of the least recently used sessions go first, then
+    whole idle histories leave this worker's memory (their saved version list
+    still resumes them later). `active` (the history being recorded) keeps at
+    least its current version.
+    """
+    max_bytes = MAX_HISTORY_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        histories = list(_histories.values())
+    if active is not None and active not in histories:
+        histories.append(active)
+    for history in histories:
+        trimmed = False
+        while total_bytes(histories) > max_bytes and history.drop_oldest():
+            trimmed = True
+        if trimmed:
+            save_history(history)
+    for history in list(histories):
+        if total_bytes(histories) <= max_bytes:
+            break
+        if history is not active:
+            histories.remove(history)
+            with _lock:
+                for session_id, candidate in list(_histories.items()):
+                    if candidate is history:
+                        del _histories[session_id]
+
+
+def get_history(history_id):
+    """The session's history, as last saved by whichever worker changed it (None if there is none)"""
+    if history_id is None:
+        return None
+    with _lock:
+        history = _histories.get(history_id)
+        if history is not None:
+            _histories.move_to_end(history_id)
+    record = get_record('history', history_id)
+    if record is None or (history is not None and record['revision'] == history.revision):
+        return history
+    # Saved by another worker since this one last saw it (or never seen here)
+    history = VersionHistory.from_record(history_id, record, previous=history)
+    _remember(history_id, history)
+    return history
+
+
+def materialize(version):
+    """Registry handle of a version, re-registering its frame if the registry dropped it
+    (None if the version was restored from a record and its dataset is gone everywhere)"""
+    if get_dataset(version.handle) is None:
+        if version.columns is None:
+            return None
+        put_dataset(version.to_frame(), handle=version.handle)
+    return version.handle